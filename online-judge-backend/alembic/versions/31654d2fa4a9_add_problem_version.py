@@ -0,0 +1,28 @@
+"""add_problem_version
+
+Revision ID: 31654d2fa4a9
+Revises: 6596364e2e3f
+Create Date: 2026-10-19 11:02:17.386540
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '31654d2fa4a9'
+down_revision: Union[str, Sequence[str], None] = '6596364e2e3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('problems', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('problems', 'version')
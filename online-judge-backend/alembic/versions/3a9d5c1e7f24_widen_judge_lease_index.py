@@ -0,0 +1,46 @@
+"""widen_judge_lease_index
+
+Revision ID: 3a9d5c1e7f24
+Revises: 8e3c1f6a2b70
+Create Date: 2026-10-20 14:36:51.702218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a9d5c1e7f24'
+down_revision: Union[str, Sequence[str], None] = '8e3c1f6a2b70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_submissions_judging_lease', table_name='submissions', postgresql_where=sa.text("status = 'Judging'"))
+    op.create_index(
+        'ix_submissions_judge_lease',
+        'submissions',
+        ['judge_lease_expires_at'],
+        unique=False,
+        postgresql_where=sa.text("status IN ('Judging', 'Pretests Passed')"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        'ix_submissions_judge_lease',
+        table_name='submissions',
+        postgresql_where=sa.text("status IN ('Judging', 'Pretests Passed')"),
+    )
+    op.create_index(
+        'ix_submissions_judging_lease',
+        'submissions',
+        ['judge_lease_expires_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'Judging'"),
+    )
@@ -0,0 +1,36 @@
+"""add_test_results
+
+Revision ID: 5f0b2c8e9d13
+Revises: a3d8e61f27c5
+Create Date: 2026-10-19 19:05:12.417390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f0b2c8e9d13'
+down_revision: Union[str, Sequence[str], None] = 'a3d8e61f27c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'test_results',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('result', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+    op.create_index('ix_test_results_created_at', 'test_results', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_test_results_created_at', table_name='test_results')
+    op.drop_table('test_results')
@@ -0,0 +1,52 @@
+"""add_submission_listing_indexes
+
+Revision ID: 6596364e2e3f
+Revises: ad8d8755a148
+Create Date: 2026-10-19 10:12:41.503127
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6596364e2e3f'
+down_revision: Union[str, Sequence[str], None] = 'ad8d8755a148'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # get_by_user / read_my_submissions / user stats
+    op.create_index('ix_submissions_user_id_created_at', 'submissions',
+                    ['user_id', sa.text('created_at DESC')], unique=False)
+    # admin browser filtered by problem
+    op.create_index('ix_submissions_problem_id_created_at', 'submissions',
+                    ['problem_id', sa.text('created_at DESC')], unique=False)
+    # admin browser unfiltered
+    op.create_index('ix_submissions_created_at', 'submissions',
+                    [sa.text('created_at DESC')], unique=False)
+    # problem leaderboard
+    op.create_index('ix_submissions_problem_id_status', 'submissions',
+                    ['problem_id', 'status'], unique=False)
+    # contest scoreboards, most submissions are not part of a contest
+    op.create_index('ix_submissions_contest_id_created_at', 'submissions',
+                    ['contest_id', sa.text('created_at DESC')], unique=False,
+                    postgresql_where=sa.text('contest_id IS NOT NULL'))
+    # rankings / solved counts
+    op.create_index('ix_submissions_accepted_user_id_problem_id', 'submissions',
+                    ['user_id', 'problem_id'], unique=False,
+                    postgresql_where=sa.text("status = 'Accepted'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_submissions_accepted_user_id_problem_id', table_name='submissions')
+    op.drop_index('ix_submissions_contest_id_created_at', table_name='submissions')
+    op.drop_index('ix_submissions_problem_id_status', table_name='submissions')
+    op.drop_index('ix_submissions_created_at', table_name='submissions')
+    op.drop_index('ix_submissions_problem_id_created_at', table_name='submissions')
+    op.drop_index('ix_submissions_user_id_created_at', table_name='submissions')
@@ -0,0 +1,28 @@
+"""add_user_tokens_valid_after
+
+Revision ID: 8e3c1f6a2b70
+Revises: d4b7e2a9c615
+Create Date: 2026-10-20 10:02:18.214553
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e3c1f6a2b70'
+down_revision: Union[str, Sequence[str], None] = 'd4b7e2a9c615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('tokens_valid_after', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'tokens_valid_after')
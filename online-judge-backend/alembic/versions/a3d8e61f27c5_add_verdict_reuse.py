@@ -0,0 +1,38 @@
+"""add_verdict_reuse
+
+Revision ID: a3d8e61f27c5
+Revises: c71e5a0d9b42
+Create Date: 2026-10-19 17:48:30.902716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d8e61f27c5'
+down_revision: Union[str, Sequence[str], None] = 'c71e5a0d9b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('submissions', sa.Column('judge_key', sa.String(length=64), nullable=True))
+    op.create_index(
+        'ix_submissions_judge_key',
+        'submissions',
+        ['judge_key'],
+        unique=False,
+        postgresql_where=sa.text('judge_key IS NOT NULL'),
+    )
+    op.add_column('contests', sa.Column('reuse_verdicts', sa.Boolean(), server_default=sa.text('true'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('contests', 'reuse_verdicts')
+    op.drop_index('ix_submissions_judge_key', table_name='submissions', postgresql_where=sa.text('judge_key IS NOT NULL'))
+    op.drop_column('submissions', 'judge_key')
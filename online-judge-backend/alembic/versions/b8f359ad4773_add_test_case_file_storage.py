@@ -0,0 +1,39 @@
+"""add_test_case_file_storage
+
+Revision ID: b8f359ad4773
+Revises: 31654d2fa4a9
+Create Date: 2026-10-19 11:41:52.907114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8f359ad4773'
+down_revision: Union[str, Sequence[str], None] = '31654d2fa4a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('test_cases', sa.Column('input_hash', sa.String(length=64), nullable=True))
+    op.add_column('test_cases', sa.Column('output_hash', sa.String(length=64), nullable=True))
+    op.add_column('test_cases', sa.Column('input_size', sa.BigInteger(), nullable=True))
+    op.add_column('test_cases', sa.Column('output_size', sa.BigInteger(), nullable=True))
+    op.alter_column('test_cases', 'input_data', existing_type=sa.TEXT(), nullable=True)
+    op.alter_column('test_cases', 'output_data', existing_type=sa.TEXT(), nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Rows that only exist in the file store cannot satisfy NOT NULL again
+    op.alter_column('test_cases', 'output_data', existing_type=sa.TEXT(), nullable=False)
+    op.alter_column('test_cases', 'input_data', existing_type=sa.TEXT(), nullable=False)
+    op.drop_column('test_cases', 'output_size')
+    op.drop_column('test_cases', 'input_size')
+    op.drop_column('test_cases', 'output_hash')
+    op.drop_column('test_cases', 'input_hash')
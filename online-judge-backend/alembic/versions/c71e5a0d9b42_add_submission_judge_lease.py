@@ -0,0 +1,42 @@
+"""add_submission_judge_lease
+
+Revision ID: c71e5a0d9b42
+Revises: e2a94c7d1f36
+Create Date: 2026-10-19 16:22:05.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71e5a0d9b42'
+down_revision: Union[str, Sequence[str], None] = 'e2a94c7d1f36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('submissions', sa.Column('judge_token', sa.String(), nullable=True))
+    op.add_column('submissions', sa.Column('judge_lease_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('submissions', sa.Column('judge_attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('submissions', sa.Column('judge_checkpoint', sa.JSON(), nullable=True))
+    op.create_index(
+        'ix_submissions_judging_lease',
+        'submissions',
+        ['judge_lease_expires_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'Judging'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_submissions_judging_lease', table_name='submissions', postgresql_where=sa.text("status = 'Judging'"))
+    op.drop_column('submissions', 'judge_checkpoint')
+    op.drop_column('submissions', 'judge_attempts')
+    op.drop_column('submissions', 'judge_lease_expires_at')
+    op.drop_column('submissions', 'judge_token')
@@ -0,0 +1,30 @@
+"""add_interactive_problems
+
+Revision ID: d4b7e2a9c615
+Revises: 5f0b2c8e9d13
+Create Date: 2026-10-19 21:12:44.530182
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b7e2a9c615'
+down_revision: Union[str, Sequence[str], None] = '5f0b2c8e9d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('problems', sa.Column('is_interactive', sa.Boolean(), server_default='false', nullable=False))
+    op.add_column('problems', sa.Column('interactor_code', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('problems', 'interactor_code')
+    op.drop_column('problems', 'is_interactive')
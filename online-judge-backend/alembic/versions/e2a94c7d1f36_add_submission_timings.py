@@ -0,0 +1,28 @@
+"""add_submission_timings
+
+Revision ID: e2a94c7d1f36
+Revises: b8f359ad4773
+Create Date: 2026-10-19 14:06:41.552180
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a94c7d1f36'
+down_revision: Union[str, Sequence[str], None] = 'b8f359ad4773'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('submissions', sa.Column('timings', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('submissions', 'timings')
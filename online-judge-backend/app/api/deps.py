@@ -1,15 +1,18 @@
-from typing import Generator, Optional
+from typing import Optional
+from uuid import UUID
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.core import security
 from app.core.config import settings
+from app.core.principal import Principal, principal_cache
 from app.db.session import SessionLocal
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db
 
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl="/api/v1/login/access-token"
@@ -21,23 +24,47 @@ reusable_oauth2_optional = OAuth2PasswordBearer(
 )
 
 
-def get_current_user(
-    db: Session = Depends(get_db), 
+def _decode_token(token: str) -> schemas.TokenPayload:
+    payload = jwt.decode(
+        token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+    )
+    return schemas.TokenPayload(**payload)
+
+
+async def _load_user(db: AsyncSession, user_id: UUID) -> Optional[models.User]:
+    user = await principal_cache.get_user(user_id)
+    if user is None:
+        user = await crud.user.get_async(db, id=user_id)
+        if user:
+            # Detach so sync endpoints can add the user to their own Session
+            db.expunge(user)
+            await principal_cache.set_user(user)
+    return user
+
+
+async def _claims_principal(token_data: schemas.TokenPayload) -> Optional[Principal]:
+    """Trust the flags embedded in the token unless they were revoked after it was issued."""
+    if token_data.act is None or token_data.su is None or token_data.iat is None:
+        return None
+    if await principal_cache.is_revoked(token_data.sub, token_data.iat):
+        return None
+    return Principal(id=token_data.sub, is_active=token_data.act, is_superuser=token_data.su)
+
+
+async def get_current_user(
+    db: AsyncSession = Depends(get_async_db), 
     token: str = Depends(reusable_oauth2)
 ) -> models.User:
     """驗證 Token 並回傳當前使用者"""
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        token_data = schemas.TokenPayload(**payload)
+        token_data = _decode_token(token)
     except (jwt.JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="無法驗證憑證 (Could not validate credentials)",
         )
     
-    user = crud.user.get(db, id=token_data.sub)
+    user = await _load_user(db, token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="找不到使用者")
     if not user.is_active:
@@ -45,7 +72,7 @@ def get_current_user(
     
     return user
 
-def get_current_active_superuser(
+async def get_current_active_superuser(
     current_user: models.User = Depends(get_current_user),
 ) -> models.User:
     """驗證是否為管理員"""
@@ -56,23 +83,73 @@ def get_current_active_superuser(
         )
     return current_user
 
-def get_current_user_optional(
-    db: Session = Depends(get_db), 
+async def get_current_user_optional(
+    db: AsyncSession = Depends(get_async_db), 
     token: str = Depends(reusable_oauth2_optional)
-) -> Generator[Optional[models.User], None, None]:
+) -> Optional[models.User]:
     if not token:
         return None
         
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        token_data = schemas.TokenPayload(**payload)
+        token_data = _decode_token(token)
     except (jwt.JWTError, ValidationError):
         return None
         
-    user = crud.user.get(db, id=token_data.sub)
+    user = await _load_user(db, token_data.sub)
     if not user or not user.is_active:
         return None
         
-    return user
\ No newline at end of file
+    return user
+
+async def get_current_principal(
+    db: AsyncSession = Depends(get_async_db), 
+    token: str = Depends(reusable_oauth2)
+) -> Principal:
+    """Like get_current_user, for endpoints that only need the id and role."""
+    try:
+        token_data = _decode_token(token)
+    except (jwt.JWTError, ValidationError):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="無法驗證憑證 (Could not validate credentials)",
+        )
+
+    principal = await _claims_principal(token_data)
+    if principal is None:
+        user = await _load_user(db, token_data.sub)
+        if not user:
+            raise HTTPException(status_code=404, detail="找不到使用者")
+        principal = Principal.from_user(user)
+    if not principal.is_active:
+        raise HTTPException(status_code=400, detail="使用者帳號已被停用")
+    return principal
+
+async def get_current_superuser_principal(
+    principal: Principal = Depends(get_current_principal),
+) -> Principal:
+    if not principal.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, 
+            detail="權限不足，需要管理員權限"
+        )
+    return principal
+
+async def get_current_principal_optional(
+    db: AsyncSession = Depends(get_async_db), 
+    token: str = Depends(reusable_oauth2_optional)
+) -> Optional[Principal]:
+    if not token:
+        return None
+
+    try:
+        token_data = _decode_token(token)
+    except (jwt.JWTError, ValidationError):
+        return None
+
+    principal = await _claims_principal(token_data)
+    if principal is None:
+        user = await _load_user(db, token_data.sub)
+        if not user:
+            return None
+        principal = Principal.from_user(user)
+    return principal if principal.is_active else None
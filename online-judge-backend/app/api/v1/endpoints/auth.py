@@ -2,6 +2,7 @@ from datetime import timedelta
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, Body, Request
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import secrets
 import string
@@ -14,12 +15,12 @@ from app.core.config import settings
 router = APIRouter()
 
 @router.post("/login/access-token", response_model=schemas.Token)
-def login_access_token(
+async def login_access_token(
     request: Request,
-    db: Session = Depends(deps.get_db), 
+    db: AsyncSession = Depends(deps.get_async_db), 
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
-    user = crud.user.authenticate(
+    user = await crud.user.authenticate_async(
         db, email=form_data.username, password=form_data.password
     )
     if not user:
@@ -29,12 +30,14 @@ def login_access_token(
         
     # Record IP address
     if request.client and request.client.host:
-        crud.user.update(db, db_obj=user, obj_in={"last_login_ip": request.client.host})
+        await crud.user.record_login_async(db, db_obj=user, ip=request.client.host)
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     return {
         "access_token": security.create_access_token(
-            user.id, expires_delta=access_token_expires
+            user.id,
+            expires_delta=access_token_expires,
+            claims={"act": bool(user.is_active), "su": bool(user.is_superuser)},
         ),
         "token_type": "bearer",
     }
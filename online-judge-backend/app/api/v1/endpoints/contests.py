@@ -1,37 +1,46 @@
 from typing import Any, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.api import deps
+from app.core.principal import Principal
+from app.core.response_cache import response_cache, CONTESTS
+from app.core.pagination import NEXT_CURSOR_HEADER, next_cursor
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.ContestOut])
-def read_contests(
-    db: Session = Depends(deps.get_db),
+async def read_contests(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
     type: Optional[str] = None,
-    current_user: Optional[models.User] = Depends(deps.get_current_user_optional),
+    cursor: Optional[str] = None,
+    current_user: Optional[Principal] = Depends(deps.get_current_principal_optional),
 ) -> Any:
     """
     Retrieve contests.
+    Pass `cursor` (empty for the first page) to page by keyset instead of skip.
     """
-    query = db.query(models.Contest)
-    
-    
-    # Filter by type
-    if type:
-        query = query.filter(models.Contest.type == type)
-        
     # Filter by visibility (Admins see all, others see only visible)
-    if not (current_user and current_user.is_superuser):
-        query = query.filter(models.Contest.is_visible == True)
-        
-    return query.offset(skip).limit(limit).all()
+    visible_only = not (current_user and current_user.is_superuser)
+    try:
+        contests = await crud.contest.get_multi_async(
+            db, skip=skip, limit=limit, type=type, visible_only=visible_only, cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if cursor is not None:
+        token = next_cursor(contests, limit, "id")
+        if token:
+            response.headers[NEXT_CURSOR_HEADER] = token
+    return contests
 
 @router.post("/", response_model=schemas.ContestOut)
 def create_contest(
@@ -44,18 +53,19 @@ def create_contest(
     Create new contest.
     """
     contest = crud.contest.create(db=db, obj_in=contest_in, created_by_id=current_user.id)
+    response_cache.invalidate(CONTESTS)
     return contest
 
 @router.get("/{contest_id}", response_model=schemas.ContestOut)
-def read_contest(
+async def read_contest(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     contest_id: UUID,
 ) -> Any:
     """
     Get contest by ID.
     """
-    contest = crud.contest.get(db=db, id=contest_id)
+    contest = await crud.contest.get_async(db=db, id=contest_id)
     if not contest:
         raise HTTPException(status_code=404, detail="Contest not found")
     return contest
@@ -75,6 +85,7 @@ def update_contest(
     if not contest:
         raise HTTPException(status_code=404, detail="Contest not found")
     contest = crud.contest.update(db=db, db_obj=contest, obj_in=contest_in)
+    response_cache.invalidate(CONTESTS)
     return contest
 
 @router.delete("/{contest_id}", response_model=schemas.ContestOut)
@@ -91,4 +102,5 @@ def delete_contest(
     if not contest:
         raise HTTPException(status_code=404, detail="Contest not found")
     contest = crud.contest.remove(db=db, id=contest_id)
+    response_cache.invalidate(CONTESTS)
     return contest
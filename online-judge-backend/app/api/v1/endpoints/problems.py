@@ -1,51 +1,62 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
+from typing import Any, List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app import crud, models, schemas
 from app.api import deps
+from app.core.principal import Principal
+from app.core.response_cache import response_cache, PROBLEMS, CONTESTS, LEADERBOARD
+from app.services.problem import problem_service
+from app.services.test_case_archive import ArchiveError, read_test_case_archive, write_test_case_archive
+from app.core.pagination import NEXT_CURSOR_HEADER, next_cursor
+from app.core.test_data import test_data_store
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.services.problem_package import stage_package, write_problem_package
+from app.worker.tasks import import_problem_package, judge_submission
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.ProblemOut])
-def read_problems(
-    db: Session = Depends(deps.get_db),
+@router.get("/", response_model=List[schemas.ProblemSummaryOut])
+async def read_problems(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: Optional[models.User] = Depends(deps.get_current_user_optional),
+    cursor: Optional[str] = None,
+    current_user: Optional[Principal] = Depends(deps.get_current_principal_optional),
 ) -> Any:
-    """Retrieve problems."""
-    problems = crud.problem.get_multi(db, skip=skip, limit=limit)
+    """Retrieve problems. Pass `cursor` (empty for the first page) to page by keyset."""
+    try:
+        problems = await crud.problem.get_multi_async(db, skip=skip, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if cursor is not None:
+        token = next_cursor(problems, limit, "id")
+        if token:
+            response.headers[NEXT_CURSOR_HEADER] = token
     
     # Check problem status for current user
     if current_user:
-        user_subs = db.query(models.Submission).filter(
-            models.Submission.user_id == current_user.id
-        ).all()
-        
-        # Determine status per problem
-        status_map = {}
-        for sub in user_subs:
-            pid = sub.problem_id
-            if status_map.get(pid) == "Accepted":
-                continue
-            if sub.status == "Accepted":
-                status_map[pid] = "Accepted"
-            else:
-                status_map[pid] = "Attempted"
-                
+        status_map = await crud.submission.get_status_map_async(
+            db, user_id=current_user.id, problem_ids=[p.id for p in problems]
+        )
+
         # Attach user_status to response objects
         result = []
         for p in problems:
-            p_dict = schemas.ProblemOut.model_validate(p).model_dump()
+            p_dict = schemas.ProblemSummaryOut.model_validate(p).model_dump()
             p_dict['user_status'] = status_map.get(p.id)
             result.append(p_dict)
         return result
         
     return problems
 
-@router.post("/", response_model=schemas.ProblemOut, status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=schemas.ProblemAdminOut, status_code=status.HTTP_201_CREATED)
 async def create_problem(
     *,
     db: Session = Depends(deps.get_db),
@@ -58,9 +69,11 @@ async def create_problem(
     difficulty: str = Form("Easy"),
     is_active: bool = Form(True),
     is_special_judge: bool = Form(False),
+    is_interactive: bool = Form(False),
     is_partial: bool = Form(False),
     main_file: Optional[UploadFile] = File(None),
     header_file: Optional[UploadFile] = File(None),
+    interactor_file: Optional[UploadFile] = File(None),
     tags: Optional[str] = Form(None), # Comma separated
     current_user: models.User = Depends(deps.get_current_active_superuser),
 ) -> Any:
@@ -74,6 +87,11 @@ async def create_problem(
     if header_file:
         content = await header_file.read()
         header_code = content.decode().replace('\r\n', '\n')
+
+    interactor_code = None
+    if interactor_file:
+        content = await interactor_file.read()
+        interactor_code = content.decode().replace('\r\n', '\n')
     
     # Process tags
     tag_list = []
@@ -93,6 +111,8 @@ async def create_problem(
         difficulty=difficulty,
         is_active=is_active,
         is_special_judge=is_special_judge,
+        is_interactive=is_interactive,
+        interactor_code=interactor_code,
         is_partial=is_partial,
         main_code=main_code,
         header_code=header_code
@@ -102,24 +122,26 @@ async def create_problem(
     # Add tags
     if tag_list:
         problem.tags = tag_list
+        problem.version = models.Problem.version + 1
         db.commit()
         db.refresh(problem)
         
+    await response_cache.invalidate_async(PROBLEMS)
     return problem
 
 @router.get("/{problem_id}", response_model=schemas.ProblemOut)
-def read_problem(
+async def read_problem(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     problem_id: UUID,
 ) -> Any:
     """Get problem by ID."""
-    problem = crud.problem.get(db, id=problem_id)
-    if not problem:
+    body = await problem_service.get_detail_json(db, problem_id=problem_id)
+    if body is None:
         raise HTTPException(status_code=404, detail="Problem not found")
-    return problem
+    return Response(content=body, media_type="application/json")
 
-@router.put("/{problem_id}", response_model=schemas.ProblemOut)
+@router.put("/{problem_id}", response_model=schemas.ProblemAdminOut)
 async def update_problem(
     *,
     db: Session = Depends(deps.get_db),
@@ -133,9 +155,11 @@ async def update_problem(
     difficulty: Optional[str] = Form(None),
     is_active: Optional[bool] = Form(None),
     is_special_judge: Optional[bool] = Form(None),
+    is_interactive: Optional[bool] = Form(None),
     is_partial: Optional[bool] = Form(None),
     main_file: Optional[UploadFile] = File(None),
     header_file: Optional[UploadFile] = File(None),
+    interactor_file: Optional[UploadFile] = File(None),
     tags: Optional[str] = Form(None),
     current_user: models.User = Depends(deps.get_current_active_superuser),
 ) -> Any:
@@ -155,6 +179,7 @@ async def update_problem(
         "difficulty": difficulty,
         "is_active": is_active,
         "is_special_judge": is_special_judge,
+        "is_interactive": is_interactive,
         "is_partial": is_partial,
     }.items():
         if value is not None:
@@ -167,6 +192,10 @@ async def update_problem(
     if header_file:
         content = await header_file.read()
         update_data["header_code"] = content.decode().replace('\r\n', '\n')
+
+    if interactor_file:
+        content = await interactor_file.read()
+        update_data["interactor_code"] = content.decode().replace('\r\n', '\n')
     
     problem_in = schemas.ProblemUpdate(**update_data)
     problem = crud.problem.update(db, db_obj=problem, obj_in=problem_in)
@@ -179,12 +208,14 @@ async def update_problem(
             tag_obj = crud.tag.get_or_create(db, name=name)
             tag_list.append(tag_obj)
         problem.tags = tag_list
+        problem.version = models.Problem.version + 1
         db.commit()
         db.refresh(problem)
         
+    await response_cache.invalidate_async(PROBLEMS, CONTESTS)
     return problem
 
-@router.delete("/{problem_id}", response_model=schemas.ProblemOut)
+@router.delete("/{problem_id}", response_model=schemas.ProblemAdminOut)
 def delete_problem(
     *,
     db: Session = Depends(deps.get_db),
@@ -195,7 +226,91 @@ def delete_problem(
     problem = crud.problem.get(db, id=problem_id)
     if not problem:
         raise HTTPException(status_code=404, detail="Problem not found")
-    return crud.problem.remove(db, id=problem_id)
+    problem = crud.problem.remove(db, id=problem_id)
+    response_cache.invalidate(PROBLEMS, CONTESTS, LEADERBOARD)
+    return problem
+
+@router.post("/{problem_id}/rejudge", response_model=dict, status_code=status.HTTP_202_ACCEPTED)
+def rejudge_problem(
+    *,
+    db: Session = Depends(deps.get_db),
+    problem_id: UUID,
+    differential: bool = True,
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Re-queue every judged submission of a problem (Admin only). A differential
+    rejudge only runs the tests whose data or limits changed since a
+    submission's last run and rescores from the stored per-test results;
+    differential=false runs everything again.
+    """
+    problem = crud.problem.get(db, id=problem_id)
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+
+    submission_ids = crud.submission.reset_for_rejudge(db, problem_id=problem_id)
+    # On the low-priority queue, behind live submissions
+    for submission_id in submission_ids:
+        judge_submission.apply_async(
+            (str(submission_id), differential), queue=settings.JUDGE_SYSTEM_TEST_QUEUE
+        )
+    response_cache.invalidate(PROBLEMS, CONTESTS, LEADERBOARD)
+    return {"success": True, "submissions": len(submission_ids), "differential": differential}
+
+# Problem Package Endpoints
+
+@router.post("/packages/import", response_model=dict, status_code=status.HTTP_202_ACCEPTED)
+async def import_package(
+    *,
+    package: UploadFile = File(...),
+    problem_id: Optional[UUID] = Form(None),
+    db: Session = Depends(deps.get_db),
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Import a problem package (Admin only). Creates a new problem, or overwrites
+    `problem_id` if given. The import runs on a worker; poll /packages/jobs/{job_id}.
+    """
+    if problem_id and not crud.problem.get(db, id=problem_id):
+        raise HTTPException(status_code=404, detail="Problem not found")
+
+    path = await run_in_threadpool(stage_package, package.file, settings.PACKAGE_STAGING_DIR)
+    task = import_problem_package.delay(path, str(problem_id) if problem_id else None)
+    return {"success": True, "job_id": task.id}
+
+@router.get("/packages/jobs/{job_id}", response_model=dict)
+def read_package_job(
+    job_id: str,
+    current_user: Principal = Depends(deps.get_current_superuser_principal),
+) -> Any:
+    """Status of a package import: PENDING, STARTED, SUCCESS (with result) or FAILURE (with error)."""
+    job = celery_app.AsyncResult(job_id)
+    result = {"job_id": job_id, "status": job.state}
+    if job.successful():
+        result["result"] = job.result
+    elif job.failed():
+        result["error"] = str(job.result)
+    return result
+
+@router.get("/{problem_id}/package")
+def export_package(
+    *,
+    db: Session = Depends(deps.get_db),
+    problem_id: UUID,
+    compress: bool = False,
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """Download a problem with its code files and tests as a package (Admin only)."""
+    problem = crud.problem.get(db, id=problem_id)
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+
+    test_cases = crud.test_case.get_by_problem(db, problem_id=problem_id, skip=0, limit=None)
+    return StreamingResponse(
+        write_problem_package(problem, test_cases, test_data_store, compress=compress),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="problem_{problem_id}.zip"'},
+    )
 
 # Test Case Endpoints
 
@@ -216,42 +331,165 @@ async def create_test_case(
     if not problem:
         raise HTTPException(status_code=404, detail="Problem not found")
     
-    # Read and normalize EOL
-    input_content = await input_file.read()
-    output_content = await output_file.read()
-    
-    input_data = input_content.decode().replace('\r\n', '\n')
-    output_data = output_content.decode().replace('\r\n', '\n')
+    # Stream into the test data store, normalizing EOL on the way
+    input_hash, input_size = await run_in_threadpool(test_data_store.write_file, input_file.file)
+    output_hash, output_size = await run_in_threadpool(test_data_store.write_file, output_file.file)
     
     test_case_in = schemas.TestCaseCreate(
-        input_data=input_data,
-        output_data=output_data,
+        input_hash=input_hash,
+        input_size=input_size,
+        output_hash=output_hash,
+        output_size=output_size,
         group=group,
         points=points,
         is_sample=is_sample
     )
     
-    return crud.test_case.create(db, obj_in=test_case_in, problem_id=problem_id)
+    test_case = crud.test_case.create(db, obj_in=test_case_in, problem_id=problem_id)
+    await response_cache.invalidate_async(PROBLEMS)
+    return test_case
 
-@router.get("/{problem_id}/test_cases", response_model=List[schemas.TestCaseOut])
+@router.post("/{problem_id}/test_cases/import", response_model=dict, status_code=status.HTTP_201_CREATED)
+def import_test_cases(
+    *,
+    db: Session = Depends(deps.get_db),
+    problem_id: UUID,
+    archive: UploadFile = File(...),
+    group: int = Form(1),
+    points: int = Form(0),
+    replace: bool = Form(False),
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Import test cases from a zip / tar(.gz) archive of *.in / *.out pairs (Admin only).
+    An optional manifest.json sets group / points / is_sample per test name;
+    `group` and `points` are the defaults for tests it doesn't list.
+    """
+    problem = crud.problem.get(db, id=problem_id)
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+
+    try:
+        archived = read_test_case_archive(
+            archive.file, archive.filename or "", test_data_store,
+            default_group=group, default_points=points,
+        )
+    except ArchiveError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    test_cases_in = [
+        schemas.TestCaseCreate(
+            input_hash=tc.input_hash,
+            input_size=tc.input_size,
+            output_hash=tc.output_hash,
+            output_size=tc.output_size,
+            group=tc.group,
+            points=tc.points,
+            is_sample=tc.is_sample,
+        ) for tc in archived
+    ]
+    crud.test_case.create_many(db, objs_in=test_cases_in, problem_id=problem_id, replace=replace)
+    response_cache.invalidate(PROBLEMS)
+
+    return {
+        "success": True,
+        "created_count": len(test_cases_in),
+        "replaced": replace,
+        "names": [tc.name for tc in archived],
+    }
+
+@router.get("/{problem_id}/test_cases/export")
+def export_test_cases(
+    *,
+    db: Session = Depends(deps.get_db),
+    problem_id: UUID,
+    compress: bool = False,
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Download all test cases of a problem as a zip (Admin only).
+    The archive is streamed from the test data store as it is built and can be
+    fed back into /test_cases/import unchanged.
+    """
+    problem = crud.problem.get(db, id=problem_id)
+    if not problem:
+        raise HTTPException(status_code=404, detail="Problem not found")
+
+    # Store-backed rows carry no inline text, so this only loads metadata for them
+    test_cases = crud.test_case.get_by_problem(db, problem_id=problem_id, skip=0, limit=None)
+    return StreamingResponse(
+        write_test_case_archive(test_cases, test_data_store, compress=compress),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="problem_{problem_id}_tests.zip"'},
+    )
+
+@router.get("/{problem_id}/test_cases/{test_case_id}/{kind}")
+def download_test_case_file(
+    *,
+    db: Session = Depends(deps.get_db),
+    problem_id: UUID,
+    test_case_id: UUID,
+    kind: str,
+    current_user: models.User = Depends(deps.get_current_user),
+) -> Any:
+    """Download the input or output file of one test case (samples only for normal users)."""
+    if kind not in ("input", "output"):
+        raise HTTPException(status_code=404, detail="Not found")
+    tc = crud.test_case.get(db, id=test_case_id)
+    if not tc or tc.problem_id != problem_id or (not current_user.is_superuser and not tc.is_sample):
+        raise HTTPException(status_code=404, detail="Test case not found")
+
+    digest = tc.input_hash if kind == "input" else tc.output_hash
+    filename = f"{test_case_id}.{'in' if kind == 'input' else 'out'}"
+    if digest:
+        return FileResponse(test_data_store.path(digest), media_type="text/plain", filename=filename)
+    return PlainTextResponse(
+        (tc.input_data if kind == "input" else tc.output_data) or "",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+@router.get(
+    "/{problem_id}/test_cases",
+    response_model=Union[List[schemas.TestCaseMetaOut], List[schemas.TestCaseOut]],
+)
 def read_test_cases(
     *,
     db: Session = Depends(deps.get_db),
     problem_id: UUID,
     skip: int = 0,
     limit: int = 100,
+    include_data: bool = False,
     current_user: models.User = Depends(deps.get_current_user),
 ) -> Any:
-    """List test cases for a problem (filter samples for normal users)."""
+    """
+    List test cases for a problem (filter samples for normal users).
+    Only metadata and sizes by default; pass include_data=true to inline the
+    input / output text, or fetch files via /test_cases/{id}/input|output.
+    """
     problem = crud.problem.get(db, id=problem_id)
     if not problem:
         raise HTTPException(status_code=404, detail="Problem not found")
-        
-    test_cases_all = crud.test_case.get_by_problem(db, problem_id=problem_id, skip=skip, limit=limit)
-    if not current_user.is_superuser:
-        test_cases_all = [tc for tc in test_cases_all if tc.is_sample]
-        
-    return test_cases_all
+
+    samples_only = not current_user.is_superuser
+    if not include_data:
+        test_cases_meta = crud.test_case.get_meta_by_problem(
+            db, problem_id=problem_id, skip=skip, limit=limit, samples_only=samples_only
+        )
+        return [schemas.TestCaseMetaOut.model_validate(tc) for tc in test_cases_meta]
+
+    test_cases_all = crud.test_case.get_by_problem(
+        db, problem_id=problem_id, skip=skip, limit=limit, samples_only=samples_only
+    )
+
+    result = []
+    for tc in test_cases_all:
+        tc_out = schemas.TestCaseOut.model_validate(tc)
+        if tc.input_hash:
+            tc_out.input_data = test_data_store.read_text(tc.input_hash)
+        if tc.output_hash:
+            tc_out.output_data = test_data_store.read_text(tc.output_hash)
+        result.append(tc_out)
+    return result
 
 @router.delete("/{problem_id}/test_cases/{test_case_id}", response_model=schemas.TestCaseOut)
 def delete_test_case(
@@ -270,20 +508,19 @@ def delete_test_case(
     if not tc_obj or tc_obj.problem_id != problem_id:
         raise HTTPException(status_code=404, detail="Test case not found")
         
-    return crud.test_case.remove(db, id=test_case_id)
+    test_case = crud.test_case.remove(db, id=test_case_id)
+    response_cache.invalidate(PROBLEMS)
+    return test_case
 
 @router.get("/{problem_id}/leaderboard")
-def read_problem_leaderboard(
+async def read_problem_leaderboard(
     problem_id: UUID,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 10,
 ) -> Any:
     """Get Top Coders leaderboard for a specific problem."""
-    accepted_subs = db.query(models.Submission).filter(
-        models.Submission.problem_id == problem_id, 
-        models.Submission.status == "Accepted"
-    ).all()
+    accepted_subs = await crud.submission.get_accepted_by_problem_async(db, problem_id=problem_id)
     
     best_per_user = {}
     for sub in accepted_subs:
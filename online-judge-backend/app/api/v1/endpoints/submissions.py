@@ -1,10 +1,14 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app import crud, models, schemas
 from app.api import deps
+from app.core.principal import Principal
+from app.core.pagination import NEXT_CURSOR_HEADER, next_cursor
 from app.worker.tasks import judge_submission
 
 router = APIRouter()
@@ -14,7 +18,7 @@ def create_submission(
     *,
     db: Session = Depends(deps.get_db),
     submission_in: schemas.SubmissionCreate,
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
     Create a new submission.
@@ -26,46 +30,99 @@ def create_submission(
     
     return submission
 
-@router.get("/me", response_model=List[schemas.SubmissionOut])
-def read_my_submissions(
-    db: Session = Depends(deps.get_db),
+@router.get("/me", response_model=List[schemas.SubmissionListOut])
+async def read_my_submissions(
+    response: Response,
+    db: AsyncSession = Depends(deps.get_async_db),
     problem_id: Optional[UUID] = None,
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_user),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
     Retrieve current user's submissions.
+    The X-Next-Cursor response header can be passed back as `cursor` for the next page.
     """
-    submissions = crud.submission.get_by_user(db=db, user_id=current_user.id, problem_id=problem_id, skip=skip, limit=limit)
+    try:
+        submissions = await crud.submission.get_by_user_async(db=db, user_id=current_user.id, problem_id=problem_id, skip=skip, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    token = next_cursor(submissions, limit, "created_at", "id")
+    if token:
+        response.headers[NEXT_CURSOR_HEADER] = token
     return submissions
 
-@router.get("/", response_model=List[schemas.SubmissionOut])
+@router.get("/", response_model=List[schemas.SubmissionListOut])
 def read_submissions(
+    response: Response,
     db: Session = Depends(deps.get_db),
     problem_id: Optional[UUID] = None,
     user_id: Optional[UUID] = None,
     skip: int = 0,
     limit: int = 100,
-    current_user: models.User = Depends(deps.get_current_active_superuser),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(deps.get_current_superuser_principal),
 ) -> Any:
     """
     Retrieve all submissions (Admin only).
+    The X-Next-Cursor response header can be passed back as `cursor` for the next page.
     """
-    submissions = crud.submission.get_multi(db, problem_id=problem_id, user_id=user_id, skip=skip, limit=limit)
+    try:
+        submissions = crud.submission.get_multi(db, problem_id=problem_id, user_id=user_id, skip=skip, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    token = next_cursor(submissions, limit, "created_at", "id")
+    if token:
+        response.headers[NEXT_CURSOR_HEADER] = token
     return submissions
 
+# Keeps one bulk code request (and its response) bounded
+MAX_BULK_CODE_IDS = 500
+
+@router.post("/code", response_model=Dict[UUID, str])
+def read_submission_codes(
+    db: Session = Depends(deps.get_db),
+    ids: List[UUID] = Body(..., embed=True),
+    current_user: Principal = Depends(deps.get_current_superuser_principal),
+) -> Any:
+    """
+    Source code of many submissions at once, {id: code} (Admin only).
+    The list endpoint leaves code out; this saves one request per row on bulk downloads.
+    """
+    if len(ids) > MAX_BULK_CODE_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_CODE_IDS} ids per request")
+    return crud.submission.get_codes(db, ids=ids)
+
+@router.get("/timings", response_model=List[dict])
+async def read_judge_timings(
+    db: AsyncSession = Depends(deps.get_async_db),
+    problem_id: Optional[UUID] = None,
+    hours: int = Query(24, ge=1, le=24 * 90),
+    by_problem: bool = False,
+    limit: int = Query(20, ge=1, le=200),
+    current_user: Principal = Depends(deps.get_current_superuser_principal),
+) -> Any:
+    """
+    Judge latency percentiles per stage over the last `hours` (Admin only).
+    With by_problem, one row per problem, slowest p99 first.
+    """
+    since = datetime.now(timezone.utc) - timedelta(hours=hours)
+    return await crud.submission.get_stage_timings_async(
+        db, since=since, problem_id=problem_id, by_problem=by_problem, limit=limit
+    )
+
 @router.get("/{id}", response_model=schemas.SubmissionOut)
-def read_submission(
+async def read_submission(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     id: UUID,
-    current_user: models.User = Depends(deps.get_current_user),
+    current_user: Principal = Depends(deps.get_current_principal),
 ) -> Any:
     """
     Get submission by ID.
     """
-    submission = crud.submission.get(db=db, id=id)
+    submission = await crud.submission.get_async(db=db, id=id)
     if not submission:
         raise HTTPException(status_code=404, detail="Submission not found")
     if not current_user.is_superuser and (submission.user_id != current_user.id):
@@ -1,22 +1,34 @@
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app import crud, schemas, models
 from app.api import deps
+from app.core import security
+from app.core.pagination import NEXT_CURSOR_HEADER, next_cursor
+from app.core.principal import Principal
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.UserOut])
 def read_users(
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     current_user: models.User = Depends(deps.get_current_active_superuser),
 ) -> Any:
     """取得所有使用者"""
-    users = crud.user.get_multi(db, skip=skip, limit=limit)
+    try:
+        users = crud.user.get_multi(db, skip=skip, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    token = next_cursor(users, limit, "created_at", "id")
+    if token:
+        response.headers[NEXT_CURSOR_HEADER] = token
     return users
 
 @router.post("/", response_model=schemas.UserOut, status_code=status.HTTP_201_CREATED)
@@ -35,27 +47,41 @@ def create_user(
     return crud.user.create(db, obj_in=user_in)
 
 @router.post("/bulk", response_model=dict, status_code=status.HTTP_201_CREATED)
-def create_users_bulk(
+async def create_users_bulk(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     users_in: List[schemas.UserCreate],
-    current_user: models.User = Depends(deps.get_current_active_superuser),
+    current_user: Principal = Depends(deps.get_current_superuser_principal),
 ) -> Any:
     """大量註冊新帳號 (僅限管理員)"""
-    created_count = 0
     errors = []
-    
+
+    # One query for every conflict with existing rows; the sets then also
+    # catch duplicates inside the uploaded batch itself.
+    taken_emails, taken_usernames = await crud.user.get_taken_async(
+        db,
+        emails=[u.email for u in users_in],
+        usernames=[u.username for u in users_in],
+    )
+
+    to_create = []
     for i, user_in in enumerate(users_in):
-        if crud.user.get_by_email(db, email=user_in.email):
+        if user_in.email in taken_emails:
             errors.append(f"Row {i+1}: Email {user_in.email} already registered.")
             continue
             
-        if db.query(models.User).filter(models.User.username == user_in.username).first():
+        if user_in.username in taken_usernames:
             errors.append(f"Row {i+1}: Username {user_in.username} already taken.")
             continue
-            
-        crud.user.create(db, obj_in=user_in)
-        created_count += 1
+
+        taken_emails.add(user_in.email)
+        taken_usernames.add(user_in.username)
+        to_create.append(user_in)
+
+    hashed_passwords = await security.get_password_hashes([u.password for u in to_create])
+    created_count = await crud.user.create_many_async(
+        db, objs_in=to_create, hashed_passwords=hashed_passwords
+    )
         
     return {
         "success": True,
@@ -70,7 +96,7 @@ def read_user_me(
     """取得當前登入使用者的資訊"""
     return current_user
 
-from sqlalchemy import func
+from sqlalchemy import func, select
 
 @router.get("/me/stats")
 def read_user_stats(
@@ -117,13 +143,13 @@ def read_user_stats(
     }
 
 @router.get("/rankings")
-def read_users_rankings(
-    db: Session = Depends(deps.get_db),
+async def read_users_rankings(
+    db: AsyncSession = Depends(deps.get_async_db),
     skip: int = 0,
     limit: int = 100
 ) -> Any:
     """取得排行榜"""
-    user_stats = db.query(
+    stmt = select(
         models.User.id,
         models.User.username,
         models.User.avatar_url,
@@ -131,7 +157,8 @@ def read_users_rankings(
     ).outerjoin(models.Submission, (models.Submission.user_id == models.User.id) & (models.Submission.status == "Accepted"))\
      .group_by(models.User.id)\
      .order_by(func.count(func.distinct(models.Submission.problem_id)).desc())\
-     .offset(skip).limit(limit).all()
+     .offset(skip).limit(limit)
+    user_stats = (await db.execute(stmt)).all()
      
     return [
         {
@@ -1,4 +1,5 @@
 from celery import Celery
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
 from app.core.config import settings
 
 celery_app = Celery(
@@ -10,10 +11,63 @@ celery_app = Celery(
 celery_app.autodiscover_tasks(["app.worker"])
 
 celery_app.conf.update(
-    task_track_started=True,
+    # Judge verdicts live in Postgres: by default a task writes nothing to the
+    # result backend (no STARTED / SUCCESS records, no result pub/sub for the
+    # caller). Tasks whose result is read opt back in.
+    task_ignore_result=True,
+    task_track_started=False,
+    result_expires=86400,
     task_serializer='json',
     accept_content=['json'],
     result_serializer='json',
     timezone='Asia/Taipei',
     enable_utc=True,
-)
\ No newline at end of file
+    # Judge tasks are acked late: take one at a time so a dying worker only
+    # holds one unacked message, and redeliver within the hour. Queues are
+    # consumed in the order given to -Q, so system tests (JUDGE_SYSTEM_TEST_QUEUE,
+    # listed last) only run when no fresh submission is waiting.
+    worker_prefetch_multiplier=1,
+    broker_transport_options={"visibility_timeout": 3600, "queue_order_strategy": "priority"},
+    beat_schedule={
+        "reap-stale-submissions": {
+            "task": "app.worker.tasks.reap_stale_submissions",
+            "schedule": settings.JUDGE_REAPER_INTERVAL_SECONDS,
+        },
+        "prune-test-results": {
+            "task": "app.worker.tasks.prune_test_results",
+            "schedule": 86400,
+        },
+    },
+)
+
+if settings.JUDGE_CPU_PINNING:
+    from app.worker.cpus import worker_concurrency
+    # One pool process per judge core, unless -c / --concurrency says otherwise
+    celery_app.conf.worker_concurrency = worker_concurrency()
+
+
+@worker_init.connect
+def start_metrics_exporter(sender=None, **kwargs):
+    if settings.METRICS_ENABLED and settings.WORKER_METRICS_PORT:
+        from app.core.metrics import start_worker_exporter
+        start_worker_exporter(settings.WORKER_METRICS_PORT, capacity=getattr(sender, "concurrency", 1) or 1)
+
+
+@worker_init.connect
+def calibrate_judge(sender=None, **kwargs):
+    # Before the pool forks, so every child shares one measurement
+    from app.core.metrics import JUDGE_SPEED_FACTOR
+    from app.worker.calibration import calibrate
+    JUDGE_SPEED_FACTOR.set(calibrate())
+
+
+@worker_process_init.connect
+def lease_judge_core(**kwargs):
+    from app.worker.cpus import current_lease
+    current_lease()
+
+
+@worker_process_shutdown.connect
+def mark_metrics_process_dead(pid=None, **kwargs):
+    from app.core.metrics import mark_process_dead
+    mark_process_dead(pid)
@@ -34,6 +34,18 @@ class Settings(BaseSettings):
     POSTGRES_PORT: int = 5432
     DATABASE_URL: str
 
+    # Connection pool, shared by the sync and async engines
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        scheme, rest = self.DATABASE_URL.split("://", 1)
+        return f"postgresql+asyncpg://{rest}" if scheme.startswith("postgres") else self.DATABASE_URL
+
     REDIS_URL: str
 
     SECRET_KEY: str
@@ -42,6 +54,97 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 11520
     ENV: str = "development"
 
+    # bcrypt work: bulk imports hash in a process pool, logins verify on a
+    # bounded thread pool so a login storm can't take every request thread
+    PASSWORD_HASH_WORKERS: Optional[int] = None  # defaults to the CPU count
+    LOGIN_VERIFY_CONCURRENCY: int = 4
+
+    # Public GET responses: "memory" (per process), "redis" (shared) or "off".
+    # Only "redis" lets the judge invalidate leaderboards on new verdicts.
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_SIZE: int = 2048
+
+    # Content-addressed test case files, shared by the API and the workers
+    TEST_DATA_DIR: str = "data/test_cases"
+    # Uploaded problem packages waiting for a worker to import them (also shared)
+    PACKAGE_STAGING_DIR: str = "data/packages"
+
+    # "isolate", or "local" for an unsandboxed subprocess with rlimits
+    # (development and benchmarks only: it does not contain untrusted code)
+    SANDBOX_BACKEND: str = "isolate"
+
+    # Time limits are scaled by this host's speed relative to a reference host:
+    # JUDGE_CALIBRATION_REFERENCE_MS is the calibration score measured there
+    # (every worker logs its own at startup); JUDGE_SPEED_FACTOR pins the factor
+    JUDGE_CALIBRATION: bool = False
+    JUDGE_CALIBRATION_REFERENCE_MS: Optional[float] = None
+    JUDGE_SPEED_FACTOR: Optional[float] = None
+    # Runs over the limit by at most this much are re-run; the fastest run counts
+    JUDGE_TLE_RERUN_MARGIN_PCT: float = 10.0
+    JUDGE_TLE_RERUNS: int = 2
+
+    # Pin each sandbox run to a core of its own (cpu-list syntax, "2-7,10"; by
+    # default every core but the housekeeping ones). The worker processes, the
+    # compiler and output comparison stay on JUDGE_HOUSEKEEPING_CPUS (default:
+    # the first core). Worker concurrency defaults to the number of judge cores.
+    JUDGE_CPU_PINNING: bool = False
+    JUDGE_CPUS: Optional[str] = None
+    JUDGE_HOUSEKEEPING_CPUS: Optional[str] = None
+
+    # A judge holds a lease on the submission it judges and renews it as tests
+    # run; reap_stale_submissions (celery beat) re-queues rows whose lease ran
+    # out, failing them as System Error after JUDGE_MAX_ATTEMPTS claims.
+    # JUDGE_CHECKPOINTS saves per-test results with each renewal so a retry resumes.
+    JUDGE_LEASE_SECONDS: int = 120
+    JUDGE_MAX_ATTEMPTS: int = 3
+    JUDGE_REAPER_INTERVAL_SECONDS: int = 60
+    JUDGE_CHECKPOINTS: bool = False
+
+    # Give an identical submission (same problem version, tests, language and
+    # code) the earlier verdict without running it; contests can opt out
+    JUDGE_REUSE_VERDICTS: bool = True
+    # Store each test run by (executable, test data, limits) hash, so a
+    # differential rejudge only runs the tests that changed
+    JUDGE_TEST_RESULT_CACHE: bool = True
+    JUDGE_TEST_RESULT_TTL_DAYS: int = 30
+    # Judge in two phases on problems with at least JUDGE_PRETEST_MIN_TESTS
+    # tests: the samples and the first JUDGE_PRETEST_COUNT other tests give an
+    # interim "Pretests Passed", then the rest run from JUDGE_SYSTEM_TEST_QUEUE,
+    # which workers drain after the main queue. A row left at the interim
+    # verdict for JUDGE_SYSTEM_TEST_TIMEOUT_SECONDS is re-queued by the reaper.
+    # Problem rejudges are queued on JUDGE_SYSTEM_TEST_QUEUE too.
+    JUDGE_PRETESTS: bool = False
+    JUDGE_PRETEST_COUNT: int = 5
+    JUDGE_PRETEST_MIN_TESTS: int = 20
+    JUDGE_SYSTEM_TEST_QUEUE: str = "judge_system"
+    JUDGE_SYSTEM_TEST_TIMEOUT_SECONDS: int = 3600
+    # Interactive problems run the interactor in box (judge box + offset), so
+    # isolate's num_boxes must cover both ranges. It gets the submission's CPU
+    # time limit and this memory limit.
+    JUDGE_INTERACTOR_BOX_OFFSET: int = 1000
+    JUDGE_INTERACTOR_MEMORY_MB: int = 256
+
+    # Prometheus: /metrics on the API, and a per-worker exporter (0 disables it)
+    METRICS_ENABLED: bool = True
+    WORKER_METRICS_PORT: int = 9808
+
+    # Per-request SQL profiling: "off", "log", or "headers" (X-DB-* response headers, dev only)
+    SQL_PROFILING: str = "off"
+    SQL_SLOW_QUERY_MS: int = 200
+    SQL_SLOW_REQUEST_MS: int = 500
+    SQL_REPEAT_THRESHOLD: int = 20
+    SQL_PROFILE_SAMPLE_RATE: float = 1.0
+
+    # Pre-serialized problem detail JSON, keyed by (problem id, version)
+    PROBLEM_STATEMENT_CACHE_SIZE: int = 512
+    PROBLEM_STATEMENT_CACHE_TTL_SECONDS: int = 3600
+
+    # Authenticated user lookups, and how long a process may go on trusting
+    # token claims after they were revoked (users.tokens_valid_after)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_REDIS: bool = False
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,10 @@
+# Judge pipeline stages, in order: keys of Submission.timings. Timed by the
+# worker (app/worker/timing.py) and aggregated by the submissions CRUD.
+QUEUE = "queue"
+INIT = "init"
+COMPILE = "compile"
+PREPARE = "prepare"
+RUN = "run"
+COMPARE = "compare"
+DB = "db"
+STAGES = (QUEUE, INIT, COMPILE, PREPARE, RUN, COMPARE, DB)
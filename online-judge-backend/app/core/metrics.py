@@ -0,0 +1,177 @@
+import logging
+import os
+import time
+from typing import Dict, List, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess, start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.routing import Match
+
+logger = logging.getLogger(__name__)
+
+# Celery's prefork children and multi-worker uvicorn need prometheus_client's
+# multiprocess mode: set PROMETHEUS_MULTIPROC_DIR to an empty directory
+# before the processes start.
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+# --- API ---
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "API request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+# --- Database ---
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds", "Time spent getting a connection from the pool (waits show up in the tail)",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30),
+)
+
+# --- Judge worker ---
+JUDGE_IN_FLIGHT = Gauge("judge_in_flight", "Submissions being judged right now", multiprocess_mode="livesum")
+SANDBOX_BOXES_IN_USE = Gauge("sandbox_boxes_in_use", "Sandbox boxes currently initialized", multiprocess_mode="livesum")
+SANDBOX_BOX_CAPACITY = Gauge("sandbox_box_capacity", "Boxes a worker can run at once (its concurrency)", multiprocess_mode="max")
+JUDGE_STAGE_SECONDS = Histogram(
+    "judge_stage_duration_seconds", "Wall time per judge stage, per submission",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+JUDGE_VERDICTS = Counter("judge_verdicts_total", "Final verdicts", ["language", "verdict"])
+JUDGE_COMPILE_CACHE = Counter("judge_compile_cache_requests_total", "Compilations by cache result", ["result"])
+JUDGE_VERDICT_REUSE = Counter("judge_verdict_reuse_total", "Submissions by verdict reuse lookup result", ["result"])
+JUDGE_TEST_RESULT_CACHE = Counter("judge_test_result_cache_total", "Differential rejudge test lookups by result", ["result"])
+JUDGE_SPEED_FACTOR = Gauge("judge_speed_factor", "Time limit scale factor from host calibration", multiprocess_mode="max")
+JUDGE_TLE_RERUNS = Counter("judge_tle_reruns_total", "Borderline time limit runs that were re-run")
+
+
+class TimedQueuePool(QueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels("sync").observe(time.perf_counter() - start)
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels("async").observe(time.perf_counter() - start)
+
+
+class _StateCollector:
+    """Gauges read at scrape time: pool occupancy and Celery queue lengths."""
+
+    def __init__(self, engines: Dict[str, object], queues: List[str]):
+        self.engines = engines
+        self.queues = queues
+
+    def describe(self):
+        # Without this, registering the collector calls collect() (and Redis) to learn its names
+        return []
+
+    def collect(self):
+        pools = GaugeMetricFamily("db_pool_connections", "Pool connections by state", labels=["pool", "state"])
+        for name, engine in self.engines.items():
+            pool = engine.pool
+            pools.add_metric([name, "checked_out"], pool.checkedout())
+            pools.add_metric([name, "idle"], pool.checkedin())
+            pools.add_metric([name, "overflow"], max(pool.overflow(), 0))
+            pools.add_metric([name, "size"], pool.size())
+        yield pools
+
+        queues = GaugeMetricFamily("celery_queue_length", "Tasks waiting in the broker", labels=["queue"])
+        try:
+            from app.core.cache import get_redis
+            client = get_redis()
+            for queue in self.queues:
+                queues.add_metric([queue], client.llen(queue))
+        except Exception as e:
+            logger.warning(f"Queue length scrape failed: {e}")
+        yield queues
+
+
+_state_collector = None
+
+
+def register_state_collector(engines: Dict[str, object], queues: List[str]) -> None:
+    global _state_collector
+    _state_collector = _StateCollector(engines, queues)
+    if not MULTIPROCESS:
+        REGISTRY.register(_state_collector)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        if _state_collector is not None:
+            registry.register(_state_collector)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def start_worker_exporter(port: int, capacity: int) -> None:
+    """Serve /metrics for a worker (all of its pool children) on `port`."""
+    SANDBOX_BOX_CAPACITY.set(capacity)
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        start_http_server(port, registry=registry)
+    else:
+        start_http_server(port)
+
+
+def mark_process_dead(pid: int) -> None:
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
+
+
+def _route_template(scope) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Responses served before routing (e.g. response cache hits)
+    app = scope.get("app")
+    for candidate in getattr(getattr(app, "router", None), "routes", []):
+        match, _ = candidate.matches(scope)
+        if match == Match.FULL:
+            return getattr(candidate, "path", "unmatched")
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Records request latency per route template; plain ASGI so it sees every response."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(scope["method"], _route_template(scope), str(status)).observe(
+                time.perf_counter() - start
+            )
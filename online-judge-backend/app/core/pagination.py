@@ -0,0 +1,79 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _serialize(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row of a page into an opaque token."""
+    raw = json.dumps([_serialize(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """Decode a token produced by encode_cursor back into typed column values.
+
+    Raises ValueError if the token is malformed or does not match the columns.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Invalid cursor")
+
+    typed = []
+    for value, column in zip(values, columns):
+        python_type = column.type.python_type
+        if value is None:
+            typed.append(None)
+        elif python_type is datetime:
+            typed.append(datetime.fromisoformat(value))
+        elif python_type is UUID:
+            typed.append(UUID(value))
+        else:
+            typed.append(python_type(value))
+    return typed
+
+
+def apply_keyset(
+    query: Any, columns: Sequence[Any], cursor: Optional[str], descending: bool = False
+) -> Any:
+    """Order a Query or Select by `columns` and, if a cursor is given, seek past it.
+
+    The seek predicate is expanded as (a > x) OR (a = x AND b > y) ... so that it
+    can use a composite index on the same columns in the same direction.
+    """
+    query = query.order_by(*[c.desc() if descending else c.asc() for c in columns])
+    if not cursor:
+        return query
+
+    values = decode_cursor(cursor, columns)
+    clauses = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        prefix = [columns[j] == values[j] for j in range(i)]
+        step = column < value if descending else column > value
+        clauses.append(and_(*prefix, step))
+    return query.filter(or_(*clauses))
+
+
+def next_cursor(items: Sequence[Any], limit: int, *attrs: str) -> Optional[str]:
+    """Cursor for the page after `items`, or None if this was the last page."""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(*[getattr(last, attr) for attr in attrs])
@@ -0,0 +1,175 @@
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.cache import TTLCache, get_async_redis, get_redis
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Everything UserOut needs; the password hash never leaves the database.
+_USER_FIELDS = (
+    "id", "username", "email", "is_active", "is_superuser",
+    "avatar_url", "signature", "last_login_ip", "created_at", "updated_at",
+)
+_DATETIME_FIELDS = ("created_at", "updated_at")
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller as far as authorization is concerned."""
+    id: UUID
+    is_active: bool
+    is_superuser: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, is_active=bool(user.is_active), is_superuser=bool(user.is_superuser))
+
+
+def _dump(user: User) -> Dict[str, Any]:
+    data = {}
+    for field in _USER_FIELDS:
+        value = getattr(user, field)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, UUID):
+            value = str(value)
+        data[field] = value
+    return data
+
+
+def _load(data: Dict[str, Any]) -> User:
+    data = dict(data)
+    data["id"] = UUID(data["id"])
+    for field in _DATETIME_FIELDS:
+        if data.get(field):
+            data[field] = datetime.fromisoformat(data[field])
+    user = User(**data)
+    # Give it an identity key so a Session treats it as an existing row
+    make_transient_to_detached(user)
+    return user
+
+
+class PrincipalCache:
+    """
+    Short-TTL cache of users by id in front of the users table, in-process
+    and optionally shared through Redis (PRINCIPAL_CACHE_REDIS).
+
+    Also tracks per-user revocation times: a token whose embedded active /
+    superuser claims were issued before the last change to those flags must
+    not be trusted on its own. The revocation time is stored on the user row
+    (users.tokens_valid_after); the caches in front of it only hold it for
+    PRINCIPAL_CACHE_TTL_SECONDS, so every process sees a revocation within
+    that time, and an evicted or restarted cache falls back to the row.
+    """
+
+    def __init__(self):
+        self._users = TTLCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+        # user id -> revocation time (0.0 for none; None marks a deleted user)
+        self._revoked = TTLCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
+
+    @staticmethod
+    def _user_key(user_id: UUID) -> str:
+        return f"principal:user:{user_id}"
+
+    @staticmethod
+    def _revoked_key(user_id: UUID) -> str:
+        return f"principal:revoked:{user_id}"
+
+    async def get_user(self, user_id: UUID) -> Optional[User]:
+        data = self._users.get(user_id)
+        if data is None and settings.PRINCIPAL_CACHE_REDIS:
+            try:
+                raw = await get_async_redis().get(self._user_key(user_id))
+            except Exception as e:
+                logger.warning(f"Principal cache read failed: {e}")
+                raw = None
+            if raw:
+                data = json.loads(raw)
+                self._users.set(user_id, data)
+        return _load(data) if data is not None else None
+
+    async def set_user(self, user: User) -> None:
+        data = _dump(user)
+        self._users.set(user.id, data)
+        if settings.PRINCIPAL_CACHE_REDIS:
+            try:
+                await get_async_redis().set(
+                    self._user_key(user.id), json.dumps(data), ex=settings.PRINCIPAL_CACHE_TTL_SECONDS
+                )
+            except Exception as e:
+                logger.warning(f"Principal cache write failed: {e}")
+
+    async def _load_revoked_at(self, user_id: UUID) -> Optional[float]:
+        async with AsyncSessionLocal() as db:
+            row = (await db.execute(
+                select(User.id, User.tokens_valid_after).where(User.id == user_id)
+            )).first()
+        if row is None:
+            return None
+        return row.tokens_valid_after.timestamp() if row.tokens_valid_after else 0.0
+
+    async def is_revoked(self, user_id: UUID, issued_at: int) -> bool:
+        try:
+            revoked_at = self._revoked.get(user_id)
+            if revoked_at is None and settings.PRINCIPAL_CACHE_REDIS:
+                raw = await get_async_redis().get(self._revoked_key(user_id))
+                if raw:
+                    revoked_at = float(raw)
+            if revoked_at is None:
+                revoked_at = await self._load_revoked_at(user_id)
+                if revoked_at is None:
+                    # Deleted user
+                    return True
+                if settings.PRINCIPAL_CACHE_REDIS:
+                    await get_async_redis().set(
+                        self._revoked_key(user_id), revoked_at, ex=settings.PRINCIPAL_CACHE_TTL_SECONDS
+                    )
+            self._revoked.set(user_id, revoked_at)
+        except Exception as e:
+            # Can't prove the claims are current, so don't trust them
+            logger.warning(f"Principal revocation check failed: {e}")
+            return True
+        return issued_at <= revoked_at
+
+    def invalidate(self, user_id: UUID, revoke_claims: bool = False) -> None:
+        """
+        Drop the cached user; with revoke_claims, also drop the cached
+        revocation time (the caller has just moved users.tokens_valid_after).
+        """
+        self._users.delete(user_id)
+        if revoke_claims:
+            self._revoked.delete(user_id)
+        if settings.PRINCIPAL_CACHE_REDIS:
+            try:
+                client = get_redis()
+                client.delete(self._user_key(user_id))
+                if revoke_claims:
+                    client.delete(self._revoked_key(user_id))
+            except Exception as e:
+                logger.error(f"Principal cache invalidation failed: {e}")
+
+    async def invalidate_async(self, user_id: UUID, revoke_claims: bool = False) -> None:
+        self._users.delete(user_id)
+        if revoke_claims:
+            self._revoked.delete(user_id)
+        if settings.PRINCIPAL_CACHE_REDIS:
+            try:
+                client = get_async_redis()
+                await client.delete(self._user_key(user_id))
+                if revoke_claims:
+                    await client.delete(self._revoked_key(user_id))
+            except Exception as e:
+                logger.error(f"Principal cache invalidation failed: {e}")
+
+
+principal_cache = PrincipalCache()
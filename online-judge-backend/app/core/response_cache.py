@@ -0,0 +1,226 @@
+import hashlib
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from jose import jwt
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.cache import TTLCache, get_async_redis, get_redis
+from app.core.config import settings
+from app.core.principal import principal_cache
+
+logger = logging.getLogger(__name__)
+
+# Namespaces that mutations invalidate. LEADERBOARD is also invalidated by the
+# judge on every Accepted verdict, but the worker can only reach the API
+# processes through the redis backend: with the memory backend the rules' TTL
+# is how stale standings may get.
+PROBLEMS = "problems"
+CONTESTS = "contests"
+LEADERBOARD = "leaderboard"
+
+
+@dataclass(frozen=True)
+class CacheRule:
+    path: str                  # route template, e.g. "/problems/{problem_id}"
+    namespaces: Tuple[str, ...]
+    ttl: int
+    anonymous_only: bool = False  # the response embeds per-user data when logged in
+
+    @property
+    def pattern(self) -> "re.Pattern":
+        template = settings.API_V1_STR + self.path
+        return re.compile("^" + re.sub(r"\{[^/]+\}", "[^/]+", template) + "$")
+
+
+RULES: List[CacheRule] = [
+    CacheRule("/problems/", (PROBLEMS,), ttl=30, anonymous_only=True),
+    # No "/problems/{problem_id}" rule: ProblemService caches the statement by
+    # (id, version) and splices in the live counters the judge keeps bumping
+    CacheRule("/problems/{problem_id}/leaderboard", (LEADERBOARD,), ttl=15),
+    CacheRule("/contests/", (CONTESTS,), ttl=60),
+    CacheRule("/contests/{contest_id}", (CONTESTS,), ttl=60),
+    CacheRule("/users/rankings", (LEADERBOARD,), ttl=30),
+]
+_COMPILED = [(rule.pattern, rule) for rule in RULES]
+
+
+def _match(path: str) -> Optional[CacheRule]:
+    for pattern, rule in _COMPILED:
+        if pattern.match(path):
+            return rule
+    return None
+
+
+class ResponseCache:
+    """
+    Stores rendered GET responses keyed by path, query string and caller role.
+
+    Each namespace has a version number that is part of the key, so
+    invalidating a namespace is a single counter bump and stale entries
+    simply age out. Backend is chosen by RESPONSE_CACHE_BACKEND
+    ("memory", "redis" or "off").
+    """
+
+    def __init__(self):
+        self._entries = TTLCache(maxsize=settings.RESPONSE_CACHE_SIZE, ttl=max(r.ttl for r in RULES))
+        self._versions: Dict[str, int] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return settings.RESPONSE_CACHE_BACKEND in ("memory", "redis")
+
+    @property
+    def _use_redis(self) -> bool:
+        return settings.RESPONSE_CACHE_BACKEND == "redis"
+
+    async def versions_for(self, namespaces: Iterable[str]) -> List[str]:
+        namespaces = list(namespaces)
+        if self._use_redis:
+            values = await get_async_redis().mget([f"respcache:version:{ns}" for ns in namespaces])
+            return [f"{ns}:{int(v or 0)}" for ns, v in zip(namespaces, values)]
+        return [f"{ns}:{self._versions.get(ns, 0)}" for ns in namespaces]
+
+    async def get(self, key: str) -> Optional[dict]:
+        if self._use_redis:
+            raw = await get_async_redis().get(f"respcache:entry:{key}")
+            return json.loads(raw) if raw else None
+        return self._entries.get(key)
+
+    async def set(self, key: str, entry: dict, ttl: int) -> None:
+        if self._use_redis:
+            await get_async_redis().set(f"respcache:entry:{key}", json.dumps(entry), ex=ttl)
+        else:
+            self._entries.set(key, entry, ttl=ttl)
+
+    def invalidate(self, *namespaces: str) -> None:
+        """Drop every cached response depending on the namespaces (sync callers)."""
+        if not self.enabled:
+            return
+        for ns in namespaces:
+            if self._use_redis:
+                try:
+                    get_redis().incr(f"respcache:version:{ns}")
+                except Exception as e:
+                    logger.error(f"Response cache invalidation failed: {e}")
+            else:
+                self._versions[ns] = self._versions.get(ns, 0) + 1
+
+    async def invalidate_async(self, *namespaces: str) -> None:
+        if not self.enabled:
+            return
+        for ns in namespaces:
+            if self._use_redis:
+                try:
+                    await get_async_redis().incr(f"respcache:version:{ns}")
+                except Exception as e:
+                    logger.error(f"Response cache invalidation failed: {e}")
+            else:
+                self._versions[ns] = self._versions.get(ns, 0) + 1
+
+
+response_cache = ResponseCache()
+
+
+async def _caller_role(request: Request) -> Optional[str]:
+    """anon / user / admin from the token claims, or None if the response must not be cached."""
+    auth = request.headers.get("authorization", "")
+    if not auth.lower().startswith("bearer "):
+        return "anon"
+    try:
+        payload = jwt.decode(auth[7:], settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except jwt.JWTError:
+        # The endpoints treat a bad token on these routes as anonymous
+        return "anon"
+    su, iat, sub = payload.get("su"), payload.get("iat"), payload.get("sub")
+    if su is None or iat is None or sub is None:
+        return None
+    try:
+        if await principal_cache.is_revoked(UUID(sub), iat):
+            return None
+    except ValueError:
+        return None
+    return "admin" if su else "user"
+
+
+def _not_modified(request: Request, entry: dict) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return entry["etag"] in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(entry["last_modified"]) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _build_response(request: Request, entry: dict, ttl: int, hit: bool) -> Response:
+    headers = {
+        "ETag": entry["etag"],
+        "Last-Modified": formatdate(entry["last_modified"], usegmt=True),
+        "Cache-Control": f"private, max-age={ttl}" if entry.get("private") else f"public, max-age={ttl}",
+        "X-Cache": "HIT" if hit else "MISS",
+    }
+    if _not_modified(request, entry):
+        return Response(status_code=304, headers=headers)
+    headers.update(entry.get("headers", {}))
+    return Response(content=entry["body"].encode(), status_code=200, media_type=entry["media_type"], headers=headers)
+
+
+class ResponseCacheMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        if request.method != "GET" or not response_cache.enabled:
+            return await call_next(request)
+        rule = _match(request.url.path)
+        if rule is None:
+            return await call_next(request)
+
+        role = await _caller_role(request)
+        if role is None or (rule.anonymous_only and role != "anon"):
+            return await call_next(request)
+
+        try:
+            versions = await response_cache.versions_for(rule.namespaces)
+            query = "&".join(sorted(request.url.query.split("&"))) if request.url.query else ""
+            key = hashlib.sha1(
+                "|".join([request.url.path, query, role, *versions]).encode()
+            ).hexdigest()
+            entry = await response_cache.get(key)
+        except Exception as e:
+            logger.warning(f"Response cache unavailable: {e}")
+            return await call_next(request)
+        if entry is not None:
+            return _build_response(request, entry, rule.ttl, hit=True)
+
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        entry = {
+            "body": body.decode(),
+            "media_type": response.media_type or response.headers.get("content-type", "application/json"),
+            "etag": f'W/"{hashlib.sha1(body).hexdigest()}"',
+            "last_modified": time.time(),
+            "private": role != "anon",
+            # e.g. X-Next-Cursor; content-length / type are rebuilt by Response
+            "headers": {
+                k: v for k, v in response.headers.items()
+                if k.lower() not in ("content-length", "content-type")
+            },
+        }
+        try:
+            await response_cache.set(key, entry, rule.ttl)
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+        return _build_response(request, entry, rule.ttl, hit=False)
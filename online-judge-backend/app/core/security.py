@@ -1,5 +1,8 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Dict, List, Optional, Union
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
@@ -12,12 +15,54 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
-def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_verify_pool: Optional[ThreadPoolExecutor] = None
+
+def _get_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    if _hash_pool is None:
+        # spawn: forking a process that is already running the event loop and
+        # DB pool threads is not safe
+        _hash_pool = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _hash_pool
+
+def _get_verify_pool() -> ThreadPoolExecutor:
+    global _verify_pool
+    if _verify_pool is None:
+        # bcrypt releases the GIL, so threads are enough; the bound is what matters
+        _verify_pool = ThreadPoolExecutor(
+            max_workers=settings.LOGIN_VERIFY_CONCURRENCY, thread_name_prefix="pwd-verify"
+        )
+    return _verify_pool
+
+async def get_password_hashes(passwords: List[str]) -> List[str]:
+    """Hash many passwords in parallel across the process pool."""
+    if not passwords:
+        return []
+    loop = asyncio.get_running_loop()
+    pool = _get_hash_pool()
+    return list(await asyncio.gather(
+        *[loop.run_in_executor(pool, get_password_hash, p) for p in passwords]
+    ))
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_verify_pool(), verify_password, plain_password, hashed_password)
+
+def create_access_token(
+    subject: Union[str, Any], expires_delta: timedelta = None, claims: Optional[Dict[str, Any]] = None
+) -> str:
+    now = datetime.utcnow()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {"exp": expire, "iat": now, "sub": str(subject)}
+    if claims:
+        to_encode.update(claims)
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
\ No newline at end of file
@@ -0,0 +1,135 @@
+import logging
+import random
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+_TOP_N = 3
+_STATEMENT_PREVIEW = 300
+
+
+@dataclass
+class RequestProfile:
+    """SQL issued while handling one request."""
+    query_count: int = 0
+    total_ms: float = 0.0
+    slowest: List[Tuple[float, str]] = field(default_factory=list)  # (ms, statement), slowest first
+    statements: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, ms: float) -> None:
+        self.query_count += 1
+        self.total_ms += ms
+        self.statements[statement] += 1
+        if len(self.slowest) < _TOP_N or ms > self.slowest[-1][0]:
+            self.slowest.append((ms, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[_TOP_N:]
+
+    @property
+    def most_repeated(self) -> Tuple[int, str]:
+        """(count, statement) of the statement run most often: an N+1 shows up here."""
+        if not self.statements:
+            return 0, ""
+        statement, count = self.statements.most_common(1)[0]
+        return count, statement
+
+
+_current: ContextVar[Optional[RequestProfile]] = ContextVar("sql_profile", default=None)
+
+
+def _preview(statement: str) -> str:
+    return " ".join(statement.split())[:_STATEMENT_PREVIEW]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("sql_profiler_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("sql_profiler_start")
+    if not starts:
+        return
+    ms = (time.perf_counter() - starts.pop()) * 1000
+
+    profile = _current.get()
+    if profile is not None:
+        profile.record(statement, ms)
+    if ms >= settings.SQL_SLOW_QUERY_MS and random.random() < settings.SQL_PROFILE_SAMPLE_RATE:
+        slow_query_logger.warning(f"Slow query ({ms:.1f} ms): {_preview(statement)}")
+
+
+def install(engines: Iterable) -> None:
+    """Time every statement on the given (sync) engines."""
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SQLProfilerMiddleware:
+    """
+    Per-request SQL accounting, enabled by SQL_PROFILING:
+
+    "headers"  adds X-DB-Query-Count, X-DB-Time-Ms, X-DB-Slowest-Ms and
+               X-DB-Max-Repeats to every response (development only)
+    "log"      logs a summary of sampled requests that spent at least
+               SQL_SLOW_REQUEST_MS in the database or repeated one statement
+               SQL_REPEAT_THRESHOLD times or more
+
+    Individual statements slower than SQL_SLOW_QUERY_MS go to the
+    "app.sql.slow" logger in both modes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        # Statement timings are not something to hand to clients in production
+        self.headers = settings.SQL_PROFILING == "headers" and settings.ENV != "production"
+        self.log = settings.SQL_PROFILING == "log"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+
+        async def send_wrapper(message):
+            if self.headers and message["type"] == "http.response.start":
+                repeats, _ = profile.most_repeated
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-db-query-count", str(profile.query_count).encode()),
+                    (b"x-db-time-ms", f"{profile.total_ms:.1f}".encode()),
+                    (b"x-db-slowest-ms", f"{profile.slowest[0][0]:.1f}".encode() if profile.slowest else b"0"),
+                    (b"x-db-max-repeats", str(repeats).encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if self.log:
+                self._log(scope, profile)
+
+    def _log(self, scope, profile: RequestProfile) -> None:
+        repeats, repeated = profile.most_repeated
+        if profile.total_ms < settings.SQL_SLOW_REQUEST_MS and repeats < settings.SQL_REPEAT_THRESHOLD:
+            return
+        if random.random() >= settings.SQL_PROFILE_SAMPLE_RATE:
+            return
+        lines = [
+            f"{scope['method']} {scope['path']}: {profile.query_count} queries, {profile.total_ms:.1f} ms in DB"
+        ]
+        if repeats >= settings.SQL_REPEAT_THRESHOLD:
+            lines.append(f"  repeated {repeats}x (possible N+1): {_preview(repeated)}")
+        for ms, statement in profile.slowest:
+            lines.append(f"  {ms:8.1f} ms  {_preview(statement)}")
+        slow_query_logger.warning("\n".join(lines))
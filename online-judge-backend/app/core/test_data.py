@@ -0,0 +1,95 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from typing import BinaryIO, Iterable, Iterator, Tuple
+
+from app.core.config import settings
+
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_chunks(fileobj: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def normalize_eol(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Convert CRLF to LF in a byte stream without joining it.
+
+    A chunk ending in CR is held back one byte, in case the next chunk
+    starts with the matching LF.
+    """
+    pending = b""
+    for chunk in chunks:
+        chunk = pending + chunk
+        pending = b""
+        if chunk.endswith(b"\r"):
+            chunk, pending = chunk[:-1], b"\r"
+        if chunk:
+            yield chunk.replace(b"\r\n", b"\n")
+    if pending:
+        yield pending
+
+
+class TestDataStore:
+    """
+    Content-addressed storage for test case files under TEST_DATA_DIR.
+
+    A file lives at <root>/<sha256[:2]>/<sha256>. Identical inputs or outputs,
+    within or across problems, are stored once. Files are never modified in
+    place, so readers need no locking.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.path(digest))
+
+    def write_stream(self, chunks: Iterable[bytes], normalize: bool = True) -> Tuple[str, int]:
+        """Store a byte stream, returning (sha256 hex digest, size in bytes)."""
+        os.makedirs(self.root, exist_ok=True)
+        if normalize:
+            chunks = normalize_eol(chunks)
+
+        sha = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in chunks:
+                    sha.update(chunk)
+                    size += len(chunk)
+                    tmp.write(chunk)
+            digest = sha.hexdigest()
+            final_path = self.path(digest)
+            if os.path.exists(final_path):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                os.replace(tmp_path, final_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return digest, size
+
+    def write_file(self, fileobj: BinaryIO, normalize: bool = True) -> Tuple[str, int]:
+        return self.write_stream(iter_chunks(fileobj), normalize=normalize)
+
+    def read_text(self, digest: str) -> str:
+        with open(self.path(digest), "r", newline="") as f:
+            return f.read()
+
+    def copy_to(self, digest: str, dest: str) -> None:
+        shutil.copyfile(self.path(digest), dest)
+
+
+test_data_store = TestDataStore(settings.TEST_DATA_DIR)
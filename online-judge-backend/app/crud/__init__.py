@@ -4,3 +4,4 @@ from .crud_test_case import test_case
 from .crud_contest import contest
 from .crud_submission import submission
 from .crud_tag import tag
+from .crud_test_result import test_result
\ No newline at end of file
@@ -1,19 +1,66 @@
 from typing import List, Optional, Union, Dict, Any
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from fastapi.encoders import jsonable_encoder
 
 from app.models.contest import Contest, ContestProblem
+from app.models.problem import Problem
 from app.schemas.contest import ContestCreate, ContestUpdate, ContestProblemCreate
+from app.core.pagination import apply_keyset
+
+# ContestOut serializes contest_problems -> problem.title for every contest
+_contest_problems = selectinload(Contest.contest_problems).joinedload(
+    ContestProblem.problem
+).load_only(Problem.id, Problem.title)
 
 class CRUDContest:
+    def _get_stmt(self, id: UUID) -> Select:
+        return select(Contest).options(_contest_problems).where(Contest.id == id)
+
     def get(self, db: Session, id: UUID) -> Optional[Contest]:
-        return db.query(Contest).filter(Contest.id == id).first()
+        return db.scalars(self._get_stmt(id)).first()
+
+    async def get_async(self, db: AsyncSession, id: UUID) -> Optional[Contest]:
+        return (await db.scalars(self._get_stmt(id))).first()
+
+    def _multi_stmt(
+        self, skip: int, limit: int, type: Optional[str], visible_only: bool, cursor: Optional[str]
+    ) -> Select:
+        stmt = select(Contest).options(_contest_problems)
+        if type:
+            stmt = stmt.where(Contest.type == type)
+        if visible_only:
+            stmt = stmt.where(Contest.is_visible == True)
+        # Same as problems: keyset mode pages by id, an empty cursor starts it.
+        if cursor is None:
+            return stmt.offset(skip).limit(limit)
+        return apply_keyset(stmt, [Contest.id], cursor).limit(limit)
 
     def get_multi(
-        self, db: Session, skip: int = 0, limit: int = 100
+        self,
+        db: Session,
+        skip: int = 0,
+        limit: int = 100,
+        *,
+        type: Optional[str] = None,
+        visible_only: bool = False,
+        cursor: Optional[str] = None,
+    ) -> List[Contest]:
+        return db.scalars(self._multi_stmt(skip, limit, type, visible_only, cursor)).all()
+
+    async def get_multi_async(
+        self,
+        db: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        *,
+        type: Optional[str] = None,
+        visible_only: bool = False,
+        cursor: Optional[str] = None,
     ) -> List[Contest]:
-        return db.query(Contest).offset(skip).limit(limit).all()
+        return (await db.scalars(self._multi_stmt(skip, limit, type, visible_only, cursor))).all()
 
     def create(self, db: Session, *, obj_in: ContestCreate, created_by_id: Optional[UUID] = None) -> Contest:
         db_obj = Contest(
@@ -23,6 +70,7 @@ class CRUDContest:
             end_time=obj_in.end_time,
             type=obj_in.type,
             is_active=obj_in.is_active,
+            reuse_verdicts=obj_in.reuse_verdicts,
             created_by_id=created_by_id
         )
         db.add(db_obj)
@@ -1,17 +1,64 @@
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only, selectinload
 from uuid import UUID
 from app.models.problem import Problem
 from app.schemas.problem import ProblemCreate, ProblemUpdate
+from app.core.pagination import apply_keyset
 
 class CRUDProblem:
+    def _get_stmt(self, id: UUID) -> Select:
+        return select(Problem).options(selectinload(Problem.tags)).where(Problem.id == id)
+
     def get(self, db: Session, id: UUID) -> Optional[Problem]:
-        return db.query(Problem).filter(Problem.id == id).first()
+        return db.scalars(self._get_stmt(id)).first()
+
+    async def get_async(self, db: AsyncSession, id: UUID) -> Optional[Problem]:
+        return (await db.scalars(self._get_stmt(id))).first()
+
+    async def get_version_async(self, db: AsyncSession, id: UUID) -> Optional[Row]:
+        """(version, accepted_count, submission_count): what changes without a version bump."""
+        return (await db.execute(
+            select(Problem.version, Problem.accepted_count, Problem.submission_count).where(Problem.id == id)
+        )).first()
+
+    # Columns needed by ProblemSummaryOut; the large text fields stay deferred.
+    _summary_options = (
+        load_only(
+            Problem.id,
+            Problem.title,
+            Problem.difficulty,
+            Problem.time_limit,
+            Problem.memory_limit,
+            Problem.is_active,
+            Problem.is_special_judge,
+            Problem.is_interactive,
+            Problem.is_partial,
+            Problem.accepted_count,
+            Problem.submission_count,
+            Problem.version,
+        ),
+        selectinload(Problem.tags),
+    )
+
+    def _multi_stmt(self, skip: int, limit: int, cursor: Optional[str]) -> Select:
+        stmt = select(Problem).options(*self._summary_options)
+        # Problems have no creation timestamp, keyset mode pages by id.
+        # An empty cursor starts keyset mode from the first page.
+        if cursor is None:
+            return stmt.offset(skip).limit(limit)
+        return apply_keyset(stmt, [Problem.id], cursor).limit(limit)
 
     def get_multi(
-        self, db: Session, skip: int = 0, limit: int = 100
+        self, db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> List[Problem]:
+        return db.scalars(self._multi_stmt(skip, limit, cursor)).all()
+
+    async def get_multi_async(
+        self, db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
     ) -> List[Problem]:
-        return db.query(Problem).offset(skip).limit(limit).all()
+        return (await db.scalars(self._multi_stmt(skip, limit, cursor))).all()
 
     def create(self, db: Session, *, obj_in: ProblemCreate) -> Problem:
         db_obj = Problem(
@@ -26,8 +73,11 @@ class CRUDProblem:
             is_active=obj_in.is_active,
             is_special_judge=obj_in.is_special_judge,
             checker_code=obj_in.checker_code,
+            is_interactive=obj_in.is_interactive,
+            interactor_code=obj_in.interactor_code,
             is_partial=obj_in.is_partial,
             main_code=obj_in.main_code,
+            header_code=obj_in.header_code,
             template_code=obj_in.template_code
         )
         db.add(db_obj)
@@ -42,6 +92,7 @@ class CRUDProblem:
         for field in update_data:
             if hasattr(db_obj, field):
                 setattr(db_obj, field, update_data[field])
+        db_obj.version = Problem.version + 1
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
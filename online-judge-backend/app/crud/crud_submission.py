@@ -1,26 +1,184 @@
-from typing import List, Optional, Any, Dict, Union
-from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import List, Optional, Any, Dict, Tuple, Union
+from sqlalchemy import Select, and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, load_only
 from app.models.submission import Submission
+from app.models.problem import Problem
+from app.models.user import User
 from app.schemas.submission import SubmissionCreate, SubmissionUpdate
+from app.core.pagination import apply_keyset
+from app.core.judge_stages import STAGES, QUEUE
 from uuid import UUID
 
 class CRUDSubmission:
+    # Read queries are built as statements so the sync and async variants share them.
+
+    def _get_stmt(self, id: UUID) -> Select:
+        return select(Submission).options(
+            joinedload(Submission.user), joinedload(Submission.problem)
+        ).where(Submission.id == id)
+
     def get(self, db: Session, id: UUID) -> Optional[Submission]:
-        return db.query(Submission).filter(Submission.id == id).first()
+        return db.scalars(self._get_stmt(id)).first()
+
+    async def get_async(self, db: AsyncSession, id: UUID) -> Optional[Submission]:
+        return (await db.scalars(self._get_stmt(id))).first()
+
+    def _accepted_by_problem_stmt(self, problem_id: UUID) -> Select:
+        return select(Submission).options(
+            load_only(
+                Submission.id,
+                Submission.user_id,
+                Submission.language,
+                Submission.time_used,
+                Submission.memory_used,
+                Submission.created_at,
+            ),
+            joinedload(Submission.user).load_only(User.id, User.username, User.avatar_url),
+        ).where(
+            Submission.problem_id == problem_id,
+            Submission.status == "Accepted",
+        )
+
+    def get_accepted_by_problem(self, db: Session, problem_id: UUID) -> List[Submission]:
+        return db.scalars(self._accepted_by_problem_stmt(problem_id)).all()
+
+    async def get_accepted_by_problem_async(self, db: AsyncSession, problem_id: UUID) -> List[Submission]:
+        return (await db.scalars(self._accepted_by_problem_stmt(problem_id))).all()
+
+    def _status_map_stmt(self, user_id: UUID, problem_ids: List[UUID]) -> Select:
+        return select(Submission.problem_id, Submission.status).where(
+            Submission.user_id == user_id,
+            Submission.problem_id.in_(problem_ids),
+        )
+
+    @staticmethod
+    def _build_status_map(rows) -> Dict[UUID, str]:
+        status_map = {}
+        for pid, status in rows:
+            if status_map.get(pid) == "Accepted":
+                continue
+            status_map[pid] = "Accepted" if status == "Accepted" else "Attempted"
+        return status_map
+
+    def get_status_map(self, db: Session, user_id: UUID, problem_ids: List[UUID]) -> Dict[UUID, str]:
+        """Map problem id -> "Accepted" / "Attempted" for a user, over the given problems only."""
+        if not problem_ids:
+            return {}
+        return self._build_status_map(db.execute(self._status_map_stmt(user_id, problem_ids)).all())
+
+    async def get_status_map_async(self, db: AsyncSession, user_id: UUID, problem_ids: List[UUID]) -> Dict[UUID, str]:
+        if not problem_ids:
+            return {}
+        return self._build_status_map((await db.execute(self._status_map_stmt(user_id, problem_ids))).all())
 
-    def get_by_user(self, db: Session, user_id: UUID, problem_id: Optional[UUID] = None, skip: int = 0, limit: int = 100) -> List[Submission]:
-        query = db.query(Submission).filter(Submission.user_id == user_id)
+    _PERCENTILES = (50, 95, 99)
+
+    def _stage_timings_stmt(
+        self, since: datetime, problem_id: Optional[UUID], by_problem: bool, limit: int
+    ) -> Select:
+        stages = {stage: Submission.timings[stage].as_float() for stage in STAGES}
+        stages["total"] = sum(func.coalesce(expr, 0) for expr in stages.values())
+        columns = [func.count().label("count")]
+        for stage, expr in stages.items():
+            for pct in self._PERCENTILES:
+                columns.append(func.percentile_cont(pct / 100).within_group(expr).label(f"{stage}_p{pct}"))
+
+        stmt = select(*columns).where(
+            Submission.timings[QUEUE].as_float().is_not(None),
+            Submission.created_at >= since,
+        )
+        if problem_id:
+            stmt = stmt.where(Submission.problem_id == problem_id)
+        if by_problem:
+            stmt = (
+                stmt.add_columns(Submission.problem_id)
+                .group_by(Submission.problem_id)
+                .order_by(func.percentile_cont(0.99).within_group(stages["total"]).desc())
+                .limit(limit)
+            )
+        return stmt
+
+    def _build_stage_timings(self, rows) -> List[Dict[str, Any]]:
+        result = []
+        for row in rows:
+            data = row._mapping
+            item = {"count": data["count"], "stages": {}}
+            if "problem_id" in data:
+                item["problem_id"] = data["problem_id"]
+            for stage in (*STAGES, "total"):
+                item["stages"][stage] = {
+                    f"p{pct}_ms": round(data[f"{stage}_p{pct}"] or 0, 1) for pct in self._PERCENTILES
+                }
+            result.append(item)
+        return result
+
+    async def get_stage_timings_async(
+        self,
+        db: AsyncSession,
+        *,
+        since: datetime,
+        problem_id: Optional[UUID] = None,
+        by_problem: bool = False,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """p50 / p95 / p99 judge time per stage, overall or per problem (slowest p99 first)."""
+        stmt = self._stage_timings_stmt(since, problem_id, by_problem, limit)
+        return self._build_stage_timings((await db.execute(stmt)).all())
+
+    # Columns needed by SubmissionListOut; code and details stay deferred.
+    _summary_options = (
+        load_only(
+            Submission.id,
+            Submission.user_id,
+            Submission.problem_id,
+            Submission.contest_id,
+            Submission.language,
+            Submission.status,
+            Submission.total_score,
+            Submission.time_used,
+            Submission.memory_used,
+            Submission.created_at,
+            Submission.updated_at,
+        ),
+        joinedload(Submission.user).load_only(User.id, User.username),
+        joinedload(Submission.problem).load_only(Problem.id, Problem.title),
+    )
+
+    def _paginate(self, stmt: Select, skip: int, limit: int, cursor: Optional[str]) -> Select:
+        stmt = stmt.options(*self._summary_options)
+        # Newest first; id breaks ties between rows created in the same instant.
+        stmt = apply_keyset(stmt, [Submission.created_at, Submission.id], cursor, descending=True)
+        if not cursor:
+            stmt = stmt.offset(skip)
+        return stmt.limit(limit)
+
+    def _by_user_stmt(self, user_id: UUID, problem_id: Optional[UUID], skip: int, limit: int, cursor: Optional[str]) -> Select:
+        stmt = select(Submission).where(Submission.user_id == user_id)
         if problem_id:
-            query = query.filter(Submission.problem_id == problem_id)
-        return query.order_by(Submission.created_at.desc()).offset(skip).limit(limit).all()
+            stmt = stmt.where(Submission.problem_id == problem_id)
+        return self._paginate(stmt, skip, limit, cursor)
 
-    def get_multi(self, db: Session, *, problem_id: Optional[UUID] = None, user_id: Optional[UUID] = None, skip: int = 0, limit: int = 100) -> List[Submission]:
-        query = db.query(Submission)
+    def get_by_user(self, db: Session, user_id: UUID, problem_id: Optional[UUID] = None, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Submission]:
+        return db.scalars(self._by_user_stmt(user_id, problem_id, skip, limit, cursor)).all()
+
+    async def get_by_user_async(self, db: AsyncSession, user_id: UUID, problem_id: Optional[UUID] = None, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Submission]:
+        return (await db.scalars(self._by_user_stmt(user_id, problem_id, skip, limit, cursor))).all()
+
+    def get_multi(self, db: Session, *, problem_id: Optional[UUID] = None, user_id: Optional[UUID] = None, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Submission]:
+        stmt = select(Submission)
         if problem_id:
-            query = query.filter(Submission.problem_id == problem_id)
+            stmt = stmt.where(Submission.problem_id == problem_id)
         if user_id:
-            query = query.filter(Submission.user_id == user_id)
-        return query.order_by(Submission.created_at.desc()).offset(skip).limit(limit).all()
+            stmt = stmt.where(Submission.user_id == user_id)
+        return db.scalars(self._paginate(stmt, skip, limit, cursor)).all()
+
+    def get_codes(self, db: Session, ids: List[UUID]) -> Dict[UUID, str]:
+        """Source code of the given submissions, in one query; unknown ids are left out."""
+        if not ids:
+            return {}
+        return dict(db.execute(select(Submission.id, Submission.code).where(Submission.id.in_(ids))).all())
 
     def create(self, db: Session, *, obj_in: SubmissionCreate, user_id: UUID) -> Submission:
         db_obj = Submission(
@@ -36,14 +194,230 @@ class CRUDSubmission:
         db.refresh(db_obj)
         return db_obj
 
-    def update_status(self, db: Session, submission_id: UUID, status: str) -> Optional[Submission]:
-        submission = db.query(Submission).filter(Submission.id == submission_id).first()
+    def update_status(
+        self, db: Session, submission_id: UUID, status: str, token: Optional[str] = None
+    ) -> Optional[Submission]:
+        query = db.query(Submission).filter(Submission.id == submission_id)
+        if token is not None:
+            query = query.filter(Submission.judge_token == token)
+        submission = query.first()
         if submission:
             submission.status = status
+            if token is not None:
+                submission.judge_token = None
+                submission.judge_lease_expires_at = None
             db.commit()
             db.refresh(submission)
         return submission
 
+    def get_by_judge_key(self, db: Session, *, judge_key: str, exclude_id: UUID) -> Optional[Submission]:
+        """
+        The latest judged submission with this verdict key (see
+        app/worker/dedupe.py). A System Error is the judge's failure, not the
+        code's, so it is never handed on.
+        """
+        stmt = (
+            select(Submission)
+            .options(load_only(
+                Submission.id, Submission.status, Submission.total_score,
+                Submission.time_used, Submission.memory_used, Submission.details,
+            ))
+            .where(
+                Submission.judge_key == judge_key,
+                Submission.id != exclude_id,
+                Submission.status != "System Error",
+            )
+            .order_by(Submission.created_at.desc())
+            .limit(1)
+        )
+        return db.scalars(stmt).first()
+
+    def reset_for_rejudge(self, db: Session, *, problem_id: UUID) -> List[UUID]:
+        """
+        Put a problem's judged submissions back to Pending for a rejudge and
+        take them out of the problem's counters, which the judge adds them
+        back to. Pending / Judging ones are left alone: they are judged
+        against the current tests anyway. Pretest verdicts are reset too, but
+        were never counted; clearing the token stops a system test phase
+        already running from writing a verdict against the old tests.
+        """
+        # Locked, so the counts match exactly the rows that get reset
+        rows = db.execute(
+            select(Submission.id, Submission.status)
+            .where(Submission.problem_id == problem_id, Submission.status.notin_(("Pending", "Judging")))
+            .with_for_update()
+        ).all()
+        if not rows:
+            db.commit()
+            return []
+        # The judge counts every final verdict but compilation and system errors
+        submissions = sum(
+            1 for _, status in rows if status not in ("Compilation Error", "System Error", "Pretests Passed")
+        )
+        accepted = sum(1 for _, status in rows if status == "Accepted")
+        ids = [id for id, _ in rows]
+
+        db.execute(
+            update(Problem)
+            .where(Problem.id == problem_id)
+            .values(
+                submission_count=func.greatest(func.coalesce(Problem.submission_count, 0) - submissions, 0),
+                accepted_count=func.greatest(func.coalesce(Problem.accepted_count, 0) - accepted, 0),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            update(Submission)
+            .where(Submission.id.in_(ids))
+            .values(
+                status="Pending", judge_key=None, judge_checkpoint=None, judge_attempts=0,
+                judge_token=None, judge_lease_expires_at=None,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return ids
+
+    # Judge leases: a worker claims the row with a token and renews it while it
+    # judges; only the token holder may write the result (see app/worker/lease.py).
+
+    def claim(
+        self,
+        db: Session,
+        *,
+        submission_id: UUID,
+        token: str,
+        lease_seconds: int,
+        statuses: Tuple[str, ...] = ("Pending", "Judging"),
+        status: str = "Judging",
+        count_attempt: bool = True,
+    ) -> bool:
+        """
+        Take a submission in one of `statuses` that no judge holds (no token,
+        or its lease ran out), and set it to `status`. `count_attempt` counts
+        the claim towards the reaper's attempt limit.
+        """
+        attempts = func.coalesce(Submission.judge_attempts, 0)
+        stmt = (
+            update(Submission)
+            .where(
+                Submission.id == submission_id,
+                Submission.status.in_(statuses),
+                or_(
+                    Submission.judge_token.is_(None),
+                    Submission.judge_lease_expires_at.is_(None),
+                    Submission.judge_lease_expires_at < func.now(),
+                ),
+            )
+            .values(
+                status=status,
+                judge_token=token,
+                judge_lease_expires_at=func.now() + timedelta(seconds=lease_seconds),
+                judge_attempts=attempts + 1 if count_attempt else attempts,
+            )
+            .returning(Submission.id)
+            .execution_options(synchronize_session=False)
+        )
+        claimed = db.execute(stmt).first() is not None
+        db.commit()
+        return claimed
+
+    def renew_lease(
+        self,
+        db: Session,
+        *,
+        submission_id: UUID,
+        token: str,
+        lease_seconds: int,
+        checkpoint: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        values = {"judge_lease_expires_at": func.now() + timedelta(seconds=lease_seconds)}
+        if checkpoint is not None:
+            values["judge_checkpoint"] = checkpoint
+        stmt = (
+            update(Submission)
+            .where(Submission.id == submission_id, Submission.judge_token == token)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        renewed = db.execute(stmt).rowcount == 1
+        db.commit()
+        return renewed
+
+    def publish_interim(
+        self,
+        db: Session,
+        *,
+        submission_id: UUID,
+        token: str,
+        status: str,
+        time_used: int,
+        memory_used: int,
+        details: List[Dict[str, Any]],
+        timings: Dict[str, float],
+        hold_seconds: int,
+    ) -> bool:
+        """
+        Show an interim verdict (pretests) and hand the row on: the lease is
+        released for the next phase to claim, but the row only counts as stale
+        after `hold_seconds`, so it can wait in a busy queue.
+        """
+        stmt = (
+            update(Submission)
+            .where(Submission.id == submission_id, Submission.judge_token == token)
+            .values(
+                status=status,
+                time_used=time_used,
+                memory_used=memory_used,
+                details=details,
+                timings=timings,
+                judge_token=None,
+                judge_lease_expires_at=func.now() + timedelta(seconds=hold_seconds),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        published = db.execute(stmt).rowcount == 1
+        db.commit()
+        return published
+
+    def reap_stale(self, db: Session, *, lease_seconds: int, max_attempts: int) -> Tuple[List[UUID], List[UUID]]:
+        """
+        Release Judging submissions whose lease ran out, and pretest verdicts
+        whose system tests never ran. Returns (ids put back to Pending for
+        re-queueing, ids given up on as System Error after max_attempts). Rows
+        judged before leases existed have no expiry and count as stale
+        lease_seconds after their last update.
+        """
+        # Plain column comparisons rather than coalesce(), so both branches can
+        # use ix_submissions_judge_lease
+        expired = or_(
+            Submission.judge_lease_expires_at < func.now(),
+            and_(
+                Submission.judge_lease_expires_at.is_(None),
+                Submission.updated_at < func.now() - timedelta(seconds=lease_seconds),
+            ),
+        )
+        stale = (Submission.status.in_(("Judging", "Pretests Passed")), expired)
+        released = {"judge_token": None, "judge_lease_expires_at": None}
+
+        failed = db.execute(
+            update(Submission)
+            .where(*stale, func.coalesce(Submission.judge_attempts, 0) >= max_attempts)
+            .values(status="System Error", judge_checkpoint=None, **released)
+            .returning(Submission.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        # The checkpoint stays, so the next attempt resumes from it
+        requeued = db.execute(
+            update(Submission)
+            .where(*stale)
+            .values(status="Pending", **released)
+            .returning(Submission.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        db.commit()
+        return list(requeued), list(failed)
+
     def update_result(
         self, 
         db: Session, 
@@ -52,15 +426,34 @@ class CRUDSubmission:
         total_score: int, 
         time_used: int, 
         memory_used: int, 
-        details: List[Dict[str, Any]]
+        details: List[Dict[str, Any]],
+        timings: Optional[Dict[str, float]] = None,
+        token: Optional[str] = None,
+        judge_key: Optional[str] = None,
+        commit: bool = True
     ) -> Optional[Submission]:
-        submission = db.query(Submission).filter(Submission.id == submission_id).first()
+        """With `token`, only writes (and releases the lease) if that judge still holds it."""
+        query = db.query(Submission).filter(Submission.id == submission_id)
+        if token is not None:
+            # Locked so the reaper can't release the lease between check and commit
+            query = query.filter(Submission.judge_token == token).with_for_update()
+        submission = query.first()
         if submission:
             submission.status = status
             submission.total_score = total_score
             submission.time_used = time_used
             submission.memory_used = memory_used
             submission.details = details
+            if timings is not None:
+                submission.timings = timings
+            if judge_key is not None:
+                submission.judge_key = judge_key
+            if token is not None:
+                submission.judge_token = None
+                submission.judge_lease_expires_at = None
+                submission.judge_checkpoint = None
+            if not commit:
+                return submission
             db.commit()
             db.refresh(submission)
         return submission
@@ -1,5 +1,5 @@
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from uuid import UUID
 from app.models.test_case import TestCase
 from app.schemas.test_case import TestCaseCreate, TestCaseUpdate
@@ -8,25 +8,64 @@ class CRUDTestCase:
     def get(self, db: Session, id: UUID) -> Optional[TestCase]:
         return db.query(TestCase).filter(TestCase.id == id).first()
 
+    def _by_problem(self, db: Session, problem_id: UUID, samples_only: bool):
+        query = db.query(TestCase).filter(TestCase.problem_id == problem_id)
+        if samples_only:
+            query = query.filter(TestCase.is_sample.is_(True))
+        return query
+
     def get_by_problem(
-        self, db: Session, problem_id: UUID, skip: int = 0, limit: int = 100
+        self, db: Session, problem_id: UUID, skip: int = 0, limit: Optional[int] = 100, samples_only: bool = False
     ) -> List[TestCase]:
-        return db.query(TestCase).filter(TestCase.problem_id == problem_id).offset(skip).limit(limit).all()
+        return self._by_problem(db, problem_id, samples_only).offset(skip).limit(limit).all()
 
-    def create(self, db: Session, *, obj_in: TestCaseCreate, problem_id: UUID) -> TestCase:
-        db_obj = TestCase(
+    def get_meta_by_problem(
+        self, db: Session, problem_id: UUID, skip: int = 0, limit: Optional[int] = 100, samples_only: bool = False
+    ) -> List[TestCase]:
+        """Like get_by_problem, but never loads legacy inline input/output text."""
+        return (
+            self._by_problem(db, problem_id, samples_only)
+            .options(load_only(
+                TestCase.id, TestCase.problem_id, TestCase.group, TestCase.points, TestCase.is_sample,
+                TestCase.input_hash, TestCase.output_hash, TestCase.input_size, TestCase.output_size,
+            ))
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def _build(self, obj_in: TestCaseCreate, problem_id: UUID) -> TestCase:
+        return TestCase(
             problem_id=problem_id,
             input_data=obj_in.input_data,
             output_data=obj_in.output_data,
+            input_hash=obj_in.input_hash,
+            output_hash=obj_in.output_hash,
+            input_size=obj_in.input_size,
+            output_size=obj_in.output_size,
             group=obj_in.group,
             points=obj_in.points,
             is_sample=obj_in.is_sample
         )
+
+    def create(self, db: Session, *, obj_in: TestCaseCreate, problem_id: UUID) -> TestCase:
+        db_obj = self._build(obj_in, problem_id)
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    def create_many(
+        self, db: Session, *, objs_in: List[TestCaseCreate], problem_id: UUID, replace: bool = False
+    ) -> List[TestCase]:
+        """Insert many test cases (optionally replacing the existing ones) in one transaction."""
+        if replace:
+            db.query(TestCase).filter(TestCase.problem_id == problem_id).delete(synchronize_session=False)
+        db_objs = [self._build(obj_in, problem_id) for obj_in in objs_in]
+        db.add_all(db_objs)
+        db.commit()
+        return db_objs
+
     def update(
         self, db: Session, *, db_obj: TestCase, obj_in: TestCaseUpdate
     ) -> TestCase:
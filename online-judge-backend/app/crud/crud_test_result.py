@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Any, Dict, List
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.models.test_result import TestResult
+
+class CRUDTestResult:
+    def get_many(self, db: Session, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        if not keys:
+            return {}
+        rows = db.execute(select(TestResult.key, TestResult.result).where(TestResult.key.in_(keys))).all()
+        return {key: result for key, result in rows}
+
+    def save_many(self, db: Session, results: Dict[str, Dict[str, Any]]) -> None:
+        """Insert in one statement; a key that is already there keeps its first result."""
+        if not results:
+            return
+        stmt = insert(TestResult).values(
+            [{"key": key, "result": result} for key, result in results.items()]
+        ).on_conflict_do_nothing(index_elements=[TestResult.key])
+        db.execute(stmt)
+        db.commit()
+
+    def prune(self, db: Session, *, older_than: datetime) -> int:
+        deleted = db.execute(delete(TestResult).where(TestResult.created_at < older_than)).rowcount
+        db.commit()
+        return deleted
+
+test_result = CRUDTestResult()
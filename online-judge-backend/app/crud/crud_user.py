@@ -1,19 +1,44 @@
+from datetime import datetime, timezone
+from sqlalchemy import insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional, Union, Dict, Any
+from typing import List, Optional, Set, Tuple, Union, Dict, Any
 from uuid import UUID
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash, verify_password, verify_password_async
+from app.core.pagination import apply_keyset
+from app.core.principal import principal_cache
 
 class CRUDUser:
     def get(self, db: Session, id: UUID) -> Optional[User]:
         return db.query(User).filter(User.id == id).first()
 
+    async def get_async(self, db: AsyncSession, id: UUID) -> Optional[User]:
+        return (await db.scalars(select(User).where(User.id == id))).first()
+
     def get_by_email(self, db: Session, email: str) -> Optional[User]:
         return db.query(User).filter(User.email == email).first()
 
-    def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[User]:
-        return db.query(User).offset(skip).limit(limit).all()
+    async def get_by_email_async(self, db: AsyncSession, email: str) -> Optional[User]:
+        return (await db.scalars(select(User).where(User.email == email))).first()
+
+    async def get_taken_async(
+        self, db: AsyncSession, *, emails: List[str], usernames: List[str]
+    ) -> Tuple[Set[str], Set[str]]:
+        """Which of the given emails / usernames already exist, in one query."""
+        rows = (await db.execute(
+            select(User.email, User.username).where(
+                or_(User.email.in_(emails), User.username.in_(usernames))
+            )
+        )).all()
+        return {r.email for r in rows}, {r.username for r in rows}
+
+    def get_multi(self, db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[User]:
+        query = apply_keyset(db.query(User), [User.created_at, User.id], cursor)
+        if not cursor:
+            query = query.offset(skip)
+        return query.limit(limit).all()
 
     def create(self, db: Session, *, obj_in: UserCreate) -> User:
         db_obj = User(
@@ -27,6 +52,38 @@ class CRUDUser:
         db.refresh(db_obj)
         return db_obj
 
+    async def create_many_async(
+        self, db: AsyncSession, *, objs_in: List[UserCreate], hashed_passwords: List[str]
+    ) -> int:
+        """Insert already-validated users in a single batched INSERT."""
+        if not objs_in:
+            return 0
+        await db.execute(insert(User), [
+            {
+                "email": obj_in.email,
+                "username": obj_in.username,
+                "hashed_password": hashed,
+                "is_superuser": obj_in.is_superuser,
+            }
+            for obj_in, hashed in zip(objs_in, hashed_passwords)
+        ])
+        await db.commit()
+        return len(objs_in)
+
+    async def authenticate_async(self, db: AsyncSession, *, email: str, password: str) -> Optional[User]:
+        user = await self.get_by_email_async(db, email=email)
+        if not user:
+            return None
+        if not await verify_password_async(password, user.hashed_password):
+            return None
+        return user
+
+    async def record_login_async(self, db: AsyncSession, *, db_obj: User, ip: str) -> User:
+        db_obj.last_login_ip = ip
+        await db.commit()
+        await principal_cache.invalidate_async(db_obj.id)
+        return db_obj
+
     def authenticate(self, db: Session, *, email: str, password: str) -> Optional[User]:
         user = self.get_by_email(db, email=email)
         if not user:
@@ -40,6 +97,12 @@ class CRUDUser:
             update_data = obj_in
         else:
             update_data = obj_in.model_dump(exclude_unset=True)
+
+        # Tokens carry is_active / is_superuser claims; a password change also
+        # should not leave old tokens on the fast path.
+        revoke_claims = any(
+            update_data.get(field) is not None for field in ("is_active", "is_superuser", "password")
+        )
         
         if update_data.get("password"):
             hashed_password = get_password_hash(update_data["password"])
@@ -49,16 +112,20 @@ class CRUDUser:
         for field in update_data:
             if hasattr(db_obj, field):
                 setattr(db_obj, field, update_data[field])
+        if revoke_claims:
+            db_obj.tokens_valid_after = datetime.now(timezone.utc)
         
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        principal_cache.invalidate(db_obj.id, revoke_claims=revoke_claims)
         return db_obj
 
     def remove(self, db: Session, *, id: UUID) -> User:
         obj = db.query(User).get(id)
         db.delete(obj)
         db.commit()
+        principal_cache.invalidate(id, revoke_claims=True)
         return obj
 
 user = CRUDUser()
\ No newline at end of file
@@ -4,3 +4,4 @@ from app.models.problem import Problem
 from app.models.test_case import TestCase
 from app.models.contest import Contest, ContestProblem
 from app.models.tag import Tag
+from app.models.test_result import TestResult
@@ -1,13 +1,22 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from starlette.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.response_cache import ResponseCacheMiddleware
+from app.core.celery_app import celery_app
+from app.core.metrics import MetricsMiddleware, register_state_collector, render_metrics
+from app.core import sql_profiler
+from app.db.session import async_engine, engine
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json"
 )
 
+# Added before CORS so cached responses still pass through it
+app.add_middleware(ResponseCacheMiddleware)
+
 # Set all CORS enabled origins
 if settings.BACKEND_CORS_ORIGINS:
     is_wildcard = settings.BACKEND_CORS_ORIGINS == ["*"]
@@ -17,12 +26,30 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=not is_wildcard,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Last-Modified"],
     )
 
 @app.get("/health", tags=["Health"])
 async def health_check():
     return {"status": "ok", "message": "Server is running."}
 
+if settings.SQL_PROFILING in ("log", "headers"):
+    sql_profiler.install([engine, async_engine.sync_engine])
+    app.add_middleware(sql_profiler.SQLProfilerMiddleware)
+
+if settings.METRICS_ENABLED:
+    # Outermost, so cache hits and CORS preflights are timed too
+    app.add_middleware(MetricsMiddleware)
+    queues = [celery_app.conf.task_default_queue] + [q.name for q in celery_app.conf.task_queues or []]
+    if settings.JUDGE_SYSTEM_TEST_QUEUE not in queues:
+        queues.append(settings.JUDGE_SYSTEM_TEST_QUEUE)
+    register_state_collector({"sync": engine, "async": async_engine.sync_engine}, queues)
+
+    @app.get("/metrics", tags=["Health"], include_in_schema=False)
+    def metrics():
+        body, content_type = render_metrics()
+        return Response(content=body, media_type=content_type)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 from fastapi.staticfiles import StaticFiles
@@ -3,4 +3,5 @@ from .problem import Problem
 from .test_case import TestCase
 from .contest import Contest, ContestProblem
 from .submission import Submission
-from .tag import Tag
\ No newline at end of file
+from .tag import Tag
+from .test_result import TestResult
\ No newline at end of file
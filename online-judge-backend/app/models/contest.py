@@ -42,6 +42,9 @@ class Contest(Base):
     
     is_active = Column(Boolean, default=True)
     is_visible = Column(Boolean, default=True)
+    # Identical submissions (same problem version, tests, language and code)
+    # reuse an earlier verdict; off re-runs each one, for timing fairness
+    reuse_verdicts = Column(Boolean, default=True, nullable=False, server_default="true")
     
     created_by_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
     
@@ -37,6 +37,11 @@ class Problem(Base):
     # Special Judge support
     is_special_judge = Column(Boolean, default=False)
     checker_code = Column(Text, nullable=True)
+
+    # Interactive problems: the interactor (C++) talks to the submission over
+    # stdin / stdout and judges each test itself
+    is_interactive = Column(Boolean, default=False, nullable=False, server_default="false")
+    interactor_code = Column(Text, nullable=True)
     
     # Partial Code / Template support
     is_partial = Column(Boolean, default=False)
@@ -47,6 +52,9 @@ class Problem(Base):
     # Statistics
     accepted_count = Column(Integer, default=0, nullable=False, server_default="0")
     submission_count = Column(Integer, default=0, nullable=False, server_default="0")
+
+    # Bumped on every statement / limits / tags change; keys cached renderings
+    version = Column(Integer, default=1, nullable=False, server_default="1")
     
     created_at = Column(
         UUID(as_uuid=True), 
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Integer, ForeignKey, JSON, DateTime, Text
+from sqlalchemy import Column, String, Integer, ForeignKey, JSON, DateTime, Text, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
@@ -22,6 +22,18 @@ class Submission(Base):
     memory_used = Column(Integer, default=0) # kb
     
     details = Column(JSON, nullable=True) # Detailed test case results
+    timings = Column(JSON, nullable=True) # Judge wall time per stage in ms, see app/core/judge_stages.py
+
+    # Judge lease, see app/worker/lease.py: the judge holding judge_token owns the
+    # row until judge_lease_expires_at; judge_checkpoint holds the per-test
+    # results of an unfinished judge so a retry can resume
+    judge_token = Column(String, nullable=True)
+    judge_lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+    judge_attempts = Column(Integer, default=0, nullable=False, server_default="0")
+    judge_checkpoint = Column(JSON, nullable=True)
+    # Hash of everything the verdict depends on (app/worker/dedupe.py), set
+    # once judged; an identical later submission reuses this one's result
+    judge_key = Column(String(64), nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -37,3 +49,35 @@ class Submission(Base):
     @property
     def username(self):
         return self.user.username if self.user else "Unknown User"
+
+# Composite indexes matching the listing / ranking access patterns.
+# Keep in sync with alembic revision 6596364e2e3f.
+Index("ix_submissions_user_id_created_at", Submission.user_id, Submission.created_at.desc())
+Index("ix_submissions_problem_id_created_at", Submission.problem_id, Submission.created_at.desc())
+Index("ix_submissions_created_at", Submission.created_at.desc())
+Index("ix_submissions_problem_id_status", Submission.problem_id, Submission.status)
+Index(
+    "ix_submissions_contest_id_created_at",
+    Submission.contest_id,
+    Submission.created_at.desc(),
+    postgresql_where=Submission.contest_id.isnot(None),
+)
+# Serves both branches of the reaper's scan (crud_submission.reap_stale):
+# expired leases and, through its NULL entries, rows judged before leases.
+# Keep in sync with alembic revision 3a9d5c1e7f24.
+Index(
+    "ix_submissions_judge_lease",
+    Submission.judge_lease_expires_at,
+    postgresql_where=text("status IN ('Judging', 'Pretests Passed')"),
+)
+Index(
+    "ix_submissions_judge_key",
+    Submission.judge_key,
+    postgresql_where=Submission.judge_key.isnot(None),
+)
+Index(
+    "ix_submissions_accepted_user_id_problem_id",
+    Submission.user_id,
+    Submission.problem_id,
+    postgresql_where=text("status = 'Accepted'"),
+)
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, Text, ForeignKey, Integer
+from sqlalchemy import Column, String, Boolean, Text, ForeignKey, Integer, BigInteger
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.db.session import Base
@@ -20,8 +20,15 @@ class TestCase(Base):
         nullable=False
     )
     
-    input_data = Column(Text, nullable=False)
-    output_data = Column(Text, nullable=False)
+    # Legacy inline data; new test cases live in the test data store and
+    # are referenced by the sha256 of their (EOL-normalized) content.
+    input_data = Column(Text, nullable=True)
+    output_data = Column(Text, nullable=True)
+
+    input_hash = Column(String(64), nullable=True)
+    output_hash = Column(String(64), nullable=True)
+    input_size = Column(BigInteger, nullable=True)
+    output_size = Column(BigInteger, nullable=True)
     
     group = Column(Integer, default=1)
     points = Column(Integer, default=0)
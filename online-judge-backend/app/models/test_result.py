@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, JSON, DateTime, Index
+from sqlalchemy.sql import func
+from app.db.session import Base
+
+class TestResult(Base):
+    """
+    Outcome of running one executable on one test under given limits, keyed by
+    a hash of the three (see app/worker/dedupe.py). A differential rejudge only
+    runs tests that have no entry here.
+    """
+    __tablename__ = "test_results"
+
+    key = Column(String(64), primary_key=True)
+    result = Column(JSON, nullable=False) # status, time_ms, memory_kb, return_code, runs
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+Index("ix_test_results_created_at", TestResult.created_at)
@@ -24,6 +24,8 @@ class User(Base):
     avatar_url = Column(String, nullable=True)
     signature = Column(String, nullable=True)
     last_login_ip = Column(String, nullable=True)
+    # Tokens issued up to this time carry stale active / superuser claims
+    tokens_valid_after = Column(DateTime(timezone=True), nullable=True)
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
@@ -1,7 +1,7 @@
 from .user import UserCreate, UserUpdate, UserOut
 from .token import Token, TokenPayload, Msg
-from .problem import ProblemCreate, ProblemUpdate, ProblemOut
-from .test_case import TestCaseCreate, TestCaseUpdate, TestCaseOut
+from .problem import ProblemCreate, ProblemUpdate, ProblemOut, ProblemAdminOut, ProblemSummaryOut
+from .test_case import TestCaseCreate, TestCaseUpdate, TestCaseOut, TestCaseMetaOut
 from .contest import ContestCreate, ContestUpdate, ContestOut, ContestProblemCreate, ContestProblemOut
-from .submission import SubmissionCreate, SubmissionUpdate, SubmissionOut
+from .submission import SubmissionCreate, SubmissionUpdate, SubmissionOut, SubmissionListOut
 from .tag import TagOut
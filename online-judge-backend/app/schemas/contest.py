@@ -33,6 +33,7 @@ class ContestBase(BaseModel):
     end_time: datetime
     is_active: bool = True
     is_visible: bool = True
+    reuse_verdicts: bool = True
 
 class ContestCreate(ContestBase):
     problems: List[ContestProblemCreate] = []
@@ -44,6 +45,7 @@ class ContestUpdate(BaseModel):
     end_time: Optional[datetime] = None
     is_active: Optional[bool] = None
     is_visible: Optional[bool] = None
+    reuse_verdicts: Optional[bool] = None
     problems: Optional[List[ContestProblemCreate]] = None
 
 class ContestInDBBase(ContestBase):
@@ -18,6 +18,7 @@ class ProblemBase(BaseModel):
     is_active: Optional[bool] = True
     is_special_judge: Optional[bool] = False
     checker_code: Optional[str] = None
+    is_interactive: Optional[bool] = False
     is_partial: Optional[bool] = False
     main_code: Optional[str] = None
     header_code: Optional[str] = None
@@ -30,10 +31,12 @@ class ProblemCreate(ProblemBase):
     input_description: str
     output_description: str
     tags: Optional[List[str]] = []
+    interactor_code: Optional[str] = None
 
 # Properties to receive on problem update
 class ProblemUpdate(ProblemBase):
     tags: Optional[List[str]] = None
+    interactor_code: Optional[str] = None
 
 # Properties shared by models stored in DB
 class ProblemInDBBase(ProblemBase):
@@ -48,5 +51,30 @@ class ProblemOut(ProblemInDBBase):
     tags: List["TagOut"] = []
     accepted_count: int = 0
     submission_count: int = 0
+    version: int = 1
     user_status: Optional[str] = None
 
+# Admin responses: the interactor source stays out of the public ProblemOut
+class ProblemAdminOut(ProblemOut):
+    interactor_code: Optional[str] = None
+
+# List row, without the statement, code, checker and interactor fields
+class ProblemSummaryOut(BaseModel):
+    id: UUID
+    title: str
+    difficulty: Optional[Difficulty] = Difficulty.EASY
+    time_limit: Optional[int] = 1000
+    memory_limit: Optional[int] = 256
+    is_active: Optional[bool] = True
+    is_special_judge: Optional[bool] = False
+    is_interactive: Optional[bool] = False
+    is_partial: Optional[bool] = False
+    tags: List["TagOut"] = []
+    accepted_count: int = 0
+    submission_count: int = 0
+    version: int = 1
+    user_status: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
@@ -29,6 +29,26 @@ class SubmissionOut(SubmissionBase):
     time_used: int
     memory_used: int
     details: Optional[Any] = None
+    timings: Optional[Dict[str, float]] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+# Summary row for list pages, never carries code or per-test details
+class SubmissionListOut(BaseModel):
+    id: UUID
+    user_id: UUID
+    problem_id: UUID
+    contest_id: Optional[UUID] = None
+    language: str
+    username: Optional[str] = None
+    problem_title: Optional[str] = None
+    status: str
+    total_score: int
+    time_used: int
+    memory_used: int
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -9,9 +9,12 @@ class TestCaseBase(BaseModel):
     points: Optional[int] = 0
     is_sample: Optional[bool] = False
 
+# Either inline data or a reference to files already in the test data store
 class TestCaseCreate(TestCaseBase):
-    input_data: str
-    output_data: str
+    input_hash: Optional[str] = None
+    output_hash: Optional[str] = None
+    input_size: Optional[int] = None
+    output_size: Optional[int] = None
 
 class TestCaseUpdate(TestCaseBase):
     pass
@@ -19,8 +22,30 @@ class TestCaseUpdate(TestCaseBase):
 class TestCaseInDBBase(TestCaseBase):
     id: UUID
     problem_id: UUID
+    input_hash: Optional[str] = None
+    output_hash: Optional[str] = None
+    input_size: Optional[int] = None
+    output_size: Optional[int] = None
 
     class Config:
         from_attributes = True
 class TestCaseOut(TestCaseInDBBase):
     pass
+
+# Listing without the file contents
+class TestCaseMetaOut(BaseModel):
+    id: UUID
+    problem_id: UUID
+    group: Optional[int] = 1
+    points: Optional[int] = 0
+    is_sample: Optional[bool] = False
+    input_hash: Optional[str] = None
+    output_hash: Optional[str] = None
+    input_size: Optional[int] = None
+    output_size: Optional[int] = None
+
+    class Config:
+        from_attributes = True
+        # A row with input / output data is a TestCaseOut, which keeps the two
+        # apart in Union response models
+        extra = "forbid"
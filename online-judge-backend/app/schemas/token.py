@@ -8,6 +8,10 @@ class Token(BaseModel):
 
 class TokenPayload(BaseModel):
     sub: Optional[UUID] = None
+    iat: Optional[int] = None
+    # Snapshot of is_active / is_superuser at issue time
+    act: Optional[bool] = None
+    su: Optional[bool] = None
 
 class Msg(BaseModel):
     msg: str
\ No newline at end of file
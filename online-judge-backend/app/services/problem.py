@@ -0,0 +1,54 @@
+import json
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, schemas
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# Written by the judge without a version bump (see ProblemService)
+_COUNTERS = {"accepted_count", "submission_count"}
+
+
+class ProblemService:
+    """
+    Serves problem detail responses from pre-serialized JSON.
+
+    Blobs are keyed by (problem_id, version); any edit bumps the version, so a
+    cached statement can never be stale and only needs evicting for space.
+    The judge updates the submission counters without bumping the version, so
+    they are left out of the blob and spliced in per request from the same
+    primary-key lookup that reads the version. A hit costs that one lookup
+    and no ORM work.
+    """
+
+    def __init__(self):
+        self._statements = TTLCache(
+            maxsize=settings.PROBLEM_STATEMENT_CACHE_SIZE,
+            ttl=settings.PROBLEM_STATEMENT_CACHE_TTL_SECONDS,
+        )
+
+    async def get_detail_json(self, db: AsyncSession, problem_id: UUID) -> Optional[bytes]:
+        row = await crud.problem.get_version_async(db, id=problem_id)
+        if row is None:
+            return None
+
+        blob = self._statements.get((problem_id, row.version))
+        if blob is None:
+            problem = await crud.problem.get_async(db, id=problem_id)
+            if problem is None:
+                return None
+            blob = schemas.ProblemOut.model_validate(problem).model_dump_json(exclude=_COUNTERS).encode()
+            # Key on the version that was actually serialized
+            self._statements.set((problem_id, problem.version), blob)
+        counters = json.dumps(
+            {"accepted_count": row.accepted_count or 0, "submission_count": row.submission_count or 0},
+            separators=(",", ":"),
+        ).encode()
+        # Both are JSON objects: merge by joining their members
+        return blob[:-1] + b"," + counters[1:]
+
+
+problem_service = ProblemService()
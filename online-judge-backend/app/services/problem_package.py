@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import zipfile
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Iterator, List, Tuple
+
+from app.core.test_data import TestDataStore, iter_chunks
+from app.models.problem import Problem
+from app.models.test_case import TestCase
+from app.services.test_case_archive import (
+    ArchiveError, ArchivedTestCase, ZipMember, manifest_int, stream_zip, test_case_names,
+    test_case_source,
+)
+
+PACKAGE_FORMAT = 1
+PACKAGE_MANIFEST = "problem.json"
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# Problem columns carried in problem.json as-is
+_STATEMENT_FIELDS = (
+    "title", "description", "input_description", "output_description", "hint",
+    "time_limit", "memory_limit", "difficulty", "is_active", "is_special_judge", "is_interactive",
+    "is_partial",
+)
+# Code columns carried as separate files, so they diff and edit like source
+_CODE_FILES = {
+    "checker_code": "checker.cpp",
+    "interactor_code": "interactor.cpp",
+    "main_code": "main.cpp",
+    "header_code": "header.h",
+    "template_code": "template.cpp",
+}
+
+
+class PackageError(ValueError):
+    pass
+
+
+@dataclass
+class ProblemPackage:
+    problem: Dict[str, Any]
+    tags: List[str]
+    tests: List[ArchivedTestCase]
+    reused_count: int = 0  # test files that were already in the store
+    stored_count: int = 0  # test files copied out of the package
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_problem_package(
+    problem: Problem, test_cases: List[TestCase], store: TestDataStore, compress: bool = False
+) -> Iterator[bytes]:
+    """
+    Stream a self-contained problem package (zip):
+
+        problem.json        format version, statement, limits, tags, code file
+                            names and, per test, file names, sha256, size,
+                            group / points / is_sample
+        checker.cpp, interactor.cpp, main.cpp, header.h, template.cpp   when set
+        tests/01.in, tests/01.out, ...
+
+    Hashes are those of the stored (EOL-normalized) bytes, so an importer can
+    skip files it already has.
+    """
+    names = test_case_names(len(test_cases))
+
+    def members() -> Iterator[ZipMember]:
+        tests = []
+        for name, tc in zip(names, test_cases):
+            entry = {"name": name, "group": tc.group, "points": tc.points, "is_sample": bool(tc.is_sample)}
+            for side, digest, size, inline in (
+                ("input", tc.input_hash, tc.input_size, tc.input_data),
+                ("output", tc.output_hash, tc.output_size, tc.output_data),
+            ):
+                if not digest:
+                    data = (inline or "").encode()
+                    digest, size = _sha256(data), len(data)
+                elif size is None:
+                    size = os.path.getsize(store.path(digest))
+                ext = "in" if side == "input" else "out"
+                entry[side] = {"path": f"tests/{name}.{ext}", "sha256": digest, "size": size}
+            tests.append(entry)
+
+        manifest = {"format": PACKAGE_FORMAT}
+        for column in _STATEMENT_FIELDS:
+            manifest[column] = getattr(problem, column)
+        manifest["tags"] = [tag.name for tag in problem.tags]
+        manifest["files"] = {
+            column: filename for column, filename in _CODE_FILES.items() if getattr(problem, column)
+        }
+        manifest["tests"] = tests
+
+        raw = json.dumps(manifest, indent=2, ensure_ascii=False).encode()
+        yield PACKAGE_MANIFEST, [raw], len(raw)
+
+        for column, filename in manifest["files"].items():
+            data = getattr(problem, column).encode()
+            yield filename, [data], len(data)
+
+        for entry, tc in zip(tests, test_cases):
+            chunks, size = test_case_source(store, tc.input_hash, tc.input_data)
+            yield entry["input"]["path"], chunks, size
+            chunks, size = test_case_source(store, tc.output_hash, tc.output_data)
+            yield entry["output"]["path"], chunks, size
+
+    return stream_zip(members(), compress=compress)
+
+
+def _store_member(
+    zf: zipfile.ZipFile, spec: Any, store: TestDataStore, package: ProblemPackage
+) -> Tuple[str, int]:
+    """Make sure the file described by `spec` is in the store; returns (sha256, size)."""
+    if not isinstance(spec, dict) or not spec.get("path") or not spec.get("sha256"):
+        raise PackageError("Each test needs input / output entries with path and sha256")
+    digest = str(spec["sha256"]).lower()
+    if not _SHA256_RE.match(digest):
+        raise PackageError(f"Invalid sha256 for {spec['path']}")
+    if store.exists(digest):
+        package.reused_count += 1
+        return digest, os.path.getsize(store.path(digest))
+
+    try:
+        with zf.open(spec["path"]) as stream:
+            stored, size = store.write_stream(iter_chunks(stream), normalize=False)
+    except KeyError:
+        raise PackageError(f"Missing file in package: {spec['path']}")
+    if stored != digest:
+        raise PackageError(f"Checksum mismatch for {spec['path']}")
+    package.stored_count += 1
+    return stored, size
+
+
+def read_problem_package(path: str, store: TestDataStore) -> ProblemPackage:
+    """
+    Parse a package written by write_problem_package and bring its test files
+    into the store. Files whose hash the store already has are not read at all.
+    """
+    try:
+        zf = zipfile.ZipFile(path)
+    except zipfile.BadZipFile as e:
+        raise PackageError(f"Not a problem package: {e}")
+
+    with zf:
+        try:
+            manifest = json.loads(zf.read(PACKAGE_MANIFEST))
+        except KeyError:
+            raise PackageError(f"Missing {PACKAGE_MANIFEST}")
+        except ValueError as e:
+            raise PackageError(f"Invalid {PACKAGE_MANIFEST}: {e}")
+        if not isinstance(manifest, dict):
+            raise PackageError(f"{PACKAGE_MANIFEST} must be an object")
+        if manifest.get("format") != PACKAGE_FORMAT:
+            raise PackageError(f"Unsupported package format: {manifest.get('format')}")
+
+        problem = {column: manifest[column] for column in _STATEMENT_FIELDS if manifest.get(column) is not None}
+        for column in ("title", "description", "input_description", "output_description"):
+            if not problem.get(column):
+                raise PackageError(f"{PACKAGE_MANIFEST} is missing {column}")
+
+        for column, filename in (manifest.get("files") or {}).items():
+            if column not in _CODE_FILES:
+                continue
+            try:
+                problem[column] = zf.read(filename).decode().replace("\r\n", "\n")
+            except KeyError:
+                raise PackageError(f"Missing file in package: {filename}")
+
+        package = ProblemPackage(problem=problem, tags=[str(t) for t in manifest.get("tags") or []], tests=[])
+        for entry in manifest.get("tests") or []:
+            if not isinstance(entry, dict):
+                raise PackageError(f"{PACKAGE_MANIFEST} tests must be objects")
+            try:
+                group = manifest_int(entry, "group", 1)
+                points = manifest_int(entry, "points", 0)
+            except ArchiveError as e:
+                raise PackageError(str(e))
+            in_hash, in_size = _store_member(zf, entry.get("input"), store, package)
+            out_hash, out_size = _store_member(zf, entry.get("output"), store, package)
+            package.tests.append(ArchivedTestCase(
+                name=str(entry.get("name", len(package.tests) + 1)),
+                input_hash=in_hash,
+                input_size=in_size,
+                output_hash=out_hash,
+                output_size=out_size,
+                group=group,
+                points=points,
+                is_sample=bool(entry.get("is_sample", False)),
+            ))
+    return package
+
+
+def stage_package(fileobj: BinaryIO, staging_dir: str) -> str:
+    """Copy an uploaded package to the staging directory for a worker to import."""
+    os.makedirs(staging_dir, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=staging_dir, prefix="package-", suffix=".zip")
+    with os.fdopen(fd, "wb") as dest:
+        for chunk in iter_chunks(fileobj):
+            dest.write(chunk)
+    return path
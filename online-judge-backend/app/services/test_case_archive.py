@@ -0,0 +1,241 @@
+import io
+import json
+import os
+import re
+import tarfile
+import time
+import zipfile
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.test_data import TestDataStore, iter_chunks
+from app.models.test_case import TestCase
+
+MANIFEST_NAME = "manifest.json"
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+@dataclass
+class ArchivedTestCase:
+    name: str
+    input_hash: str
+    input_size: int
+    output_hash: str
+    output_size: int
+    group: int = 1
+    points: int = 0
+    is_sample: bool = False
+
+
+@dataclass
+class _Pending:
+    files: Dict[str, Tuple[str, int]] = field(default_factory=dict)  # "in"/"out" -> (hash, size)
+
+
+def _natural_key(name: str):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
+
+
+def manifest_int(entry: dict, key: str, default: int) -> int:
+    """entry[key] as an int; missing or null (as exported for unset columns) means `default`."""
+    value = entry.get(key)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ArchiveError(f"Invalid {key}: {value!r}")
+
+
+def _iter_members(fileobj: BinaryIO, filename: str) -> Iterator[Tuple[str, BinaryIO]]:
+    """Yield (name, stream) for every regular file, reading the archive front to back."""
+    if filename.lower().endswith(".zip"):
+        with zipfile.ZipFile(fileobj) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                with zf.open(info) as stream:
+                    yield info.filename, stream
+        return
+
+    # Stream mode ("r|*"): members are visited once, nothing is seeked back to
+    try:
+        tf = tarfile.open(fileobj=fileobj, mode="r|*")
+    except tarfile.TarError as e:
+        raise ArchiveError(f"Unsupported archive: {e}")
+    with tf:
+        for member in tf:
+            if not member.isfile():
+                continue
+            stream = tf.extractfile(member)
+            if stream is not None:
+                yield member.name, stream
+
+
+def read_test_case_archive(
+    fileobj: BinaryIO,
+    filename: str,
+    store: TestDataStore,
+    default_group: int = 1,
+    default_points: int = 0,
+) -> List[ArchivedTestCase]:
+    """
+    Stream *.in / *.out pairs from a zip or tar archive into the test data store.
+
+    Files are paired by their path without extension. An optional
+    manifest.json maps that name to {"group", "points", "is_sample"}, e.g.
+    {"sub1/01": {"group": 1, "points": 20, "is_sample": true}}.
+    Test cases are returned in natural name order (2 before 10).
+    """
+    pending: Dict[str, _Pending] = {}
+    manifest: Dict[str, dict] = {}
+
+    try:
+        for name, stream in _iter_members(fileobj, filename):
+            if name.startswith("./"):
+                name = name[2:]
+            if os.path.basename(name) == MANIFEST_NAME:
+                try:
+                    manifest = json.loads(stream.read())
+                except ValueError as e:
+                    raise ArchiveError(f"Invalid {MANIFEST_NAME}: {e}")
+                if not isinstance(manifest, dict):
+                    raise ArchiveError(f"{MANIFEST_NAME} must be an object keyed by test name")
+                continue
+
+            stem, ext = os.path.splitext(name)
+            ext = ext.lower().lstrip(".")
+            if ext in ("ans", "a"):
+                ext = "out"
+            if ext not in ("in", "out"):
+                continue
+            pending.setdefault(stem, _Pending()).files[ext] = store.write_stream(iter_chunks(stream))
+    except (zipfile.BadZipFile, tarfile.TarError) as e:
+        raise ArchiveError(f"Corrupt archive: {e}")
+
+    unpaired = sorted(stem for stem, p in pending.items() if len(p.files) != 2)
+    if unpaired:
+        raise ArchiveError(f"Missing .in or .out for: {', '.join(unpaired[:10])}")
+    if not pending:
+        raise ArchiveError("Archive contains no *.in / *.out pairs")
+
+    result = []
+    for stem in sorted(pending, key=_natural_key):
+        meta = manifest.get(stem) or manifest.get(os.path.basename(stem)) or {}
+        if not isinstance(meta, dict):
+            raise ArchiveError(f"{MANIFEST_NAME} entry for {stem} must be an object")
+        (in_hash, in_size), (out_hash, out_size) = pending[stem].files["in"], pending[stem].files["out"]
+        result.append(ArchivedTestCase(
+            name=stem,
+            input_hash=in_hash,
+            input_size=in_size,
+            output_hash=out_hash,
+            output_size=out_size,
+            group=manifest_int(meta, "group", default_group),
+            points=manifest_int(meta, "points", default_points),
+            is_sample=bool(meta.get("is_sample", False)),
+        ))
+    return result
+
+
+class _ChunkSink(io.RawIOBase):
+    """Unseekable write target that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _iter_file(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        yield from iter_chunks(f)
+
+
+def test_case_source(
+    store: TestDataStore, digest: Optional[str], inline: Optional[str]
+) -> Tuple[Iterator[bytes], int]:
+    """(chunks, size) of one side of a test case, from the store or legacy inline text."""
+    if digest:
+        path = store.path(digest)
+        return _iter_file(path), os.path.getsize(path)
+    data = (inline or "").encode()
+    return iter([data]), len(data)
+
+
+def test_case_names(count: int) -> List[str]:
+    """01, 02, ... padded so that they also sort correctly as plain strings."""
+    width = max(2, len(str(count)))
+    return [str(i).zfill(width) for i in range(1, count + 1)]
+
+
+ZipMember = Tuple[str, Iterable[bytes], int]  # (name, chunks, size)
+
+
+def stream_zip(members: Iterable[ZipMember], compress: bool = False) -> Iterator[bytes]:
+    """
+    Build a zip while it is being read.
+
+    Member contents are consumed a chunk at a time and never held in memory
+    as a whole; nothing is seeked back to, so the output can go straight to
+    the client. Entries are stored uncompressed unless `compress` is set.
+    """
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    date_time = time.localtime()[:6]
+
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=compression) as zf:
+        for name, chunks, size in members:
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.compress_type = compression
+            with zf.open(info, "w", force_zip64=size > zipfile.ZIP64_LIMIT) as dest:
+                for chunk in chunks:
+                    dest.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            # Local header (if nothing was written yet) and data descriptor
+            data = sink.drain()
+            if data:
+                yield data
+    # Central directory
+    yield sink.drain()
+
+
+def write_test_case_archive(
+    test_cases: Iterable[TestCase], store: TestDataStore, compress: bool = False
+) -> Iterator[bytes]:
+    """
+    Stream a zip of test cases in the format read_test_case_archive accepts:
+    01.in / 01.out, ... plus a manifest.json with group / points / is_sample.
+    """
+    test_cases = list(test_cases)
+    names = test_case_names(len(test_cases))
+
+    def members() -> Iterator[ZipMember]:
+        manifest = json.dumps({
+            name: {"group": tc.group, "points": tc.points, "is_sample": bool(tc.is_sample)}
+            for name, tc in zip(names, test_cases)
+        }, indent=2).encode()
+        yield MANIFEST_NAME, [manifest], len(manifest)
+
+        for name, tc in zip(names, test_cases):
+            chunks, size = test_case_source(store, tc.input_hash, tc.input_data)
+            yield f"{name}.in", chunks, size
+            chunks, size = test_case_source(store, tc.output_hash, tc.output_data)
+            yield f"{name}.out", chunks, size
+
+    return stream_zip(members(), compress=compress)
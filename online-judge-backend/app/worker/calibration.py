@@ -0,0 +1,109 @@
+import logging
+import math
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import JUDGE_TLE_RERUNS
+
+logger = logging.getLogger(__name__)
+
+# Keep a badly configured reference from turning limits into nonsense
+_MIN_FACTOR = 0.25
+_MAX_FACTOR = 4.0
+_CALIBRATION_ROUNDS = 5
+
+_speed_factor: Optional[float] = None
+
+
+def _workload() -> int:
+    # Integer arithmetic, hashing and sorting: roughly what a single-threaded
+    # contest solution spends its time on. Fixed size, so the CPU time it takes
+    # is a score for this host.
+    acc = 0
+    for i in range(300_000):
+        acc = (acc * 31 + i) % 1_000_003
+    table = {i: i * i for i in range(100_000)}
+    acc += sum(table[i] for i in range(0, 100_000, 7))
+    acc += sorted(range(200_000), key=lambda x: (x * 7919) % 200_003)[0]
+    return acc
+
+
+def measure() -> float:
+    """CPU milliseconds for the calibration workload: best of a few rounds."""
+    best = math.inf
+    for _ in range(_CALIBRATION_ROUNDS):
+        start = time.process_time()
+        _workload()
+        best = min(best, (time.process_time() - start) * 1000)
+    return best
+
+
+def calibrate() -> float:
+    """
+    Work out this host's speed factor: CPU time here / CPU time on the
+    reference host. Time limits are multiplied by it and measured times divided
+    by it, so verdicts don't depend on which worker judged the submission.
+    """
+    global _speed_factor
+    if settings.JUDGE_SPEED_FACTOR:
+        _speed_factor = settings.JUDGE_SPEED_FACTOR
+    elif settings.JUDGE_CALIBRATION:
+        score = measure()
+        reference = settings.JUDGE_CALIBRATION_REFERENCE_MS
+        if reference:
+            _speed_factor = min(max(score / reference, _MIN_FACTOR), _MAX_FACTOR)
+        else:
+            _speed_factor = 1.0
+            logger.warning("JUDGE_CALIBRATION_REFERENCE_MS is not set; time limits are not scaled")
+        logger.info(f"Calibration score {score:.1f} ms (reference {reference or '-'} ms)")
+    else:
+        _speed_factor = 1.0
+    logger.info(f"Judge speed factor {_speed_factor:.3f}")
+    return _speed_factor
+
+
+def speed_factor() -> float:
+    # Celery calibrates once in the parent (worker_init) and the pool children
+    # inherit it; anything else calibrates on first use
+    if _speed_factor is None:
+        return calibrate()
+    return _speed_factor
+
+
+def run_calibrated(run: Callable[[int], Dict[str, Any]], time_limit_ms: int) -> Dict[str, Any]:
+    """
+    Run a test through `run(time_limit_ms)` (a sandbox run) against a limit
+    scaled to this host, and report the time in reference-host milliseconds.
+
+    The sandbox is given JUDGE_TLE_RERUN_MARGIN_PCT of headroom over the limit.
+    A run that finishes within the headroom but over the limit is borderline: it
+    is run again, up to JUDGE_TLE_RERUNS more times, stopping at the first run
+    within the limit. The fastest run decides, as timing noise only ever adds
+    time. Runs killed at the headroom are a plain Time Limit Exceeded.
+    """
+    factor = speed_factor()
+    margin = max(settings.JUDGE_TLE_RERUN_MARGIN_PCT, 0.0) / 100
+    hard_limit_ms = int(math.ceil(time_limit_ms * factor * (1 + margin)))
+
+    best = None
+    runs = 0
+    while True:
+        res = run(hard_limit_ms)
+        runs += 1
+        res["time_used_ms"] = int(round(res["time_used_ms"] / factor))
+        if best is None or res["time_used_ms"] < best["time_used_ms"]:
+            best = res
+        if res["status"] == "Time Limit Exceeded" or res["time_used_ms"] <= time_limit_ms:
+            break
+        if runs > settings.JUDGE_TLE_RERUNS:
+            break
+        JUDGE_TLE_RERUNS.inc()
+
+    # A run within the limit always ends the loop, so when `best` passes it is
+    # also the last run: the one whose output is in the box
+    if best["status"] != "Time Limit Exceeded" and best["time_used_ms"] > time_limit_ms:
+        best["status"] = "Time Limit Exceeded"
+    if runs > 1:
+        best["runs"] = runs
+    return best
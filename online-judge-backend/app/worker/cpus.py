@@ -0,0 +1,129 @@
+import fcntl
+import glob
+import logging
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Lock files that hand each judge process its own core; the lock goes away
+# with the process, so recycled pool children free their core automatically
+_LEASE_DIR = os.path.join(tempfile.gettempdir(), "judge-cpus")
+# Box ids below this are left for manual isolate use
+_BOX_ID_BASE = 10
+_allowed: Optional[List[int]] = None
+
+
+@dataclass(frozen=True)
+class CoreLease:
+    cpu: int
+    node: Optional[int]  # NUMA node of `cpu`, on multi-node hosts only
+    box_id: int
+
+    def pin(self) -> None:
+        """Confine the calling process (and what it execs) to the leased core."""
+        os.sched_setaffinity(0, {self.cpu})
+
+    def wrap(self, command: list) -> list:
+        """Bind the command's memory to the core's node, when numactl is available."""
+        if self.node is None or not shutil.which("numactl"):
+            return command
+        return ["numactl", f"--membind={self.node}", "--"] + command
+
+
+def parse_cpu_list(raw: str) -> List[int]:
+    """Kernel cpu-list syntax: "0-3,8,10-11"."""
+    cpus = set()
+    for part in raw.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition("-")
+        cpus.update(range(int(start), int(end or start) + 1))
+    return sorted(cpus)
+
+
+def _node_of(cpu: int) -> Optional[int]:
+    if len(glob.glob("/sys/devices/system/node/node[0-9]*")) < 2:
+        return None
+    for path in glob.glob(f"/sys/devices/system/cpu/cpu{cpu}/node[0-9]*"):
+        return int(os.path.basename(path)[4:])
+    return None
+
+
+def _allowed_cpus() -> List[int]:
+    """CPUs this process may run on, read once: before any pinning narrows it."""
+    global _allowed
+    if _allowed is None:
+        # sched_getaffinity is Linux only; the API imports this module on any host
+        if hasattr(os, "sched_getaffinity"):
+            _allowed = sorted(os.sched_getaffinity(0))
+        else:
+            _allowed = list(range(os.cpu_count() or 1))
+    return _allowed
+
+
+def housekeeping_cpus() -> List[int]:
+    """Cores for the worker itself, the compiler and output comparison."""
+    if settings.JUDGE_HOUSEKEEPING_CPUS:
+        return parse_cpu_list(settings.JUDGE_HOUSEKEEPING_CPUS)
+    return _allowed_cpus()[:1]
+
+
+def judge_cpus() -> List[int]:
+    """Cores handed out one per sandbox box."""
+    if settings.JUDGE_CPUS:
+        return parse_cpu_list(settings.JUDGE_CPUS)
+    housekeeping = set(housekeeping_cpus())
+    return [cpu for cpu in _allowed_cpus() if cpu not in housekeeping]
+
+
+def worker_concurrency() -> int:
+    return max(len(judge_cpus()), 1)
+
+
+_lease: Optional[CoreLease] = None
+_lease_file = None
+_exhausted = False
+
+
+def acquire() -> Optional[CoreLease]:
+    """
+    Lease a judge core for this process and move the process itself onto the
+    housekeeping cores. Returns None (runs stay unpinned) when every core is
+    taken, e.g. when concurrency was set higher than the core count.
+    """
+    global _lease, _lease_file, _exhausted
+    if _lease is not None or _exhausted:
+        return _lease
+
+    os.makedirs(_LEASE_DIR, exist_ok=True)
+    for cpu in judge_cpus():
+        f = open(os.path.join(_LEASE_DIR, f"cpu{cpu}.lock"), "w")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            continue
+        _lease_file = f
+        _lease = CoreLease(cpu=cpu, node=_node_of(cpu), box_id=_BOX_ID_BASE + cpu)
+        break
+    else:
+        _exhausted = True
+        logger.warning(f"No free judge core for process {os.getpid()}; its sandbox runs are not pinned")
+        return None
+
+    os.sched_setaffinity(0, set(housekeeping_cpus()))
+    logger.info(f"Process {os.getpid()} leased core {_lease.cpu} (box {_lease.box_id}, node {_lease.node})")
+    return _lease
+
+
+def current_lease() -> Optional[CoreLease]:
+    if not settings.JUDGE_CPU_PINNING:
+        return None
+    return _lease or acquire()
@@ -0,0 +1,63 @@
+import hashlib
+import json
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.test_data import iter_chunks
+from app.models.problem import Problem
+from app.models.submission import Submission
+from app.models.test_case import TestCase
+
+
+def verdict_key(problem: Problem, test_cases: List[TestCase], language: str, code: str) -> str:
+    """
+    Identify everything a verdict depends on: the problem version (statement,
+    limits, checker), its test data, the language and the exact code. Two
+    submissions with the same key get the same result, so the second need
+    not run. Test rows are never edited in place, so their ids (with the
+    content hashes where stored) pin the test data.
+    """
+    tests = [
+        [str(tc.id), tc.input_hash, tc.output_hash, tc.group, tc.points]
+        for tc in test_cases
+    ]
+    parts = [
+        str(problem.id), problem.version, problem.time_limit, problem.memory_limit,
+        tests, language, hashlib.sha256(code.encode()).hexdigest(),
+    ]
+    return hashlib.sha256(json.dumps(parts, separators=(",", ":")).encode()).hexdigest()
+
+
+def executable_hash(path: str, language: str) -> str:
+    """sha256 of what runs in the box: the compiled binary, or the script itself."""
+    digest = hashlib.sha256(language.encode() + b"\0")
+    with open(path, "rb") as f:
+        for chunk in iter_chunks(f):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _data_hash(stored_hash, inline) -> str:
+    return stored_hash or hashlib.sha256((inline or "").encode()).hexdigest()
+
+
+def test_result_key(exe_hash: str, tc: TestCase, time_limit: int, memory_limit: int,
+                    interactor_hash: Optional[str] = None) -> str:
+    """
+    Identify one test run: executable, test content and limits (see
+    models.TestResult), and the interactor on interactive problems.
+    """
+    parts = [
+        exe_hash, _data_hash(tc.input_hash, tc.input_data), _data_hash(tc.output_hash, tc.output_data),
+        time_limit, memory_limit,
+    ]
+    if interactor_hash:
+        parts.append(interactor_hash)
+    return hashlib.sha256(json.dumps(parts, separators=(",", ":")).encode()).hexdigest()
+
+
+def reuse_enabled(submission: Submission) -> bool:
+    """JUDGE_REUSE_VERDICTS, unless the submission's contest re-runs every submission."""
+    if not settings.JUDGE_REUSE_VERDICTS:
+        return False
+    return submission.contest is None or bool(submission.contest.reuse_verdicts)
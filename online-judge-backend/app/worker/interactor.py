@@ -0,0 +1,32 @@
+import hashlib
+import os
+import subprocess
+import tempfile
+
+# Compiled interactors by source hash, shared by the worker's processes: a
+# problem's interactor is compiled once per host, not once per submission
+_CACHE_DIR = os.path.join(tempfile.gettempdir(), "judge-interactors")
+
+
+def compile_interactor(code: str) -> str:
+    """Path of the compiled interactor (C++) for `code`, compiling it on first use."""
+    if not code:
+        raise ValueError("Interactive problem has no interactor")
+    digest = hashlib.sha256(code.encode()).hexdigest()
+    path = os.path.join(_CACHE_DIR, f"{digest}.out")
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(_CACHE_DIR, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=_CACHE_DIR) as build:
+        source = os.path.join(build, "interactor.cpp")
+        binary = os.path.join(build, "interactor.out")
+        with open(source, "w") as f:
+            f.write(code)
+        try:
+            subprocess.check_output(["g++", source, "-o", binary, "-O2"], stderr=subprocess.STDOUT)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Interactor compilation failed: {e.output.decode()}")
+        # Atomic, so a concurrent compile of the same interactor is harmless
+        os.replace(binary, path)
+    return path
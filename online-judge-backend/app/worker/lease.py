@@ -0,0 +1,61 @@
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+
+
+# Interim verdict between the two phases of a pretest judge
+PRETESTS_PASSED = "Pretests Passed"
+
+
+class LeaseLost(Exception):
+    """Another judge took the submission over (our lease expired and was reaped)."""
+
+
+class JudgeLease:
+    """
+    A worker's claim on a submission row. Only the holder of the current token
+    may write results, so a duplicate or redelivered task can never overwrite a
+    verdict or count a submission twice. The lease is renewed as tests run; if
+    the worker dies it runs out and reap_stale_submissions re-queues the row.
+    """
+
+    def __init__(self, db: Session, submission_id, system_tests: bool = False):
+        self.db = db
+        self.submission_id = submission_id
+        # The system test phase takes over a row left at the interim verdict
+        # (which it keeps showing) instead of a Pending one. It continues the
+        # pretest phase's attempt rather than counting a new one.
+        self.system_tests = system_tests
+        self.token = uuid.uuid4().hex
+        self.seconds = settings.JUDGE_LEASE_SECONDS
+        self._renewed_at = 0.0
+
+    def claim(self) -> bool:
+        if self.system_tests:
+            claimed = crud.submission.claim(
+                self.db, submission_id=self.submission_id, token=self.token, lease_seconds=self.seconds,
+                statuses=(PRETESTS_PASSED,), status=PRETESTS_PASSED, count_attempt=False,
+            )
+        else:
+            claimed = crud.submission.claim(
+                self.db, submission_id=self.submission_id, token=self.token, lease_seconds=self.seconds
+            )
+        self._renewed_at = time.monotonic()
+        return claimed
+
+    def heartbeat(self, checkpoint: Optional[Dict[str, Any]] = None, force: bool = False) -> None:
+        """Renew the lease (and save `checkpoint`), at most every third of the lease."""
+        if not force and time.monotonic() - self._renewed_at < self.seconds / 3:
+            return
+        renewed = crud.submission.renew_lease(
+            self.db, submission_id=self.submission_id, token=self.token,
+            lease_seconds=self.seconds, checkpoint=checkpoint,
+        )
+        if not renewed:
+            raise LeaseLost(f"Lost the judge lease on submission {self.submission_id}")
+        self._renewed_at = time.monotonic()
@@ -1,16 +1,53 @@
+import math
 import os
+import resource
+import shutil
+import signal
 import subprocess
+import tempfile
+import threading
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+from app.core.config import settings
+from app.worker.cpus import CoreLease
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# testlib interactor exit codes that judge the contestant (wrong answer,
+# presentation error); any other failure is the interactor's own
+_INTERACTOR_REJECTS = (1, 2)
+
+
+def _system_error() -> Dict[str, Any]:
+    return {"status": "System Error", "time_used_ms": 0, "memory_used_kb": 0, "return_code": 0}
+
+
+def _interactive_verdict(contestant: Dict[str, Any], interactor: Dict[str, Any]) -> str:
+    """
+    Combine both sides of an interactive run, testlib style: the contestant's
+    own limits come first, then an interactor reject. A contestant that
+    crashed after a reject (SIGPIPE, or Python's BrokenPipeError) only wrote
+    after the interactor had hung up, so its Runtime Error doesn't count.
+    """
+    if contestant["status"] in ("Time Limit Exceeded", "Memory Limit Exceeded", "System Error"):
+        return contestant["status"]
+    if interactor["status"] == "Runtime Error" and interactor["return_code"] in _INTERACTOR_REJECTS:
+        return "Wrong Answer"
+    if interactor["status"] == "Accepted" or contestant["status"] == "Runtime Error":
+        return contestant["status"]
+    logger.error(f"Interactor failed: {interactor}")
+    return "System Error"
+
+
 class Sandbox:
-    def __init__(self, box_id: int = 0):
+    def __init__(self, box_id: int = 0, lease: Optional[CoreLease] = None):
         # Allow multiple workers to run different boxes if configured
         self.box_id = box_id
         self.box_path = None
+        # Runs are pinned to the leased core; isolate and the box inherit the affinity
+        self.lease = lease
         self._init_isolate()
 
     def _init_isolate(self):
@@ -32,29 +69,27 @@ class Sandbox:
         except subprocess.CalledProcessError as e:
             logger.error(f"Failed to cleanup isolate box: {e}")
 
-    def run(self, 
-            command: list, 
-            stdin_file: str = None,
-            stdout_file: str = None,
-            stderr_file: str = None,
-            time_limit_ms: int = 1000, 
-            memory_limit_mb: int = 256
-        ) -> Dict[str, Any]:
-        
-        result = {
-            "status": "Accepted",
-            "time_used_ms": 0,
-            "memory_used_kb": 0,
-            "return_code": 0
-        }
-
+    def _meta_file(self) -> str:
         # The meta file stores the isolated execution's resource footprints and exit details
-        meta_file = f"/tmp/isolate_meta_{self.box_id}.txt"
+        return f"/tmp/isolate_meta_{self.box_id}.txt"
+
+    def _isolate_cmd(self,
+                     command: list,
+                     time_limit_ms: int,
+                     memory_limit_mb: int,
+                     wall_time_sec: float = None,
+                     stdin_file: str = None,
+                     stdout_file: str = None,
+                     stderr_file: str = None,
+                     pin: bool = True
+        ) -> list:
+        meta_file = self._meta_file()
 
         # Time limits for isolate are in seconds (floating point allowed)
         time_limit_sec = time_limit_ms / 1000.0
         # Wall time typically slightly higher to account for startup
-        wall_time_sec = time_limit_sec + 1.0
+        if wall_time_sec is None:
+            wall_time_sec = time_limit_sec + 1.0
 
         # Base isolate command with resource constraints
         isolate_cmd = [
@@ -79,59 +114,355 @@ class Sandbox:
         # Isolate runs the command using the paths relative to the box directory!
         # Thus the executable must be relative to the sandbox or accessible globally limit.
         full_cmd = isolate_cmd + command
+        if self.lease and pin:
+            full_cmd = self.lease.wrap(full_cmd)
+        return full_cmd
+
+    def _read_meta(self) -> Dict[str, str]:
+        # Parse the meta file generated by isolate
+        meta_data = {}
+        meta_file = self._meta_file()
+        if os.path.exists(meta_file):
+            with open(meta_file, "r") as f:
+                for line in f:
+                    if ":" in line:
+                        key, val = line.strip().split(":", 1)
+                        meta_data[key] = val
+        return meta_data
+
+    def _remove_meta(self):
+        if os.path.exists(self._meta_file()):
+            os.remove(self._meta_file())
+
+    @staticmethod
+    def _result_from_meta(meta_data: Dict[str, str], return_code: int) -> Dict[str, Any]:
+        result = {
+            "status": "Accepted",
+            "time_used_ms": 0,
+            "memory_used_kb": 0,
+            # isolate itself exits 1 on any failure; the program's own exit
+            # code, when it exited, is in the meta file
+            "return_code": int(meta_data.get("exitcode", return_code))
+        }
+        time_used_sec = float(meta_data.get("time", 0.0))
+        result["time_used_ms"] = int(time_used_sec * 1000)
+        result["memory_used_kb"] = int(meta_data.get("cg-mem", meta_data.get("max-rss", 0)))
+        
+        # Determine execution status based on Isolate's meta codes
+        if "status" in meta_data:
+            status_code = meta_data["status"]
+            
+            if status_code == "TO":
+                result["status"] = "Time Limit Exceeded"
+            elif status_code == "SG":
+                # Killed by signal (often Segfault or OOM)
+                message = meta_data.get("message", "")
+                if "Out of memory" in message:
+                    result["status"] = "Memory Limit Exceeded"
+                else:
+                    result["status"] = "Runtime Error"
+            elif status_code == "RE":
+                result["status"] = "Runtime Error"
+            elif status_code == "XX":
+                result["status"] = "System Error"
+        else:
+            # If there's no status field, the program exited normally. Check the exit code.
+            if result["return_code"] != 0:
+                result["status"] = "Runtime Error"
 
+        return result
+
+    def run(self, 
+            command: list, 
+            stdin_file: str = None,
+            stdout_file: str = None,
+            stderr_file: str = None,
+            time_limit_ms: int = 1000, 
+            memory_limit_mb: int = 256
+        ) -> Dict[str, Any]:
+        full_cmd = self._isolate_cmd(
+            command, time_limit_ms, memory_limit_mb,
+            stdin_file=stdin_file, stdout_file=stdout_file, stderr_file=stderr_file,
+        )
         try:
             logger.info(f"Running isolate command: {' '.join(full_cmd)}")
             
             # Run the command synchronously; isolate handles all timeouts natively.
-            proc = subprocess.run(full_cmd, capture_output=True, text=True)
-            
-            # The executable process's exit code is returned by isolate
-            result["return_code"] = proc.returncode
-
-            # Parse the meta file generated by isolate
-            meta_data = {}
-            if os.path.exists(meta_file):
-                with open(meta_file, "r") as f:
-                    for line in f:
-                        if ":" in line:
-                            key, val = line.strip().split(":", 1)
-                            meta_data[key] = val
-            
-            time_used_sec = float(meta_data.get("time", 0.0))
-            result["time_used_ms"] = int(time_used_sec * 1000)
-            result["memory_used_kb"] = int(meta_data.get("cg-mem", meta_data.get("max-rss", 0)))
-            
-            # Determine execution status based on Isolate's meta codes
-            if "status" in meta_data:
-                status_code = meta_data["status"]
-                
-                if status_code == "TO":
-                    result["status"] = "Time Limit Exceeded"
-                elif status_code == "SG":
-                    # Killed by signal (often Segfault or OOM)
-                    message = meta_data.get("message", "")
-                    if "Out of memory" in message:
-                        result["status"] = "Memory Limit Exceeded"
-                    else:
-                        result["status"] = "Runtime Error"
-                elif status_code == "RE":
-                    result["status"] = "Runtime Error"
-                elif status_code == "XX":
-                    result["status"] = "System Error"
-            else:
-                # If there's no status field, the program exited normally. Check the exit code.
-                if result["return_code"] != 0:
-                    result["status"] = "Runtime Error"
+            proc = subprocess.run(
+                full_cmd, capture_output=True, text=True,
+                preexec_fn=self.lease.pin if self.lease else None,
+            )
+            return self._result_from_meta(self._read_meta(), proc.returncode)
+        except Exception as e:
+            logger.error(f"Isolate execution failed: {e}")
+            return _system_error()
+        finally:
+            self._remove_meta()
 
+    def run_interactive(self,
+                        command: list,
+                        interactor: "Sandbox",
+                        interactor_command: list,
+                        stderr_file: str = None,
+                        interactor_stderr_file: str = None,
+                        time_limit_ms: int = 1000,
+                        memory_limit_mb: int = 256,
+                        interactor_time_limit_ms: int = None,
+                        interactor_memory_limit_mb: int = 256
+        ) -> Dict[str, Any]:
+        """
+        Run `command` in this box against `interactor_command` in the
+        `interactor` box, each one's stdout wired straight to the other's stdin
+        through a pipe. Nothing relays or buffers the traffic in between, so a
+        round trip costs two pipe writes. Each side has its own CPU time and
+        memory limit; the contestant is only charged its own CPU time, and the
+        wall limit covers both sides' CPU time as each waits on the other.
+        Returns the contestant's result with the combined verdict.
+        """
+        if interactor_time_limit_ms is None:
+            interactor_time_limit_ms = time_limit_ms
+        wall_time_sec = (time_limit_ms + interactor_time_limit_ms) / 1000.0 + 1.0
+        contestant_cmd = self._isolate_cmd(
+            command, time_limit_ms, memory_limit_mb, wall_time_sec=wall_time_sec, stderr_file=stderr_file,
+        )
+        # The interactor stays off the leased core (it runs on the housekeeping
+        # cores the worker itself is confined to)
+        interactor_cmd = interactor._isolate_cmd(
+            interactor_command, interactor_time_limit_ms, interactor_memory_limit_mb,
+            wall_time_sec=wall_time_sec, stderr_file=interactor_stderr_file, pin=False,
+        )
+
+        to_interactor_r, to_interactor_w = os.pipe()
+        to_contestant_r, to_contestant_w = os.pipe()
+        try:
+            logger.info(f"Running interactive isolate commands: {' '.join(contestant_cmd)} <-> {' '.join(interactor_cmd)}")
+            # close_fds (the default) keeps each side from holding the other
+            # pair's ends, so either one exiting gives its peer EOF / EPIPE
+            interactor_proc = subprocess.Popen(
+                interactor_cmd, stdin=to_interactor_r, stdout=to_contestant_w, stderr=subprocess.DEVNULL,
+            )
+            try:
+                contestant_proc = subprocess.Popen(
+                    contestant_cmd, stdin=to_contestant_r, stdout=to_interactor_w, stderr=subprocess.DEVNULL,
+                    preexec_fn=self.lease.pin if self.lease else None,
+                )
+            except Exception:
+                interactor_proc.kill()
+                interactor_proc.wait()
+                raise
         except Exception as e:
             logger.error(f"Isolate execution failed: {e}")
+            return _system_error()
+        finally:
+            # Only the boxes may hold the pipe ends
+            for fd in (to_interactor_r, to_interactor_w, to_contestant_r, to_contestant_w):
+                os.close(fd)
+
+        try:
+            # isolate enforces the wall limit on both sides, so both waits end
+            contestant_code = contestant_proc.wait()
+            interactor_code = interactor_proc.wait()
+            result = self._result_from_meta(self._read_meta(), contestant_code)
+            interactor_result = self._result_from_meta(interactor._read_meta(), interactor_code)
+            result["status"] = _interactive_verdict(result, interactor_result)
+            return result
+        except Exception as e:
+            logger.error(f"Isolate execution failed: {e}")
+            return _system_error()
+        finally:
+            self._remove_meta()
+            interactor._remove_meta()
+
+    def cleanup(self):
+        self._cleanup_isolate()
+
+
+class LocalSandbox:
+    """
+    Drop-in stand-in for Sandbox that runs the command as a plain subprocess
+    with CPU / address-space rlimits, so the judge can run on any Linux box
+    without isolate. It provides no isolation at all: use it for development
+    and benchmarks, never for untrusted code.
+    """
+
+    def __init__(self, box_id: int = 0, lease: Optional[CoreLease] = None):
+        self.box_id = box_id
+        self.lease = lease
+        self.box_path = tempfile.mkdtemp(prefix=f"localbox-{box_id}-")
+        os.makedirs(os.path.join(self.box_path, "box"))
+
+    def _resolve(self, command: list) -> list:
+        # Interpreter paths in the judge are those of the isolate image
+        if os.path.isabs(command[0]) and not os.path.exists(command[0]):
+            found = shutil.which(os.path.basename(command[0]))
+            if found:
+                return [found] + list(command[1:])
+        return list(command)
+
+    def _limits(self, time_limit_ms: int, memory_limit_mb: int, pin: bool = True):
+        """preexec_fn applying the CPU / address-space rlimits (and the core pin)."""
+        def set_limits():
+            if self.lease and pin:
+                self.lease.pin()
+            cpu = int(math.ceil(time_limit_ms / 1000.0)) + 1
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu))
+            memory = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+        return set_limits
+
+    @staticmethod
+    def _result(wait_status: int, usage, timed_out: bool, time_limit_ms: int, memory_limit_mb: int) -> Dict[str, Any]:
+        result = {
+            "status": "Accepted",
+            "time_used_ms": int((usage.ru_utime + usage.ru_stime) * 1000),
+            "memory_used_kb": int(usage.ru_maxrss),
+            "return_code": os.waitstatus_to_exitcode(wait_status)
+        }
+        if timed_out or result["time_used_ms"] > time_limit_ms or result["return_code"] == -signal.SIGXCPU:
+            result["status"] = "Time Limit Exceeded"
+        elif result["memory_used_kb"] > memory_limit_mb * 1024:
+            result["status"] = "Memory Limit Exceeded"
+        elif result["return_code"] != 0:
+            result["status"] = "Runtime Error"
+        return result
+
+    def run(self,
+            command: list,
+            stdin_file: str = None,
+            stdout_file: str = None,
+            stderr_file: str = None,
+            time_limit_ms: int = 1000,
+            memory_limit_mb: int = 256
+        ) -> Dict[str, Any]:
+
+        result = {
+            "status": "Accepted",
+            "time_used_ms": 0,
+            "memory_used_kb": 0,
+            "return_code": 0
+        }
+        box = os.path.join(self.box_path, "box")
+        time_limit_sec = time_limit_ms / 1000.0
+        wall_time_sec = time_limit_sec + 1.0
+        set_limits = self._limits(time_limit_ms, memory_limit_mb)
+
+        def open_in_box(name, mode):
+            return open(os.path.join(box, name), mode) if name else subprocess.DEVNULL
+
+        stdin = open_in_box(stdin_file, "rb")
+        stdout = open_in_box(stdout_file, "wb")
+        stderr = open_in_box(stderr_file, "wb")
+        timed_out = threading.Event()
+        try:
+            resolved = self._resolve(command)
+            proc = subprocess.Popen(
+                self.lease.wrap(resolved) if self.lease else resolved, cwd=box, stdin=stdin, stdout=stdout, stderr=stderr,
+                preexec_fn=set_limits,
+            )
+
+            def kill():
+                timed_out.set()
+                proc.kill()
+
+            timer = threading.Timer(wall_time_sec, kill)
+            timer.start()
+            try:
+                _, wait_status, usage = os.wait4(proc.pid, 0)
+            finally:
+                timer.cancel()
+            result = self._result(wait_status, usage, timed_out.is_set(), time_limit_ms, memory_limit_mb)
+            proc.returncode = result["return_code"]
+        except Exception as e:
+            logger.error(f"Local sandbox execution failed: {e}")
             result["status"] = "System Error"
         finally:
-            if os.path.exists(meta_file):
-                os.remove(meta_file)
+            for f in (stdin, stdout, stderr):
+                if f is not subprocess.DEVNULL:
+                    f.close()
+
+        return result
+
+    def run_interactive(self,
+                        command: list,
+                        interactor: "LocalSandbox",
+                        interactor_command: list,
+                        stderr_file: str = None,
+                        interactor_stderr_file: str = None,
+                        time_limit_ms: int = 1000,
+                        memory_limit_mb: int = 256,
+                        interactor_time_limit_ms: int = None,
+                        interactor_memory_limit_mb: int = 256
+        ) -> Dict[str, Any]:
+        """Sandbox.run_interactive with the rlimits of run()."""
+        if interactor_time_limit_ms is None:
+            interactor_time_limit_ms = time_limit_ms
+        wall_time_sec = (time_limit_ms + interactor_time_limit_ms) / 1000.0 + 1.0
+
+        def open_err(sandbox, name):
+            return open(os.path.join(sandbox.box_path, "box", name), "wb") if name else subprocess.DEVNULL
+
+        stderr = open_err(self, stderr_file)
+        interactor_stderr = open_err(interactor, interactor_stderr_file)
+        to_interactor_r, to_interactor_w = os.pipe()
+        to_contestant_r, to_contestant_w = os.pipe()
+        procs = []
+        timed_out = threading.Event()
+        try:
+            procs.append(subprocess.Popen(
+                interactor._resolve(interactor_command), cwd=os.path.join(interactor.box_path, "box"),
+                stdin=to_interactor_r, stdout=to_contestant_w, stderr=interactor_stderr,
+                preexec_fn=interactor._limits(interactor_time_limit_ms, interactor_memory_limit_mb, pin=False),
+            ))
+            resolved = self._resolve(command)
+            procs.append(subprocess.Popen(
+                self.lease.wrap(resolved) if self.lease else resolved, cwd=os.path.join(self.box_path, "box"),
+                stdin=to_contestant_r, stdout=to_interactor_w, stderr=stderr,
+                preexec_fn=self._limits(time_limit_ms, memory_limit_mb),
+            ))
+        except Exception as e:
+            logger.error(f"Local sandbox execution failed: {e}")
+            for proc in procs:
+                proc.kill()
+                proc.wait()
+            return _system_error()
+        finally:
+            # Only the two processes may hold the pipe ends
+            for fd in (to_interactor_r, to_interactor_w, to_contestant_r, to_contestant_w):
+                os.close(fd)
+            for f in (stderr, interactor_stderr):
+                if f is not subprocess.DEVNULL:
+                    f.close()
+
+        interactor_proc, contestant_proc = procs
+
+        def kill():
+            timed_out.set()
+            for proc in procs:
+                proc.kill()
+
+        timer = threading.Timer(wall_time_sec, kill)
+        timer.start()
+        try:
+            _, contestant_status, contestant_usage = os.wait4(contestant_proc.pid, 0)
+            _, interactor_status, interactor_usage = os.wait4(interactor_proc.pid, 0)
+        finally:
+            timer.cancel()
+        contestant_proc.returncode = os.waitstatus_to_exitcode(contestant_status)
+        interactor_proc.returncode = os.waitstatus_to_exitcode(interactor_status)
 
+        result = self._result(contestant_status, contestant_usage, timed_out.is_set(), time_limit_ms, memory_limit_mb)
+        interactor_result = self._result(
+            interactor_status, interactor_usage, timed_out.is_set(), interactor_time_limit_ms, interactor_memory_limit_mb
+        )
+        result["status"] = _interactive_verdict(result, interactor_result)
         return result
 
     def cleanup(self):
-        self._cleanup_isolate()
+        shutil.rmtree(self.box_path, ignore_errors=True)
+
+
+def create_sandbox(box_id: int = 0, lease: Optional[CoreLease] = None):
+    """The sandbox selected by SANDBOX_BACKEND."""
+    if settings.SANDBOX_BACKEND == "local":
+        return LocalSandbox(box_id=box_id, lease=lease)
+    return Sandbox(box_id=box_id, lease=lease)
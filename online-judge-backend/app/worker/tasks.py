@@ -2,36 +2,283 @@ import os
 import shutil
 import subprocess
 import logging
+from datetime import datetime, timedelta, timezone
+from collections import Counter
+from typing import Optional
 from app.core.celery_app import celery_app
-from app import crud, models
+from app import crud, models, schemas
 from app.db.session import SessionLocal
-from app.worker.sandbox import Sandbox
+from app.worker.sandbox import create_sandbox
+from app.worker.calibration import run_calibrated
+from app.worker.interactor import compile_interactor
+from app.worker import cpus
+from app.worker.lease import PRETESTS_PASSED, JudgeLease, LeaseLost
+from app.worker.dedupe import executable_hash, reuse_enabled, test_result_key, verdict_key
+from app.worker.timing import StageTimer, QUEUE, INIT, COMPILE, PREPARE, RUN, COMPARE, DB
+from app.core.metrics import (
+    JUDGE_COMPILE_CACHE, JUDGE_IN_FLIGHT, JUDGE_STAGE_SECONDS, JUDGE_TEST_RESULT_CACHE, JUDGE_VERDICT_REUSE,
+    JUDGE_VERDICTS, SANDBOX_BOXES_IN_USE,
+)
+from app.core.config import settings
+from app.core.test_data import test_data_store
+from app.core.response_cache import response_cache, PROBLEMS, CONTESTS, LEADERBOARD
+from app.services.problem_package import read_problem_package
 
 logger = logging.getLogger(__name__)
 
-@celery_app.task
-def judge_submission(submission_id: str):
+def _record_judge_metrics(timer: StageTimer, language: str, verdict: Optional[str]) -> None:
+    for stage, ms in timer.stages.items():
+        JUDGE_STAGE_SECONDS.labels(stage).observe(ms / 1000)
+    if verdict:
+        JUDGE_VERDICTS.labels(language, verdict).inc()
+
+
+def _failed(detail: Optional[dict]) -> bool:
+    return detail is not None and detail["status"] != "Accepted"
+
+
+def _split_pretests(test_cases) -> bool:
+    return (
+        settings.JUDGE_PRETESTS
+        and len(test_cases) >= settings.JUDGE_PRETEST_MIN_TESTS
+        and len(_pretest_ids(test_cases)) < len(test_cases)
+    )
+
+
+def _pretest_ids(test_cases) -> set:
+    """The samples plus the first JUDGE_PRETEST_COUNT other tests."""
+    samples = [str(tc.id) for tc in test_cases if tc.is_sample]
+    others = [str(tc.id) for tc in test_cases if not tc.is_sample]
+    return set(samples + others[:settings.JUDGE_PRETEST_COUNT])
+
+
+def _publish_pretests(db, judge_lease: JudgeLease, submission, test_cases, results: dict,
+                      timer: StageTimer, differential: bool) -> None:
+    """
+    End of the pretest phase, all pretests passed: publish the interim
+    verdict with the pretest details and queue the system tests on
+    JUDGE_SYSTEM_TEST_QUEUE. The second phase picks the details up and adds
+    the remaining tests to them.
+    """
+    details = [results[str(tc.id)] for tc in test_cases if str(tc.id) in results]
+    with timer.stage(DB):
+        published = crud.submission.publish_interim(
+            db,
+            submission_id=submission.id,
+            token=judge_lease.token,
+            status=PRETESTS_PASSED,
+            time_used=max((d["time_ms"] for d in details), default=0),
+            memory_used=int(max((d["memory_kb"] for d in details), default=0)),
+            details=details,
+            timings=timer.as_dict(precision=1),
+            hold_seconds=settings.JUDGE_SYSTEM_TEST_TIMEOUT_SECONDS,
+        )
+    if not published:
+        raise LeaseLost(f"Lost the judge lease on submission {submission.id}")
+    judge_submission.apply_async(
+        (str(submission.id), differential, True), queue=settings.JUDGE_SYSTEM_TEST_QUEUE
+    )
+    _record_judge_metrics(timer, submission.language, None)
+    logger.info(f"Judged {submission.id}: {PRETESTS_PASSED} ({len(details)} of {len(test_cases)} tests)")
+
+
+def _write_test_data(digest: Optional[str], inline: Optional[str], path: str) -> None:
+    if digest:
+        test_data_store.copy_to(digest, path)
+    else:
+        with open(path, "w") as f:
+            f.write(inline)
+
+
+def _test_detail(tc, res: dict) -> dict:
+    return {
+        "test_case_id": str(tc.id),
+        "status": res["status"],
+        "time_ms": res["time_used_ms"],
+        "memory_kb": res["memory_used_kb"],
+        "return_code": res["return_code"],
+        "runs": res.get("runs", 1)
+    }
+
+
+def _run_test(sandbox, timer: StageTimer, tc, idx: int, box_path: str, executable_cmd: list,
+              time_limit: int, memory_limit: int) -> dict:
+    """Run one test case in the box and compare its output; returns its details entry."""
+    input_filename = f"{idx}.in"
+    output_filename = f"{idx}.out"
+    err_filename = f"{idx}.err"
+
+    input_path = os.path.join(box_path, input_filename)
+    output_path = os.path.join(box_path, output_filename)
+
+    with timer.stage(PREPARE):
+        _write_test_data(tc.input_hash, tc.input_data, input_path)
+
+    with timer.stage(RUN):
+        res = run_calibrated(
+            lambda time_limit_ms: sandbox.run(
+                command=executable_cmd,
+                stdin_file=input_filename,
+                stdout_file=output_filename,
+                stderr_file=err_filename,
+                time_limit_ms=time_limit_ms,
+                memory_limit_mb=memory_limit
+            ),
+            time_limit,
+        )
+
+    if res["status"] == "Accepted":
+        with timer.stage(COMPARE):
+            actual_output = ""
+            if os.path.exists(output_path):
+                with open(output_path, "r") as f:
+                    actual_output = f.read().strip()
+
+            if tc.output_hash:
+                expected_output = test_data_store.read_text(tc.output_hash).strip()
+            else:
+                expected_output = tc.output_data.strip()
+        if actual_output != expected_output:
+            res["status"] = "Wrong Answer"
+
+    for f in [input_path, output_path, os.path.join(box_path, err_filename)]:
+        if os.path.exists(f):
+            os.remove(f)
+
+    return _test_detail(tc, res)
+
+
+def _run_interactive_test(sandbox, interactor_box, timer: StageTimer, tc, idx: int, box_path: str,
+                          executable_cmd: list, time_limit: int, memory_limit: int) -> dict:
+    """
+    Run one test case of an interactive problem: the interactor reads the
+    test's input and answer files and judges the exchange itself.
+    """
+    interactor_path = os.path.join(interactor_box.box_path, "box")
+    input_filename = f"{idx}.in"
+    answer_filename = f"{idx}.ans"
+    log_filename = f"{idx}.log"
+    err_filename = f"{idx}.err"
+
+    with timer.stage(PREPARE):
+        _write_test_data(tc.input_hash, tc.input_data, os.path.join(interactor_path, input_filename))
+        _write_test_data(tc.output_hash, tc.output_data, os.path.join(interactor_path, answer_filename))
+
+    with timer.stage(RUN):
+        res = run_calibrated(
+            lambda time_limit_ms: sandbox.run_interactive(
+                command=executable_cmd,
+                interactor=interactor_box,
+                interactor_command=["./interactor.out", input_filename, answer_filename],
+                stderr_file=err_filename,
+                interactor_stderr_file=log_filename,
+                time_limit_ms=time_limit_ms,
+                memory_limit_mb=memory_limit,
+                interactor_memory_limit_mb=settings.JUDGE_INTERACTOR_MEMORY_MB
+            ),
+            time_limit,
+        )
+
+    for f in [
+        os.path.join(interactor_path, input_filename),
+        os.path.join(interactor_path, answer_filename),
+        os.path.join(interactor_path, log_filename),
+        os.path.join(box_path, err_filename),
+    ]:
+        if os.path.exists(f):
+            os.remove(f)
+
+    return _test_detail(tc, res)
+
+
+# Acked only once judged, so a worker that dies mid-judge gets its message
+# redelivered; the judge lease makes a repeated delivery harmless.
+@celery_app.task(acks_late=True, reject_on_worker_lost=True, ignore_result=True)
+def judge_submission(submission_id: str, differential: bool = False, system_tests: bool = False):
+    """
+    Judge a submission; returns the wall time spent per stage (ms). With
+    `differential` (a rejudge), tests whose result for this executable, data
+    and limits is in the test result cache are not run again. `system_tests`
+    is the second phase of a pretest judge (see _publish_pretests).
+    """
     db = SessionLocal()
     submission = None
     sandbox = None
+    interactor_box = None
+    judge_lease = JudgeLease(db, submission_id, system_tests=system_tests)
+    timer = StageTimer()
+    JUDGE_IN_FLIGHT.inc()
     
     try:
-        submission = crud.submission.get(db, id=submission_id)
+        with timer.stage(DB):
+            claimed = judge_lease.claim()
+        if not claimed:
+            # Already judged, or another worker holds a live lease on it
+            logger.info(f"Submission {submission_id} not claimable; skipping.")
+            return
+        with timer.stage(DB):
+            submission = crud.submission.get(db, id=submission_id)
         if not submission:
             logger.error(f"Submission {submission_id} not found.")
             return
-
-        crud.submission.update_status(db, submission_id=submission.id, status="Judging")
+        if system_tests:
+            # Carry on from the pretest phase's timings
+            for stage, ms in (submission.timings or {}).items():
+                timer.add(stage, ms)
+        elif submission.created_at:
+            timer.add(QUEUE, (datetime.now(timezone.utc) - submission.created_at).total_seconds() * 1000)
         
         problem = submission.problem
         language = submission.language
         code = submission.code
 
+        # Identical code on the same problem version and tests: reuse the verdict
+        judge_key = None
+        if reuse_enabled(submission):
+            with timer.stage(DB):
+                judge_key = verdict_key(problem, problem.test_cases, language, code)
+                previous = crud.submission.get_by_judge_key(db, judge_key=judge_key, exclude_id=submission.id)
+            if previous:
+                JUDGE_VERDICT_REUSE.labels("hit").inc()
+                with timer.stage(DB):
+                    written = crud.submission.update_result(
+                        db,
+                        submission_id=submission.id,
+                        status=previous.status,
+                        total_score=previous.total_score,
+                        time_used=previous.time_used,
+                        memory_used=previous.memory_used,
+                        details=previous.details,
+                        timings=timer.as_dict(precision=1),
+                        token=judge_lease.token,
+                        judge_key=judge_key,
+                        commit=False
+                    )
+                    if not written:
+                        raise LeaseLost(f"Lost the judge lease on submission {submission_id}")
+                    # Counted like a judged submission (compilation errors never are)
+                    if previous.status != "Compilation Error":
+                        problem.submission_count += 1
+                        if previous.status == "Accepted":
+                            problem.accepted_count += 1
+                        db.add(problem)
+                    db.commit()
+                if previous.status == "Accepted":
+                    response_cache.invalidate(LEADERBOARD)
+                _record_judge_metrics(timer, language, previous.status)
+                logger.info(f"Judged {submission_id}: {previous.status} (reused {previous.id})")
+                return timer.as_dict()
+            JUDGE_VERDICT_REUSE.labels("miss").inc()
+
         # Initialize isolate sandbox. It uses box ID based on part of submission ID or hash
         # Isolate allows concurrent boxes by passing a unique integer ID (0-999)
         # Using hash of string mod 900 + 10 as safe box ID
-        box_id = (hash(str(submission_id)) % 900) + 10
-        sandbox = Sandbox(box_id=box_id)
+        # With JUDGE_CPU_PINNING the box id comes with this process's core lease
+        lease = cpus.current_lease()
+        box_id = lease.box_id if lease else (hash(str(submission_id)) % 900) + 10
+        with timer.stage(INIT):
+            sandbox = create_sandbox(box_id=box_id, lease=lease)
+        SANDBOX_BOXES_IN_USE.inc()
         box_path = os.path.join(sandbox.box_path, "box")
 
         filename = "main"
@@ -48,13 +295,18 @@ def judge_submission(submission_id: str):
         if language == "Python":
             # Python script inside box
             executable_cmd = ["/usr/local/bin/python3", f"{filename}{extension}"]
+            if problem.is_interactive:
+                # Unbuffered, so each reply reaches the interactor as it is printed
+                executable_cmd.insert(1, "-u")
         elif language == "C++":
             exe_path = os.path.join(box_path, "main.out")
             compile_cmd = ["g++", code_path, "-o", exe_path, "-O2"]
             try:
                 # Compile natively outside the sandbox for simplicity and performance
                 # as Isolate is mostly used to secure the user execution
-                subprocess.check_output(compile_cmd, stderr=subprocess.STDOUT)
+                JUDGE_COMPILE_CACHE.labels("miss").inc()
+                with timer.stage(COMPILE):
+                    subprocess.check_output(compile_cmd, stderr=subprocess.STDOUT)
                 
                 # Executable relative to isolate box root
                 executable_cmd = ["./main.out"]
@@ -62,28 +314,61 @@ def judge_submission(submission_id: str):
                 compile_error = e.output.decode()
         
         if compile_error:
-            crud.submission.update_result(
-                db, 
-                submission_id=submission.id, 
-                status="Compilation Error", 
-                total_score=0,
-                time_used=0,
-                memory_used=0,
-                details={"error": compile_error}
-            )
-            return
+            with timer.stage(DB):
+                crud.submission.update_result(
+                    db, 
+                    submission_id=submission.id, 
+                    status="Compilation Error", 
+                    total_score=0,
+                    time_used=0,
+                    memory_used=0,
+                    details={"error": compile_error},
+                    timings=timer.as_dict(precision=1),
+                    token=judge_lease.token,
+                    judge_key=judge_key
+                )
+            _record_judge_metrics(timer, language, "Compilation Error")
+            logger.info(f"Judged {submission_id}: Compilation Error {timer.as_dict(precision=1)}")
+            return timer.as_dict()
 
-        test_cases = problem.test_cases
-        
-        total_score = 0
-        max_time = 0
-        max_memory = 0
-        results_detail = []
-        final_status = "Accepted"
-        
-        if not test_cases:
-             final_status = "Skipped (No Test Cases)"
+        with timer.stage(DB):
+            test_cases = problem.test_cases
+            judge_lease.heartbeat(force=True)
+
+        # Interactive problems: the interactor gets a box of its own, wired to
+        # the submission's box by pipes for each test
+        interactor_hash = None
+        if problem.is_interactive:
+            with timer.stage(COMPILE):
+                interactor_exe = compile_interactor(problem.interactor_code)
+            with timer.stage(INIT):
+                interactor_box = create_sandbox(box_id=box_id + settings.JUDGE_INTERACTOR_BOX_OFFSET)
+            SANDBOX_BOXES_IN_USE.inc()
+            shutil.copy(interactor_exe, os.path.join(interactor_box.box_path, "box", "interactor.out"))
+            interactor_hash = executable_hash(interactor_exe, "interactor")
+
+        # Per-test results of an earlier, interrupted attempt (JUDGE_CHECKPOINTS)
+        limits = [problem.time_limit, problem.memory_limit]
+        checkpoint = {"limits": limits, "results": {}}
+        resumed = {}
+        saved = submission.judge_checkpoint
+        if settings.JUDGE_CHECKPOINTS and saved and saved.get("limits") == limits:
+            resumed = saved.get("results") or {}
+            logger.info(f"Resuming {submission_id} with {len(resumed)} of {len(test_cases)} tests done")
 
+        # Per-test result cache (JUDGE_TEST_RESULT_CACHE): every run is stored,
+        # a differential rejudge only runs the tests that have no entry
+        result_keys, cached, fresh = {}, {}, {}
+        if settings.JUDGE_TEST_RESULT_CACHE:
+            exe_hash = executable_hash(exe_path if language == "C++" else code_path, language)
+            result_keys = {
+                tc.id: test_result_key(exe_hash, tc, problem.time_limit, problem.memory_limit, interactor_hash)
+                for tc in test_cases
+            }
+            if differential:
+                with timer.stage(DB):
+                    cached = crud.test_result.get_many(db, list(result_keys.values()))
+        
         groups = {}
         for tc in test_cases:
             g = getattr(tc, 'group', 1)
@@ -105,90 +390,246 @@ def judge_submission(submission_id: str):
             for g_info in groups.values():
                 g_info['max_points'] = fallback_score_per_group
 
-        for idx, tc in enumerate(test_cases):
-            input_filename = f"{idx}.in"
-            output_filename = f"{idx}.out"
-            err_filename = f"{idx}.err"
-            
-            input_path = os.path.join(box_path, input_filename)
-            output_path = os.path.join(box_path, output_filename)
-            
-            with open(input_path, "w") as f:
-                f.write(tc.input_data)
-            
-            limit_time = getattr(problem, "time_limit", 1000)
-            limit_mem = getattr(problem, "memory_limit", 256)
+        # Two-phase judging (JUDGE_PRETESTS): samples and a pretest subset first,
+        # then the remaining system tests as a separate, lower-priority task
+        pretest_ids = set()
+        if system_tests:
+            # The pretest results were published with the interim verdict
+            interim = {d["test_case_id"]: d for d in submission.details or [] if isinstance(d, dict)}
+            resumed = {**interim, **resumed}
+        elif _split_pretests(test_cases):
+            pretest_ids = _pretest_ids(test_cases)
 
-            res = sandbox.run(
-                command=executable_cmd,
-                stdin_file=input_filename,
-                stdout_file=output_filename,
-                stderr_file=err_filename,
-                time_limit_ms=limit_time,
-                memory_limit_mb=limit_mem
-            )
+        results = dict(resumed)  # test case id -> details entry
 
-            if res["status"] == "Accepted":
-                actual_output = ""
-                if os.path.exists(output_path):
-                    with open(output_path, "r") as f:
-                        actual_output = f.read().strip()
-                
-                expected_output = tc.output_data.strip()
-                if actual_output == expected_output:
-                    res["status"] = "Accepted"
+        def run_tests(batch):
+            for idx, tc in batch:
+                if str(tc.id) in results:
+                    continue
+                key = result_keys.get(tc.id)
+                if key in cached:
+                    JUDGE_TEST_RESULT_CACHE.labels("hit").inc()
+                    detail = {"test_case_id": str(tc.id), **cached[key]}
                 else:
-                    res["status"] = "Wrong Answer"
-                    final_status = "Wrong Answer"
-            else:
-                final_status = res["status"]
-                
-            if res["status"] != "Accepted":
+                    if differential and key:
+                        JUDGE_TEST_RESULT_CACHE.labels("miss").inc()
+                    if interactor_box:
+                        detail = _run_interactive_test(
+                            sandbox, interactor_box, timer, tc, idx, box_path, executable_cmd,
+                            time_limit=getattr(problem, "time_limit", 1000),
+                            memory_limit=getattr(problem, "memory_limit", 256),
+                        )
+                    else:
+                        detail = _run_test(
+                            sandbox, timer, tc, idx, box_path, executable_cmd,
+                            time_limit=getattr(problem, "time_limit", 1000),
+                            memory_limit=getattr(problem, "memory_limit", 256),
+                        )
+                    # A System Error is the judge failing, which a rejudge must retry
+                    if key and detail["status"] != "System Error":
+                        fresh[key] = {k: v for k, v in detail.items() if k != "test_case_id"}
+                results[str(tc.id)] = detail
+
+                # The checkpoint is saved whenever the lease is renewed
+                if settings.JUDGE_CHECKPOINTS:
+                    checkpoint["results"][str(tc.id)] = detail
+                with timer.stage(DB):
+                    judge_lease.heartbeat(checkpoint if settings.JUDGE_CHECKPOINTS else None)
+
+        indexed = list(enumerate(test_cases))
+        run_remaining = True
+        if pretest_ids:
+            run_tests([(idx, tc) for idx, tc in indexed if str(tc.id) in pretest_ids])
+            failed_groups = {tc.group or 1 for tc in test_cases if _failed(results.get(str(tc.id)))}
+            if not failed_groups:
+                if fresh:
+                    with timer.stage(DB):
+                        crud.test_result.save_many(db, fresh)
+                _publish_pretests(db, judge_lease, submission, test_cases, results, timer, differential)
+                return timer.as_dict()
+            # A pretest failed, so the verdict is a failure either way; the
+            # remaining tests only matter while some group can still score
+            run_remaining = len(failed_groups) < len(groups)
+        if run_remaining:
+            run_tests(indexed)
+
+        total_score = 0
+        max_time = 0
+        max_memory = 0
+        results_detail = []
+        final_status = "Accepted"
+        
+        if not test_cases:
+             final_status = "Skipped (No Test Cases)"
+
+        for tc in test_cases:
+            detail = results.get(str(tc.id))
+            if detail is None:
+                continue
+
+            if detail["status"] != "Accepted":
+                final_status = detail["status"]
                 group_id = getattr(tc, 'group', 1)
                 if group_id is None:
                     group_id = 1
                 groups[group_id]['all_passed'] = False
 
-            max_time = max(max_time, res["time_used_ms"])
-            max_memory = max(max_memory, res["memory_used_kb"])
-
-            results_detail.append({
-                "test_case_id": str(tc.id),
-                "status": res["status"],
-                "time_ms": res["time_used_ms"],
-                "memory_kb": res["memory_used_kb"],
-                "return_code": res["return_code"]
-            })
-
-            for f in [input_path, output_path, os.path.join(box_path, err_filename)]:
-                if os.path.exists(f):
-                    os.remove(f)
+            max_time = max(max_time, detail["time_ms"])
+            max_memory = max(max_memory, detail["memory_kb"])
+            results_detail.append(detail)
 
         for g_id, g_info in groups.items():
             if g_info['all_passed']:
                 total_score += g_info['max_points']
 
-        crud.submission.update_result(
-            db,
-            submission_id=submission.id,
-            status=final_status,
-            total_score=int(total_score),
-            time_used=max_time,
-            memory_used=int(max_memory),
-            details=results_detail
-        )
-        
-        problem.submission_count += 1
+        if fresh:
+            with timer.stage(DB):
+                crud.test_result.save_many(db, fresh)
+        if differential and result_keys:
+            logger.info(f"Rejudged {submission_id}: ran {len(fresh)} of {len(test_cases)} tests")
+
+        with timer.stage(DB):
+            written = crud.submission.update_result(
+                db,
+                submission_id=submission.id,
+                status=final_status,
+                total_score=int(total_score),
+                time_used=max_time,
+                memory_used=int(max_memory),
+                details=results_detail,
+                # The final write itself is only in the returned / logged timings
+                timings=timer.as_dict(precision=1),
+                token=judge_lease.token,
+                # A judge failure must not be reused for the next identical submission
+                judge_key=judge_key if final_status != "System Error" else None,
+                commit=False
+            )
+            if not written:
+                raise LeaseLost(f"Lost the judge lease on submission {submission_id}")
+
+            # Same transaction as the verdict, so a submission is counted exactly once
+            problem.submission_count += 1
+            if final_status == "Accepted":
+                problem.accepted_count += 1
+            db.add(problem)
+            db.commit()
         if final_status == "Accepted":
-            problem.accepted_count += 1
-        db.add(problem)
-        db.commit()
+            # A new solve can change the standings (reaches the API processes
+            # with the redis response cache backend only)
+            response_cache.invalidate(LEADERBOARD)
+        _record_judge_metrics(timer, language, final_status)
+        logger.info(f"Judged {submission_id}: {final_status} {timer.as_dict(precision=1)}")
+        return timer.as_dict()
 
+    except LeaseLost as e:
+        # Whoever holds the lease now writes the verdict
+        db.rollback()
+        logger.warning(str(e))
     except Exception as e:
         logger.error(f"Judge Error: {e}")
+        db.rollback()
         if submission:
-            crud.submission.update_status(db, submission_id=submission.id, status="System Error")
+            crud.submission.update_status(
+                db, submission_id=submission.id, status="System Error", token=judge_lease.token
+            )
+            JUDGE_VERDICTS.labels(submission.language, "System Error").inc()
     finally:
         if sandbox:
             sandbox.cleanup()
+            SANDBOX_BOXES_IN_USE.dec()
+        if interactor_box:
+            interactor_box.cleanup()
+            SANDBOX_BOXES_IN_USE.dec()
+        JUDGE_IN_FLIGHT.dec()
+        db.close()
+
+
+@celery_app.task
+def reap_stale_submissions() -> dict:
+    """
+    Re-queue submissions left in Judging by a judge that died (its lease ran
+    out); after JUDGE_MAX_ATTEMPTS claims they are failed as System Error.
+    Safe to run from several beat schedulers at once.
+    """
+    db = SessionLocal()
+    try:
+        requeued, failed = crud.submission.reap_stale(
+            db, lease_seconds=settings.JUDGE_LEASE_SECONDS, max_attempts=settings.JUDGE_MAX_ATTEMPTS
+        )
+    finally:
+        db.close()
+    for submission_id in requeued:
+        judge_submission.delay(str(submission_id))
+    if requeued or failed:
+        logger.warning(f"Reaped stale submissions: {len(requeued)} re-queued, {len(failed)} failed")
+    return {"requeued": len(requeued), "failed": len(failed)}
+
+
+@celery_app.task
+def prune_test_results() -> dict:
+    """Drop test result cache entries older than JUDGE_TEST_RESULT_TTL_DAYS."""
+    db = SessionLocal()
+    try:
+        older_than = datetime.now(timezone.utc) - timedelta(days=settings.JUDGE_TEST_RESULT_TTL_DAYS)
+        deleted = crud.test_result.prune(db, older_than=older_than)
+    finally:
+        db.close()
+    return {"deleted": deleted}
+
+
+def _test_signature(tc) -> tuple:
+    return (tc.input_hash, tc.output_hash, tc.group, tc.points, bool(tc.is_sample))
+
+
+# Polled through GET /problems/packages/jobs/{job_id}
+@celery_app.task(ignore_result=False, track_started=True)
+def import_problem_package(package_path: str, problem_id: Optional[str] = None) -> dict:
+    """
+    Import a staged problem package, creating a new problem or, with
+    problem_id, overwriting that problem's statement, code, tags and tests.
+    Test rows are only rewritten if the package's tests differ.
+    """
+    db = SessionLocal()
+    try:
+        package = read_problem_package(package_path, test_data_store)
+        tags = [crud.tag.get_or_create(db, name=name) for name in package.tags]
+
+        if problem_id:
+            problem = crud.problem.get(db, id=problem_id)
+            if not problem:
+                raise ValueError("Problem not found")
+            problem = crud.problem.update(db, db_obj=problem, obj_in=schemas.ProblemUpdate(**package.problem))
+        else:
+            problem = crud.problem.create(db, obj_in=schemas.ProblemCreate(**package.problem))
+        problem.tags = tags
+        db.commit()
+
+        existing = crud.test_case.get_meta_by_problem(db, problem_id=problem.id, limit=None)
+        unchanged = Counter(map(_test_signature, existing)) == Counter(map(_test_signature, package.tests))
+        if not unchanged:
+            test_cases_in = [
+                schemas.TestCaseCreate(
+                    input_hash=tc.input_hash,
+                    input_size=tc.input_size,
+                    output_hash=tc.output_hash,
+                    output_size=tc.output_size,
+                    group=tc.group,
+                    points=tc.points,
+                    is_sample=tc.is_sample,
+                ) for tc in package.tests
+            ]
+            crud.test_case.create_many(db, objs_in=test_cases_in, problem_id=problem.id, replace=True)
+
+        # Only reaches the API processes with the Redis backend; otherwise entries age out
+        response_cache.invalidate(PROBLEMS, CONTESTS)
+        return {
+            "problem_id": str(problem.id),
+            "test_count": len(package.tests),
+            "tests_replaced": not unchanged,
+            "files_stored": package.stored_count,
+            "files_reused": package.reused_count,
+        }
+    finally:
         db.close()
+        if os.path.exists(package_path):
+            os.remove(package_path)
@@ -0,0 +1,26 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from app.core.judge_stages import QUEUE, INIT, COMPILE, PREPARE, RUN, COMPARE, DB, STAGES  # noqa: F401
+
+
+class StageTimer:
+    """Wall-clock milliseconds spent in each judge stage, summed over tests."""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+
+    def add(self, name: str, ms: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + ms
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def as_dict(self, precision: int = 3) -> Dict[str, float]:
+        return {name: round(ms, precision) for name, ms in self.stages.items()}
@@ -0,0 +1,139 @@
+"""
+Count the Redis work a judge task costs: commands per submission, by command,
+and the result-backend keys and memory it leaves behind.
+
+Queues --submissions judge tasks for ids that don't exist, so a running worker
+picks each one up, finds nothing to judge and finishes straight away: the
+broker and result-backend traffic is that of a real judge (enqueue, deliver,
+ack, result handling) without the judging. Redis command counts come from
+INFO commandstats before and after; the script's own INFO / LLEN / HLEN
+polling is subtracted.
+
+Needs Redis and one running worker, and nothing else talking to that Redis
+while it runs. To compare two builds, run it on the old one with
+--output before.json, then on the new one with --baseline before.json:
+
+    celery -A app.core.celery_app worker --concurrency 4 &
+    python -m scripts.bench_broker --submissions 2000 --output broker.json
+"""
+import argparse
+import json
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+RESULT_KEY_PATTERN = "celery-task-meta-*"
+# Hash kombu keeps delivered-but-unacked messages in
+UNACKED_KEY = "unacked"
+
+
+def _command_calls(client) -> Counter:
+    stats = client.info("commandstats")
+    return Counter({name.replace("cmdstat_", ""): value["calls"] for name, value in stats.items()})
+
+
+def _count_keys(client, pattern: str) -> int:
+    return sum(1 for _ in client.scan_iter(match=pattern, count=1000))
+
+
+def _wait_drained(client, queue: str, timeout: float, own: Counter) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        pending = client.llen(queue) + client.hlen(UNACKED_KEY)
+        own["llen"] += 1
+        own["hlen"] += 1
+        if not pending:
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def compare(report: dict, baseline_path: str, max_regression: float) -> bool:
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    old, new = baseline["ops_per_submission"], report["ops_per_submission"]
+    change = (new - old) / old * 100 if old else 0.0
+    print(f"  ops/submission     {old:8.2f} -> {new:8.2f} ({change:+.1f}%)")
+    for command in sorted(set(baseline["commands"]) | set(report["commands"])):
+        before = baseline["commands"].get(command, 0.0)
+        after = report["commands"].get(command, 0.0)
+        if before != after:
+            print(f"    {command:16s} {before:8.2f} -> {after:8.2f}")
+    print(f"  result keys        {baseline['result_keys_created']:8d} -> {report['result_keys_created']:8d}")
+    print(f"  bytes/submission   {baseline['memory_bytes_per_submission']:8.1f} -> {report['memory_bytes_per_submission']:8.1f}")
+    return change <= max_regression
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--submissions", type=int, default=1000)
+    parser.add_argument("--queue", default="celery")
+    parser.add_argument("--timeout", type=float, default=300, help="seconds to wait for the worker to drain the queue")
+    parser.add_argument("--output", default="bench_broker.json")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--max-regression", type=float, default=5.0, help="allowed growth in ops/submission, percent")
+    args = parser.parse_args()
+
+    from app.core.cache import get_redis
+    from app.core.celery_app import celery_app
+    from app.worker.tasks import judge_submission
+
+    client = get_redis()
+    if not celery_app.control.ping(timeout=2):
+        raise SystemExit("No worker answered; start one first")
+    if client.llen(args.queue):
+        raise SystemExit(f"Queue {args.queue} is not empty; wait for it to drain")
+
+    keys_before = _count_keys(client, RESULT_KEY_PATTERN)
+    memory_before = client.info("memory")["used_memory"]
+    calls_before = _command_calls(client)
+    own = Counter()
+
+    print(f"[*] Queueing {args.submissions} judge tasks")
+    start = time.perf_counter()
+    for _ in range(args.submissions):
+        judge_submission.delay(str(uuid.uuid4()))
+    if not _wait_drained(client, args.queue, args.timeout, own):
+        raise SystemExit(f"Queue not drained after {args.timeout}s")
+    elapsed = time.perf_counter() - start
+
+    calls_after = _command_calls(client)
+    memory_after = client.info("memory")["used_memory"]
+    keys_after = _count_keys(client, RESULT_KEY_PATTERN)
+
+    calls = calls_after - calls_before - own
+    # The INFO calls that took these measurements
+    calls.pop("info", None)
+    total = sum(calls.values())
+    report = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "params": vars(args),
+        "elapsed_sec": round(elapsed, 3),
+        "ops_total": total,
+        "ops_per_submission": round(total / args.submissions, 3),
+        "commands": {
+            command: round(count / args.submissions, 3) for command, count in calls.most_common()
+        },
+        "result_keys_created": keys_after - keys_before,
+        "memory_bytes_per_submission": round((memory_after - memory_before) / args.submissions, 1),
+    }
+
+    print(f"[*] {report['ops_per_submission']:.2f} Redis commands per submission ({elapsed:.1f}s)")
+    for command, per in report["commands"].items():
+        print(f"  {command:16s} {per:8.2f}")
+    print(f"  result keys created: {report['result_keys_created']}")
+    print(f"  memory growth: {report['memory_bytes_per_submission']:.1f} bytes/submission")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"[*] Wrote {args.output}")
+
+    if args.baseline:
+        print(f"[*] Comparing with {args.baseline}")
+        if not compare(report, args.baseline, args.max_regression):
+            raise SystemExit(f"Redis commands per submission grew by more than {args.max_regression}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Benchmark judge throughput: how many submissions per second a worker sustains
+and where each submission's time goes.
+
+Seeds synthetic problems (configurable test count and size) and a batch of
+submissions with a chosen verdict mix, then runs judge_submission over them
+from a pool of worker processes, the way Celery's prefork pool would. With
+--sandbox local (the default) the isolate boxes are replaced by LocalSandbox,
+so this runs on any Linux box with g++ / python3.
+
+Reports p50/p95/p99 per stage (queue, init, compile, prepare, run, compare,
+db) and submissions/sec, and writes everything to JSON. With --baseline the
+run is compared against an earlier report and exits non-zero when throughput
+drops by more than --max-regression percent.
+
+Run it against a throwaway database, never against production:
+
+    python -m scripts.bench_judge --problems 5 --tests 20 --test-size 20000 \
+        --submissions 300 --workers 4 --mix AC=70,WA=15,TLE=5,RE=5,CE=5
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List
+
+VERDICTS = {
+    "AC": "Accepted",
+    "WA": "Wrong Answer",
+    "TLE": "Time Limit Exceeded",
+    "RE": "Runtime Error",
+    "CE": "Compilation Error",
+}
+
+PROGRAMS = {
+    "C++": {
+        "AC": "#include <cstdio>\nint main(){long long x,s=0;while(scanf(\"%lld\",&x)==1)s+=x;printf(\"%lld\\n\",s);}\n",
+        "WA": "#include <cstdio>\nint main(){long long x,s=0;while(scanf(\"%lld\",&x)==1)s+=x;printf(\"%lld\\n\",s+1);}\n",
+        "TLE": "int main(){volatile unsigned long long i=0;for(;;)i++;}\n",
+        "RE": "#include <cstdlib>\nint main(){abort();}\n",
+        "CE": "int main( {\n",
+    },
+    "Python": {
+        "AC": "import sys\nprint(sum(map(int, sys.stdin.buffer.read().split())))\n",
+        "WA": "import sys\nprint(sum(map(int, sys.stdin.buffer.read().split())) + 1)\n",
+        "TLE": "while True:\n    pass\n",
+        "RE": "raise SystemExit(1)\n",
+        # Python has no compile step in the judge; a syntax error is a runtime error
+        "CE": "def main(:\n",
+    },
+}
+
+STAGES = ("queue", "init", "compile", "prepare", "run", "compare", "db")
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def _summary(samples: List[float]) -> dict:
+    if not samples:
+        return {}
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(_percentile(samples, 95), 3),
+        "p99_ms": round(_percentile(samples, 99), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def _parse_mix(raw: str) -> Dict[str, int]:
+    mix = {}
+    for part in raw.split(","):
+        key, _, weight = part.partition("=")
+        key = key.strip().upper()
+        if key not in VERDICTS:
+            raise SystemExit(f"Unknown verdict in --mix: {key} (expected one of {', '.join(VERDICTS)})")
+        mix[key] = int(weight)
+    return mix
+
+
+def _make_test(rng: random.Random, size: int):
+    numbers, length = [], 0
+    while length < size:
+        n = rng.randint(-10**9, 10**9)
+        numbers.append(n)
+        length += len(str(n)) + 1
+    data = " ".join(map(str, numbers)) + "\n"
+    return data.encode(), f"{sum(numbers)}\n".encode()
+
+
+def seed(args, rng: random.Random) -> dict:
+    from app import crud, models, schemas
+    from app.core.test_data import test_data_store
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        tag = uuid.uuid4().hex[:8]
+        user = models.User(
+            username=f"bench_judge_{tag}", email=f"bench_judge_{tag}@example.com",
+            hashed_password="x", is_active=True, is_superuser=False,
+        )
+        db.add(user)
+        db.commit()
+
+        problem_ids = []
+        for p in range(args.problems):
+            problem = crud.problem.create(db, obj_in=schemas.ProblemCreate(
+                title=f"Bench Judge {tag} #{p + 1}", description="Sum the integers.",
+                input_description="Integers", output_description="Their sum",
+                time_limit=args.time_limit, memory_limit=args.memory_limit, is_active=False,
+            ))
+            tests = []
+            for _ in range(args.tests):
+                test_in, test_out = _make_test(rng, args.test_size)
+                in_hash, in_size = test_data_store.write_stream([test_in])
+                out_hash, out_size = test_data_store.write_stream([test_out])
+                tests.append(schemas.TestCaseCreate(
+                    input_hash=in_hash, input_size=in_size, output_hash=out_hash, output_size=out_size,
+                ))
+            crud.test_case.create_many(db, objs_in=tests, problem_id=problem.id)
+            problem_ids.append(problem.id)
+        return {"user_id": user.id, "problem_ids": problem_ids}
+    finally:
+        db.close()
+
+
+def create_submissions(args, rng: random.Random, seeded: dict, mix: Dict[str, int]) -> Dict[str, str]:
+    """Insert the submission batch in one transaction; returns {submission id: intended verdict}."""
+    from app import models
+    from app.db.session import SessionLocal
+
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=args.submissions)
+    db = SessionLocal()
+    try:
+        rows = [
+            models.Submission(
+                id=uuid.uuid4(), user_id=seeded["user_id"], problem_id=rng.choice(seeded["problem_ids"]),
+                language=args.language, code=PROGRAMS[args.language][kind], status="Pending",
+            )
+            for kind in kinds
+        ]
+        db.add_all(rows)
+        db.commit()
+        return {str(row.id): kind for row, kind in zip(rows, kinds)}
+    finally:
+        db.close()
+
+
+def _warm_up(_) -> None:
+    # Import the judge and calibrate (JUDGE_CALIBRATION) before the clock starts
+    from app.worker.calibration import speed_factor
+    speed_factor()
+
+
+def _judge(submission_id: str) -> dict:
+    # Runs in a spawned worker process, like a Celery prefork child
+    from app.worker.tasks import judge_submission
+    start = time.perf_counter()
+    stages = judge_submission(submission_id) or {}
+    return {"id": submission_id, "stages": stages, "wall_ms": (time.perf_counter() - start) * 1000}
+
+
+def cleanup(seeded: dict) -> None:
+    from app import models
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        problem_ids = seeded["problem_ids"]
+        db.query(models.Submission).filter(models.Submission.problem_id.in_(problem_ids)).delete(synchronize_session=False)
+        db.query(models.TestCase).filter(models.TestCase.problem_id.in_(problem_ids)).delete(synchronize_session=False)
+        db.query(models.Problem).filter(models.Problem.id.in_(problem_ids)).delete(synchronize_session=False)
+        db.query(models.User).filter(models.User.id == seeded["user_id"]).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def compare(report: dict, baseline_path: str, max_regression: float) -> bool:
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    ok = True
+    old, new = baseline["throughput"]["submissions_per_sec"], report["throughput"]["submissions_per_sec"]
+    change = (new - old) / old * 100 if old else 0.0
+    print(f"  submissions/sec  {old:8.2f} -> {new:8.2f} ({change:+.1f}%)")
+    if change < -max_regression:
+        ok = False
+    for stage in STAGES:
+        before = baseline["stages"].get(stage, {}).get("p95_ms")
+        after = report["stages"].get(stage, {}).get("p95_ms")
+        if before is not None and after is not None:
+            print(f"  {stage:8s} p95     {before:9.3f}ms -> {after:9.3f}ms")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sandbox", choices=("local", "isolate"), default="local")
+    parser.add_argument("--problems", type=int, default=5)
+    parser.add_argument("--tests", type=int, default=10, help="test cases per problem")
+    parser.add_argument("--test-size", type=int, default=10_000, help="approximate input bytes per test")
+    parser.add_argument("--submissions", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--language", choices=tuple(PROGRAMS), default="C++")
+    parser.add_argument("--mix", default="AC=70,WA=15,TLE=5,RE=5,CE=5")
+    parser.add_argument("--time-limit", type=int, default=1000, help="ms")
+    parser.add_argument("--memory-limit", type=int, default=256, help="MB")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--keep", action="store_true", help="leave the bench rows in the database")
+    parser.add_argument("--output", default="bench_judge.json")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="allowed throughput drop, percent")
+    args = parser.parse_args()
+
+    # Must be set before app settings are first imported, here and in the spawned workers
+    os.environ["SANDBOX_BACKEND"] = args.sandbox
+    mix = _parse_mix(args.mix)
+    rng = random.Random(args.seed)
+
+    print(f"[*] Seeding {args.problems} problems x {args.tests} tests of ~{args.test_size} bytes")
+    seeded = seed(args, rng)
+    try:
+        # Start the workers first so interpreter start-up isn't counted as queueing
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=args.workers, mp_context=ctx) as pool:
+            list(pool.map(_warm_up, range(args.workers)))
+
+            print(f"[*] Judging {args.submissions} {args.language} submissions on {args.workers} workers ({args.mix})")
+            intended = create_submissions(args, rng, seeded, mix)
+            start = time.perf_counter()
+            futures = [pool.submit(_judge, sid) for sid in intended]
+            results = [future.result() for future in as_completed(futures)]
+            elapsed = time.perf_counter() - start
+
+        from app import models
+        from app.db.session import SessionLocal
+        db = SessionLocal()
+        try:
+            statuses = dict(
+                db.query(models.Submission.id, models.Submission.status)
+                .filter(models.Submission.problem_id.in_(seeded["problem_ids"]))
+                .all()
+            )
+        finally:
+            db.close()
+    finally:
+        if not args.keep:
+            cleanup(seeded)
+
+    verdicts = Counter(statuses.values())
+    mismatched = sum(
+        1 for sid, kind in intended.items()
+        if statuses.get(uuid.UUID(sid)) != VERDICTS[kind] and not (args.language == "Python" and kind == "CE")
+    )
+    stages = {
+        stage: _summary([r["stages"][stage] for r in results if stage in r["stages"]])
+        for stage in STAGES
+    }
+    stages["total"] = _summary([r["wall_ms"] for r in results])
+
+    report = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "params": vars(args),
+        "host": {"platform": platform.platform(), "python": platform.python_version(), "cpus": os.cpu_count()},
+        "throughput": {
+            "submissions": len(results),
+            "elapsed_sec": round(elapsed, 3),
+            "submissions_per_sec": round(len(results) / elapsed, 3) if elapsed else 0.0,
+        },
+        "stages": stages,
+        "verdicts": dict(verdicts),
+        "unexpected_verdicts": mismatched,
+    }
+
+    print(f"[*] {report['throughput']['submissions_per_sec']:.2f} submissions/sec ({elapsed:.1f}s)")
+    for stage, summary in stages.items():
+        if summary:
+            print(f"  {stage:8s} p50={summary['p50_ms']:9.3f}ms p95={summary['p95_ms']:9.3f}ms p99={summary['p99_ms']:9.3f}ms")
+    print(f"  verdicts: {dict(verdicts)} (unexpected: {mismatched})")
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"[*] Wrote {args.output}")
+
+    if args.baseline:
+        print(f"[*] Comparing with {args.baseline}")
+        if not compare(report, args.baseline, args.max_regression):
+            raise SystemExit(f"Throughput regressed by more than {args.max_regression}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Benchmark the submission listing hot paths before/after the composite indexes
+added in alembic revision 6596364e2e3f.
+
+Seeds synthetic users/problems/submissions with generate_series, then for every
+query records the EXPLAIN (ANALYZE, BUFFERS) plan and latency percentiles twice:
+once with the indexes in place ("after") and once inside a transaction that
+drops them and is rolled back afterwards ("before").
+
+Run it against a throwaway database, never against production:
+
+    python -m scripts.bench_submission_indexes \
+        --database-url postgresql://oj:oj@localhost/oj_bench --submissions 3000000
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+
+INDEXES = [
+    "ix_submissions_user_id_created_at",
+    "ix_submissions_problem_id_created_at",
+    "ix_submissions_created_at",
+    "ix_submissions_problem_id_status",
+    "ix_submissions_contest_id_created_at",
+    "ix_submissions_accepted_user_id_problem_id",
+]
+
+# Bench rows use deterministic ids (md5 of a prefix + ordinal) so queries can
+# target a known user / problem without a lookup.
+SEED_SQL = [
+    """
+    INSERT INTO users (id, username, email, hashed_password, is_active, is_superuser)
+    SELECT md5('bench-user-' || i)::uuid, 'bench_user_' || i, 'bench_user_' || i || '@example.com',
+           'x', true, false
+    FROM generate_series(1, :users) AS i
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO problems (id, title, description, input_description, output_description,
+                          time_limit, memory_limit, difficulty, is_active,
+                          accepted_count, submission_count)
+    SELECT md5('bench-problem-' || i)::uuid, 'Bench Problem ' || i, 'd', 'i', 'o',
+           1000, 256, 'Easy', true, 0, 0
+    FROM generate_series(1, :problems) AS i
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO submissions (id, user_id, problem_id, language, code, status,
+                             total_score, time_used, memory_used, created_at)
+    SELECT gen_random_uuid(),
+           md5('bench-user-' || (1 + floor(random() * :users))::int)::uuid,
+           md5('bench-problem-' || (1 + floor(random() * :problems))::int)::uuid,
+           'C++', 'int main() { return 0; }',
+           CASE WHEN random() < 0.35 THEN 'Accepted' ELSE 'Wrong Answer' END,
+           0, (random() * 1000)::int, (random() * 65536)::int,
+           now() - (random() * interval '365 days')
+    FROM generate_series(1, :submissions)
+    """,
+    "ANALYZE users",
+    "ANALYZE problems",
+    "ANALYZE submissions",
+]
+
+USER_ID = "md5('bench-user-1')::uuid"
+PROBLEM_ID = "md5('bench-problem-1')::uuid"
+
+QUERIES = {
+    "my_submissions": f"""
+        SELECT * FROM submissions WHERE user_id = {USER_ID}
+        ORDER BY created_at DESC LIMIT 100
+    """,
+    "my_submissions_by_problem": f"""
+        SELECT * FROM submissions WHERE user_id = {USER_ID} AND problem_id = {PROBLEM_ID}
+        ORDER BY created_at DESC LIMIT 100
+    """,
+    "admin_submissions": """
+        SELECT * FROM submissions ORDER BY created_at DESC LIMIT 100
+    """,
+    "admin_submissions_by_problem": f"""
+        SELECT * FROM submissions WHERE problem_id = {PROBLEM_ID}
+        ORDER BY created_at DESC LIMIT 100
+    """,
+    "problem_leaderboard": f"""
+        SELECT * FROM submissions WHERE problem_id = {PROBLEM_ID} AND status = 'Accepted'
+    """,
+    "user_solved_count": f"""
+        SELECT count(DISTINCT problem_id) FROM submissions
+        WHERE user_id = {USER_ID} AND status = 'Accepted'
+    """,
+    "user_submission_count": f"""
+        SELECT count(*) FROM submissions WHERE user_id = {USER_ID}
+    """,
+    "rankings": """
+        SELECT users.id, count(DISTINCT submissions.problem_id) AS ac_count
+        FROM users LEFT OUTER JOIN submissions
+          ON submissions.user_id = users.id AND submissions.status = 'Accepted'
+        GROUP BY users.id ORDER BY ac_count DESC LIMIT 100
+    """,
+}
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def measure(conn, runs: int) -> dict:
+    results = {}
+    for name, sql in QUERIES.items():
+        plan = conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")).scalar()
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            conn.execute(text(sql)).fetchall()
+            samples.append((time.perf_counter() - start) * 1000)
+        results[name] = {
+            "p50_ms": round(statistics.median(samples), 3),
+            "p95_ms": round(_percentile(samples, 95), 3),
+            "max_ms": round(max(samples), 3),
+            "plan": plan,
+        }
+        print(f"  {name:32s} p50={results[name]['p50_ms']:9.3f}ms p95={results[name]['p95_ms']:9.3f}ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=None, help="defaults to settings.DATABASE_URL")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--problems", type=int, default=1000)
+    parser.add_argument("--submissions", type=int, default=2_000_000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--no-seed", action="store_true", help="reuse rows from a previous run")
+    parser.add_argument("--output", default="bench_submission_indexes.json")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None:
+        from app.core.config import settings
+        database_url = settings.DATABASE_URL
+
+    engine = create_engine(database_url)
+
+    if not args.no_seed:
+        print(f"[*] Seeding {args.users} users, {args.problems} problems, {args.submissions} submissions...")
+        params = {"users": args.users, "problems": args.problems, "submissions": args.submissions}
+        with engine.begin() as conn:
+            for stmt in SEED_SQL:
+                conn.execute(text(stmt), params)
+
+    report = {"generated_at": datetime.utcnow().isoformat(), "params": vars(args)}
+
+    print("[*] Measuring with indexes (after)")
+    with engine.connect() as conn:
+        report["after"] = measure(conn, args.runs)
+
+    print("[*] Measuring without indexes (before), rolled back afterwards")
+    with engine.connect() as conn:
+        trans = conn.begin()
+        try:
+            for name in INDEXES:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+            report["before"] = measure(conn, args.runs)
+        finally:
+            trans.rollback()
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"[*] Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
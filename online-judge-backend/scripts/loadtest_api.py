@@ -0,0 +1,429 @@
+"""
+Load-test the API with contest-start traffic patterns.
+
+Seeds users (all sharing one password), problems and a large submissions
+table with generate_series, then drives a running API server through these
+phases, each for --duration seconds with --concurrency clients:
+
+    login_storm       POST /auth/login/access-token
+    problem_list      GET  /problems/ (anonymous and logged in), /contests/
+    submission_burst  POST /submissions/
+    verdict_polling   GET  /submissions/{id}, /submissions/me
+    scoreboard        GET  /users/rankings, /problems/{id}/leaderboard
+    contest_start     all of the above, weighted like the first minutes of a contest
+
+Needs the real stack: Postgres (the models use Postgres types, so SQLite can't
+stand in) and Redis for the Celery broker. Submissions are only queued, so no
+worker is required. Clients are threads with keep-alive connections, so the
+script has no dependencies beyond the app.
+
+Reports requests/sec, p50/p95/p99 and a latency histogram per endpoint, and
+writes them to JSON. With --baseline, exits non-zero when an endpoint's p95
+grows or its requests/sec drops by more than the allowed percentage.
+
+Run it against a throwaway database, never against production:
+
+    uvicorn app.main:app --workers 4 &
+    python -m scripts.loadtest_api --url http://127.0.0.1:8000 \
+        --users 5000 --problems 500 --submissions 2000000 --concurrency 64 --duration 30
+"""
+import argparse
+import hashlib
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from sqlalchemy import create_engine, text
+
+PASSWORD = "loadtest-password"
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+SEED_SQL = [
+    """
+    INSERT INTO users (id, username, email, hashed_password, is_active, is_superuser)
+    SELECT md5('load-user-' || i)::uuid, 'load_user_' || i, 'load_user_' || i || '@example.com',
+           :hashed_password, true, false
+    FROM generate_series(1, :users) AS i
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO problems (id, title, description, input_description, output_description,
+                          time_limit, memory_limit, difficulty, is_active,
+                          accepted_count, submission_count, version)
+    SELECT md5('load-problem-' || i)::uuid, 'Load Problem ' || i,
+           repeat('Statement text. ', 200), 'Input.', 'Output.',
+           1000, 256, (ARRAY['Easy', 'Medium', 'Hard'])[1 + i % 3], true, 0, 0, 1
+    FROM generate_series(1, :problems) AS i
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO submissions (id, user_id, problem_id, language, code, status,
+                             total_score, time_used, memory_used, details, created_at)
+    SELECT gen_random_uuid(),
+           md5('load-user-' || (1 + floor(random() * :users))::int)::uuid,
+           md5('load-problem-' || (1 + floor(random() * :problems))::int)::uuid,
+           'C++', '#include <cstdio>\nint main() { return 0; }\n',
+           CASE WHEN random() < 0.35 THEN 'Accepted' ELSE 'Wrong Answer' END,
+           0, (random() * 1000)::int, (random() * 65536)::int, '[]'::json,
+           now() - (random() * interval '120 days')
+    FROM generate_series(1, :submissions)
+    """,
+    "ANALYZE users",
+    "ANALYZE problems",
+    "ANALYZE submissions",
+]
+
+CLEANUP_SQL = [
+    """
+    DELETE FROM submissions
+    WHERE user_id IN (SELECT id FROM users WHERE username LIKE 'load\\_user\\_%')
+    """,
+    "DELETE FROM users WHERE username LIKE 'load\\_user\\_%'",
+    "DELETE FROM problems WHERE title LIKE 'Load Problem %'",
+]
+
+
+def _uuid_for(prefix: str, i: int) -> str:
+    # Same ids as md5('<prefix>' || i)::uuid in SEED_SQL
+    return str(uuid.UUID(hashlib.md5(f"{prefix}{i}".encode()).hexdigest()))
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+class Client:
+    """One keep-alive HTTP connection per thread."""
+
+    def __init__(self, base_url: str, timeout: float):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or (443 if parts.scheme == "https" else 80)
+        self.https = parts.scheme == "https"
+        self.prefix = parts.path.rstrip("/") + "/api/v1"
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _conn(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            conn = self._local.conn = cls(self.host, self.port, timeout=self.timeout)
+        return conn
+
+    def request(
+        self, method: str, path: str, token: Optional[str] = None,
+        json_body: Optional[dict] = None, form: Optional[dict] = None,
+    ) -> Tuple[int, bytes, float]:
+        headers, body = {}, None
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        if json_body is not None:
+            body, headers["Content-Type"] = json.dumps(json_body), "application/json"
+        elif form is not None:
+            body, headers["Content-Type"] = urlencode(form), "application/x-www-form-urlencoded"
+
+        start = time.perf_counter()
+        try:
+            conn = self._conn()
+            conn.request(method, self.prefix + path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            self._local.conn = None
+            data, status = b"", 0
+        return status, data, (time.perf_counter() - start) * 1000
+
+
+class Context:
+    """State shared by the scenario functions of one run."""
+
+    def __init__(self, client: Client, args):
+        self.client = client
+        self.args = args
+        self.tokens: List[str] = []
+        self.submissions: List[Tuple[str, str]] = []  # (owner token, submission id)
+        self.lock = threading.Lock()
+
+    def user_email(self, rng: random.Random) -> str:
+        return f"load_user_{rng.randint(1, self.args.users)}@example.com"
+
+    def problem_id(self, rng: random.Random) -> str:
+        # Skewed: most traffic goes to the first few problems, like a contest set
+        return _uuid_for("load-problem-", min(self.args.problems, 1 + int(rng.expovariate(1 / 5))))
+
+    def token(self, rng: random.Random) -> Optional[str]:
+        return rng.choice(self.tokens) if self.tokens else None
+
+
+# A scenario step sends one request and returns (endpoint label, status, latency ms)
+Step = Callable[[Context, random.Random], Tuple[str, int, float]]
+
+
+def login(ctx: Context, rng: random.Random):
+    status, body, ms = ctx.client.request(
+        "POST", "/auth/login/access-token", form={"username": ctx.user_email(rng), "password": PASSWORD}
+    )
+    if status == 200:
+        with ctx.lock:
+            if len(ctx.tokens) < ctx.args.token_pool:
+                ctx.tokens.append(json.loads(body)["access_token"])
+    return "POST /auth/login/access-token", status, ms
+
+
+def problem_list_anonymous(ctx: Context, rng: random.Random):
+    status, _, ms = ctx.client.request("GET", "/problems/?limit=50")
+    return "GET /problems/ (anonymous)", status, ms
+
+
+def problem_list_user(ctx: Context, rng: random.Random):
+    status, _, ms = ctx.client.request("GET", "/problems/?limit=50", token=ctx.token(rng))
+    return "GET /problems/ (user)", status, ms
+
+
+def problem_detail(ctx: Context, rng: random.Random):
+    status, _, ms = ctx.client.request("GET", f"/problems/{ctx.problem_id(rng)}", token=ctx.token(rng))
+    return "GET /problems/{id}", status, ms
+
+
+def contest_list(ctx: Context, rng: random.Random):
+    status, _, ms = ctx.client.request("GET", "/contests/", token=ctx.token(rng))
+    return "GET /contests/", status, ms
+
+
+def submit(ctx: Context, rng: random.Random):
+    token = ctx.token(rng)
+    status, body, ms = ctx.client.request(
+        "POST", "/submissions/", token=token,
+        json_body={
+            "problem_id": ctx.problem_id(rng),
+            "language": "C++",
+            "code": "#include <cstdio>\nint main(){int a,b;scanf(\"%d %d\",&a,&b);printf(\"%d\\n\",a+b);}\n",
+        },
+    )
+    if status == 200:
+        with ctx.lock:
+            ctx.submissions.append((token, json.loads(body)["id"]))
+    return "POST /submissions/", status, ms
+
+
+def poll_verdict(ctx: Context, rng: random.Random):
+    # Only the owner may read a submission, so poll with the submitter's token
+    token, submission_id = rng.choice(ctx.submissions)
+    status, _, ms = ctx.client.request("GET", f"/submissions/{submission_id}", token=token)
+    return "GET /submissions/{id}", status, ms
+
+
+def my_submissions(ctx: Context, rng: random.Random):
+    status, _, ms = ctx.client.request("GET", "/submissions/me?limit=20", token=ctx.token(rng))
+    return "GET /submissions/me", status, ms
+
+
+def rankings(ctx: Context, rng: random.Random):
+    status, _, ms = ctx.client.request("GET", "/users/rankings")
+    return "GET /users/rankings", status, ms
+
+
+def leaderboard(ctx: Context, rng: random.Random):
+    status, _, ms = ctx.client.request("GET", f"/problems/{ctx.problem_id(rng)}/leaderboard")
+    return "GET /problems/{id}/leaderboard", status, ms
+
+
+PHASES: Dict[str, List[Tuple[Step, int]]] = {
+    "login_storm": [(login, 1)],
+    "problem_list": [(problem_list_anonymous, 2), (problem_list_user, 5), (problem_detail, 3), (contest_list, 1)],
+    "submission_burst": [(submit, 1)],
+    "verdict_polling": [(poll_verdict, 4), (my_submissions, 1)],
+    "scoreboard": [(rankings, 1), (leaderboard, 2)],
+    "contest_start": [
+        (login, 1), (problem_list_user, 4), (problem_detail, 6), (submit, 2),
+        (poll_verdict, 8), (my_submissions, 2), (rankings, 2), (leaderboard, 2),
+    ],
+}
+
+
+def run_phase(ctx: Context, steps: List[Tuple[Step, int]], duration: float, concurrency: int, seed: int) -> dict:
+    functions, weights = zip(*steps)
+    samples: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(n: int):
+        rng = random.Random(seed * 1000 + n)
+        local_samples, local_errors = defaultdict(list), defaultdict(int)
+        while time.perf_counter() < deadline:
+            label, status, ms = rng.choices(functions, weights=weights)[0](ctx, rng)
+            local_samples[label].append(ms)
+            if not 200 <= status < 400:
+                local_errors[label] += 1
+        with lock:
+            for label, values in local_samples.items():
+                samples[label].extend(values)
+            for label, count in local_errors.items():
+                errors[label] += count
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    endpoints = {}
+    for label, values in sorted(samples.items()):
+        histogram = {f"<={b}ms": sum(1 for v in values if v <= b) for b in BUCKETS_MS}
+        histogram["+inf"] = len(values)
+        endpoints[label] = {
+            "requests": len(values),
+            "errors": errors.get(label, 0),
+            "rps": round(len(values) / elapsed, 2),
+            "p50_ms": round(statistics.median(values), 3),
+            "p95_ms": round(_percentile(values, 95), 3),
+            "p99_ms": round(_percentile(values, 99), 3),
+            "max_ms": round(max(values), 3),
+            "histogram": histogram,  # cumulative counts
+        }
+    total = sum(e["requests"] for e in endpoints.values())
+    return {"elapsed_sec": round(elapsed, 3), "rps": round(total / elapsed, 2), "endpoints": endpoints}
+
+
+def print_phase(name: str, result: dict) -> None:
+    print(f"  {name}: {result['rps']:.1f} req/s")
+    for label, e in result["endpoints"].items():
+        print(
+            f"    {label:36s} {e['rps']:8.1f}/s p50={e['p50_ms']:8.2f}ms p95={e['p95_ms']:8.2f}ms "
+            f"p99={e['p99_ms']:8.2f}ms errors={e['errors']}"
+        )
+
+
+def gate(report: dict, baseline_path: str, max_latency: float, max_rps: float, min_delta_ms: float) -> List[str]:
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    failures = []
+    for phase, result in report["phases"].items():
+        old_phase = baseline.get("phases", {}).get(phase)
+        if not old_phase:
+            continue
+        for label, new in result["endpoints"].items():
+            old = old_phase["endpoints"].get(label)
+            if not old:
+                continue
+            p95_growth = (new["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0.0
+            if p95_growth > max_latency and new["p95_ms"] - old["p95_ms"] > min_delta_ms:
+                failures.append(f"{phase} {label}: p95 {old['p95_ms']}ms -> {new['p95_ms']}ms (+{p95_growth:.1f}%)")
+            rps_drop = (old["rps"] - new["rps"]) / old["rps"] * 100 if old["rps"] else 0.0
+            if rps_drop > max_rps:
+                failures.append(f"{phase} {label}: {old['rps']} -> {new['rps']} req/s (-{rps_drop:.1f}%)")
+    return failures
+
+
+def seed(args) -> None:
+    from app.core.security import get_password_hash
+
+    engine = create_engine(args.database_url)
+    params = {
+        "users": args.users, "problems": args.problems, "submissions": args.submissions,
+        "hashed_password": get_password_hash(PASSWORD),
+    }
+    print(f"[*] Seeding {args.users} users, {args.problems} problems, {args.submissions} submissions...")
+    with engine.begin() as conn:
+        for stmt in SEED_SQL:
+            conn.execute(text(stmt), params)
+
+
+def cleanup(args) -> None:
+    engine = create_engine(args.database_url)
+    print("[*] Removing load-test rows")
+    with engine.begin() as conn:
+        for stmt in CLEANUP_SQL:
+            conn.execute(text(stmt))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="base URL of a running API server")
+    parser.add_argument("--database-url", default=None, help="defaults to settings.DATABASE_URL")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--problems", type=int, default=200)
+    parser.add_argument("--submissions", type=int, default=1_000_000)
+    parser.add_argument("--no-seed", action="store_true", help="reuse rows from a previous run")
+    parser.add_argument("--cleanup", action="store_true", help="delete the load-test rows afterwards")
+    parser.add_argument("--phases", default=",".join(PHASES), help="comma separated, run in this order")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per phase")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--token-pool", type=int, default=500, help="logged-in users reused by later phases")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="loadtest_api.json")
+    parser.add_argument("--baseline", help="earlier report to gate against")
+    parser.add_argument("--max-latency-regression", type=float, default=20.0, help="allowed p95 growth, percent")
+    parser.add_argument("--max-rps-regression", type=float, default=15.0, help="allowed requests/sec drop, percent")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="ignore p95 changes smaller than this")
+    args = parser.parse_args()
+
+    phases = [p.strip() for p in args.phases.split(",") if p.strip()]
+    unknown = [p for p in phases if p not in PHASES]
+    if unknown:
+        raise SystemExit(f"Unknown phase(s): {', '.join(unknown)} (expected {', '.join(PHASES)})")
+
+    if args.database_url is None:
+        from app.core.config import settings
+        args.database_url = settings.DATABASE_URL
+    if not args.no_seed:
+        seed(args)
+
+    ctx = Context(Client(args.url, args.timeout), args)
+    # Later phases need logged-in users and some submission ids even when
+    # login_storm / submission_burst are not part of this run
+    print("[*] Logging in the token pool")
+    rng = random.Random(args.seed)
+    for _ in range(min(args.token_pool, args.users, 50)):
+        login(ctx, rng)
+    for token in ctx.tokens[:20]:
+        status, body, _ = ctx.client.request("GET", "/submissions/me?limit=20", token=token)
+        if status == 200:
+            ctx.submissions.extend((token, s["id"]) for s in json.loads(body))
+    if not ctx.tokens or not ctx.submissions:
+        raise SystemExit("Could not log in load-test users or find their submissions; is the server up and seeded?")
+
+    report = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "params": {k: v for k, v in vars(args).items() if k != "database_url"},
+        "phases": {},
+    }
+    try:
+        for i, name in enumerate(phases):
+            print(f"[*] {name}: {args.concurrency} clients for {args.duration:.0f}s")
+            report["phases"][name] = run_phase(ctx, PHASES[name], args.duration, args.concurrency, args.seed + i)
+            print_phase(name, report["phases"][name])
+    finally:
+        if args.cleanup:
+            cleanup(args)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[*] Wrote {args.output}")
+
+    if args.baseline:
+        failures = gate(
+            report, args.baseline, args.max_latency_regression, args.max_rps_regression, args.min_delta_ms
+        )
+        for failure in failures:
+            print(f"  REGRESSION {failure}")
+        if failures:
+            raise SystemExit(f"{len(failures)} endpoint(s) regressed against {args.baseline}")
+        print(f"[*] No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
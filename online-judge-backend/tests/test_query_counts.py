@@ -0,0 +1,126 @@
+"""
+Query-count regressions for the hot public listings.
+
+The problem list and the per-problem leaderboard must issue a fixed number
+of statements however many rows they return: a lazy load creeping back in
+(tags per problem, user per submission) shows up here as a count that grows
+with the data. Counts come from the SQL profiler's X-DB-Query-Count header.
+
+Needs a scratch PostgreSQL database whose tables this test creates and drops:
+
+    TEST_DATABASE_URL=postgresql://oj:oj@localhost:5432/oj_test pytest tests
+"""
+import os
+import uuid
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+if not TEST_DATABASE_URL:
+    pytest.skip("TEST_DATABASE_URL is not set", allow_module_level=True)
+
+# Settings are read at import, so configure before touching app.*
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ["SQL_PROFILING"] = "headers"
+os.environ["ENV"] = "development"
+os.environ["RESPONSE_CACHE_BACKEND"] = "off"
+os.environ["METRICS_ENABLED"] = "false"
+for name, value in {
+    "POSTGRES_USER": "oj",
+    "POSTGRES_PASSWORD": "oj",
+    "POSTGRES_DB": "oj_test",
+    "POSTGRES_HOST": "localhost",
+    "REDIS_URL": "redis://localhost:6379/0",
+    "SECRET_KEY": "test",
+    "ADMIN_KEY": "test",
+}.items():
+    os.environ.setdefault(name, value)
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.db.session import Base, SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Problem, Submission, Tag, User  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def client():
+    Base.metadata.create_all(engine)
+    try:
+        with TestClient(app) as client:
+            yield client
+    finally:
+        Base.metadata.drop_all(engine)
+
+
+@pytest.fixture(scope="module")
+def problem_id(client):
+    db = SessionLocal()
+    try:
+        problem = _add_problem(db)
+        db.commit()
+        return problem.id
+    finally:
+        db.close()
+
+
+def _add_problem(db) -> Problem:
+    suffix = uuid.uuid4().hex[:8]
+    problem = Problem(
+        title=f"Problem {suffix}",
+        description="-",
+        input_description="-",
+        output_description="-",
+        tags=[Tag(name=f"tag-{suffix}-a"), Tag(name=f"tag-{suffix}-b")],
+    )
+    db.add(problem)
+    db.flush()
+    return problem
+
+
+def _add_accepted(db, problem_id) -> None:
+    suffix = uuid.uuid4().hex[:8]
+    user = User(username=f"user-{suffix}", email=f"{suffix}@example.com", hashed_password="-")
+    db.add(user)
+    db.flush()
+    db.add(
+        Submission(
+            user_id=user.id,
+            problem_id=problem_id,
+            language="Python",
+            code="print()",
+            status="Accepted",
+            time_used=10,
+            memory_used=1024,
+        )
+    )
+
+
+def _seed(problem_id, count: int) -> None:
+    db = SessionLocal()
+    try:
+        for _ in range(count):
+            _add_problem(db)
+            _add_accepted(db, problem_id)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _query_count(client, path: str) -> int:
+    response = client.get(f"{settings.API_V1_STR}{path}")
+    assert response.status_code == 200, response.text
+    return int(response.headers["x-db-query-count"])
+
+
+@pytest.mark.parametrize("path", ["/problems/?limit=100", "/problems/{problem_id}/leaderboard?limit=100"])
+def test_query_count_does_not_grow_with_rows(client, problem_id, path):
+    path = path.format(problem_id=problem_id)
+
+    _seed(problem_id, 3)
+    few = _query_count(client, path)
+    _seed(problem_id, 30)
+    many = _query_count(client, path)
+
+    assert many == few
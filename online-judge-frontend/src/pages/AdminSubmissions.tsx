@@ -24,31 +24,64 @@ interface SubmissionSnippet {
     time_used: number;
     memory_used: number;
     created_at: string;
-    code: string;
+    code?: string;
 }
 
+// Server-side cap of POST /submissions/code
+const BULK_CODE_IDS = 500;
+
+// List rows are summaries, the source only comes with the detail endpoint
+const fetchCode = async (id: string): Promise<string> => {
+    const res = await client.get(`/submissions/${id}`);
+    return res.data.code;
+};
+
 const AdminSubmissions: React.FC = () => {
     const navigate = useNavigate();
     const location = useLocation();
     const [submissions, setSubmissions] = useState<SubmissionSnippet[]>([]);
     const [loading, setLoading] = useState(true);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = useState(false);
 
     const queryParams = new URLSearchParams(location.search);
     const problemIdFilter = queryParams.get('problem_id');
     const userIdFilter = queryParams.get('user_id');
 
+    const buildUrl = (cursor?: string) => {
+        let url = '/submissions/?limit=100';
+        if (problemIdFilter) {
+            url += `&problem_id=${problemIdFilter}`;
+        }
+        if (userIdFilter) {
+            url += `&user_id=${userIdFilter}`;
+        }
+        if (cursor) {
+            url += `&cursor=${encodeURIComponent(cursor)}`;
+        }
+        return url;
+    };
+
+    const loadMore = async () => {
+        if (!nextCursor || loadingMore) return;
+        setLoadingMore(true);
+        try {
+            const res = await client.get(buildUrl(nextCursor));
+            setSubmissions(prev => [...prev, ...res.data]);
+            setNextCursor(res.headers['x-next-cursor'] || null);
+        } catch (err) {
+            console.error("Failed to fetch more submissions", err);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     useEffect(() => {
         const fetchSubmissions = async () => {
             try {
-                let url = '/submissions/?limit=500';
-                if (problemIdFilter) {
-                    url += `&problem_id=${problemIdFilter}`;
-                }
-                if (userIdFilter) {
-                    url += `&user_id=${userIdFilter}`;
-                }
-                const res = await client.get(url);
+                const res = await client.get(buildUrl());
                 setSubmissions(res.data);
+                setNextCursor(res.headers['x-next-cursor'] || null);
                 setLoading(false);
             } catch (err) {
                 console.error("Failed to fetch admin submissions", err);
@@ -66,7 +99,8 @@ const AdminSubmissions: React.FC = () => {
             case 'Time Limit Exceeded': return 'text-orange-400 bg-orange-500/10 border-orange-500/20';
             case 'Runtime Error': return 'text-purple-400 bg-purple-500/10 border-purple-500/20';
             case 'Pending':
-            case 'Judging': return 'text-blue-400 bg-blue-500/10 border-blue-500/20';
+            case 'Judging':
+            case 'Pretests Passed': return 'text-blue-400 bg-blue-500/10 border-blue-500/20';
             default: return 'text-slate-400 bg-slate-500/10 border-slate-500/20';
         }
     };
@@ -76,12 +110,13 @@ const AdminSubmissions: React.FC = () => {
             case 'Accepted': return <CheckCircle className="w-4 h-4" />;
             case 'Wrong Answer': return <XCircle className="w-4 h-4" />;
             case 'Pending':
-            case 'Judging': return <RefreshCw className="w-4 h-4 animate-spin" />;
+            case 'Judging':
+            case 'Pretests Passed': return <RefreshCw className="w-4 h-4 animate-spin" />;
             default: return <AlertTriangle className="w-4 h-4" />;
         }
     };
 
-    const handleDownload = (e: React.MouseEvent, sub: SubmissionSnippet) => {
+    const handleDownload = async (e: React.MouseEvent, sub: SubmissionSnippet) => {
         e.stopPropagation();
 
         const extMap: Record<string, string> = {
@@ -93,7 +128,8 @@ const AdminSubmissions: React.FC = () => {
         const safeTitle = (sub.problem_title || sub.problem_id.substring(0, 8)).replace(/[^a-z0-9]/gi, '_').toLowerCase();
         const filename = `${sub.username}_${safeTitle}_${sub.id.substring(0, 8)}.${ext}`;
 
-        const blob = new Blob([sub.code || "// Code snippet not loaded natively by default API view."], { type: 'text/plain' });
+        const code = sub.code ?? await fetchCode(sub.id);
+        const blob = new Blob([code], { type: 'text/plain' });
         const url = URL.createObjectURL(blob);
         const a = document.createElement('a');
         a.href = url;
@@ -109,7 +145,16 @@ const AdminSubmissions: React.FC = () => {
 
         const zip = new JSZip();
 
-        submissions.forEach(sub => {
+        // One bulk request per BULK_CODE_IDS rows instead of one request per submission
+        const codes: Record<string, string> = {};
+        const missing = submissions.filter(sub => sub.code == null).map(sub => sub.id);
+        for (let i = 0; i < missing.length; i += BULK_CODE_IDS) {
+            const ids = missing.slice(i, i + BULK_CODE_IDS);
+            const res = await client.post('/submissions/code', { ids });
+            Object.assign(codes, res.data);
+        }
+
+        submissions.forEach((sub) => {
             const extMap: Record<string, string> = {
                 'C++': 'cpp',
                 'Python': 'py',
@@ -118,7 +163,7 @@ const AdminSubmissions: React.FC = () => {
             const ext = extMap[sub.language] || 'txt';
             const safeTitle = (sub.problem_title || sub.problem_id.substring(0, 8)).replace(/[^a-z0-9]/gi, '_').toLowerCase();
             const filename = `${sub.username}_${safeTitle}_${sub.id.substring(0, 8)}.${ext}`;
-            zip.file(filename, sub.code || "// Code snippet not loaded natively by default API view.");
+            zip.file(filename, sub.code ?? codes[sub.id] ?? '');
         });
 
         const blob = await zip.generateAsync({ type: 'blob' });
@@ -239,6 +284,17 @@ const AdminSubmissions: React.FC = () => {
                             </tbody>
                         </table>
                     </div>
+                    {nextCursor && (
+                        <div className="p-4 border-t border-slate-800 text-center">
+                            <button
+                                onClick={loadMore}
+                                disabled={loadingMore}
+                                className="bg-slate-800 hover:bg-slate-700 text-cyan-400 px-4 py-2 rounded-lg text-sm font-bold transition-colors disabled:opacity-50"
+                            >
+                                {loadingMore ? 'Loading...' : 'Load More'}
+                            </button>
+                        </div>
+                    )}
                 </div>
             </main>
         </div>
@@ -47,7 +47,8 @@ const ContestList: React.FC<ContestListProps> = ({ variant }) => {
         description: '',
         start_time: '',
         end_time: '',
-        is_visible: true
+        is_visible: true,
+        reuse_verdicts: true
     });
 
     useEffect(() => {
@@ -85,7 +86,7 @@ const ContestList: React.FC<ContestListProps> = ({ variant }) => {
                 is_active: true
             });
             setIsCreating(false);
-            setFormData({ title: '', description: '', start_time: '', end_time: '', is_visible: true });
+            setFormData({ title: '', description: '', start_time: '', end_time: '', is_visible: true, reuse_verdicts: true });
             fetchData();
         } catch (err) {
             console.error("Failed to create", err);
@@ -302,6 +303,19 @@ const ContestList: React.FC<ContestListProps> = ({ variant }) => {
                                         </label>
                                     </div>
 
+                                    <div className="flex items-center gap-2">
+                                        <input
+                                            type="checkbox"
+                                            id="reuse_verdicts"
+                                            checked={formData.reuse_verdicts}
+                                            onChange={(e) => setFormData({ ...formData, reuse_verdicts: e.target.checked })}
+                                            className="w-4 h-4 rounded border-slate-800 text-cyan-600 focus:ring-cyan-600 bg-slate-950"
+                                        />
+                                        <label htmlFor="reuse_verdicts" className="text-sm text-slate-400">
+                                            Reuse verdicts for identical code (uncheck to re-run every submission for timing fairness)
+                                        </label>
+                                    </div>
+
                                     <div className="pt-4 flex justify-end gap-3">
                                         <button
                                             type="button"
@@ -21,11 +21,13 @@ const CreateProblem: React.FC = () => {
         difficulty: 'Easy',
         is_active: true,
         is_special_judge: false,
+        is_interactive: false,
         is_partial: false,
         tags: ''
     });
     const [mainFile, setMainFile] = useState<File | null>(null);
     const [headerFile, setHeaderFile] = useState<File | null>(null);
+    const [interactorFile, setInteractorFile] = useState<File | null>(null);
 
     const handleChange = (e: React.ChangeEvent<HTMLInputElement | HTMLTextAreaElement | HTMLSelectElement>) => {
         const { name, value, type } = e.target;
@@ -60,6 +62,9 @@ const CreateProblem: React.FC = () => {
             if (headerFile) {
                 data.append('header_file', headerFile);
             }
+            if (interactorFile) {
+                data.append('interactor_file', interactorFile);
+            }
 
             const res = await client.post('/problems/', data, {
                 headers: {
@@ -277,7 +282,32 @@ const CreateProblem: React.FC = () => {
                                     />
                                     <span className="text-sm text-slate-300">Special Judge</span>
                                 </label>
+
+                                <label className="flex items-center gap-2 cursor-pointer">
+                                    <input
+                                        type="checkbox"
+                                        name="is_interactive"
+                                        checked={formData.is_interactive}
+                                        onChange={handleChange}
+                                        className="w-4 h-4 rounded border-slate-700 text-cyan-500 focus:ring-offset-0 focus:ring-cyan-500 bg-slate-900"
+                                    />
+                                    <span className="text-sm text-slate-300">Interactive</span>
+                                </label>
                             </div>
+
+                            {formData.is_interactive && (
+                                <div className="mt-6">
+                                    <label className="block text-sm font-medium text-slate-400 mb-2">
+                                        Upload interactor.cpp
+                                    </label>
+                                    <input
+                                        type="file"
+                                        accept=".cpp"
+                                        onChange={(e) => setInteractorFile(e.target.files?.[0] || null)}
+                                        className="w-full bg-slate-950 border border-slate-800 rounded-lg p-3 text-white focus:outline-none focus:border-cyan-500 transition-colors"
+                                    />
+                                </div>
+                            )}
                         </div>
 
                         <div className="pt-6 border-t border-slate-800 flex justify-end">
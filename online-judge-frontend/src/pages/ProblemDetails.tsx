@@ -41,7 +41,14 @@ const ProblemDetails: React.FC = () => {
                     client.get(`/problems/${id}/leaderboard`)
                 ]);
                 setProblem(probRes.data);
-                setTestCases(tcRes.data.filter((tc: any) => tc.is_sample));
+                // The list is metadata only; samples are few, so fetch their files
+                const samples = tcRes.data.filter((tc: any) => tc.is_sample);
+                setTestCases(await Promise.all(samples.map(async (tc: any) => {
+                    const [inRes, outRes] = await Promise.all(['input', 'output'].map(kind =>
+                        client.get(`/problems/${id}/test_cases/${tc.id}/${kind}`, { responseType: 'text' })
+                    ));
+                    return { ...tc, input_data: inRes.data, output_data: outRes.data };
+                })));
                 setUser(userRes.data);
                 setLeaderboard(lbRes.data);
                 setLoading(false);
@@ -25,6 +25,7 @@ const ProblemManagement: React.FC = () => {
         difficulty: 'Easy',
         is_active: true,
         is_special_judge: false,
+        is_interactive: false,
         is_partial: false,
         tags: ''
     });
@@ -38,6 +39,7 @@ const ProblemManagement: React.FC = () => {
     const [tcPoints, setTcPoints] = useState(0);
     const [mainFile, setMainFile] = useState<File | null>(null);
     const [headerFile, setHeaderFile] = useState<File | null>(null);
+    const [interactorFile, setInteractorFile] = useState<File | null>(null);
 
     useEffect(() => {
         fetchProblemData();
@@ -59,6 +61,7 @@ const ProblemManagement: React.FC = () => {
                 difficulty: res.data.difficulty,
                 is_active: res.data.is_active,
                 is_special_judge: res.data.is_special_judge,
+                is_interactive: res.data.is_interactive || false,
                 is_partial: res.data.is_partial || false,
                 tags: res.data.tags ? res.data.tags.map((t: any) => t.name).join(', ') : ''
             });
@@ -72,7 +75,7 @@ const ProblemManagement: React.FC = () => {
 
     const fetchTestCases = async () => {
         try {
-            const res = await client.get(`/problems/${id}/test_cases`);
+            const res = await client.get(`/problems/${id}/test_cases`, { params: { limit: 1000 } });
             setTestCases(res.data);
         } catch (err) {
             console.error(err);
@@ -96,6 +99,9 @@ const ProblemManagement: React.FC = () => {
             if (headerFile) {
                 data.append('header_file', headerFile);
             }
+            if (interactorFile) {
+                data.append('interactor_file', interactorFile);
+            }
             await client.put(`/problems/${id}`, data, {
                 headers: {
                     'Content-Type': 'multipart/form-data'
@@ -146,6 +152,58 @@ const ProblemManagement: React.FC = () => {
         }
     };
 
+    const handleExportTestCases = async () => {
+        try {
+            const res = await client.get(`/problems/${id}/test_cases/export`, { responseType: 'blob' });
+            const url = URL.createObjectURL(res.data);
+            const a = document.createElement('a');
+            a.href = url;
+            a.download = `problem_${id}_tests.zip`;
+            document.body.appendChild(a);
+            a.click();
+            document.body.removeChild(a);
+            URL.revokeObjectURL(url);
+        } catch (err: any) {
+            console.error("Export test cases error:", err);
+            setError("Failed to export test cases");
+        }
+    };
+
+    const handleDownloadTestCaseFile = async (tcId: string, kind: 'input' | 'output') => {
+        try {
+            const res = await client.get(`/problems/${id}/test_cases/${tcId}/${kind}`, { responseType: 'blob' });
+            const url = URL.createObjectURL(res.data);
+            const a = document.createElement('a');
+            a.href = url;
+            a.download = `${tcId}.${kind === 'input' ? 'in' : 'out'}`;
+            document.body.appendChild(a);
+            a.click();
+            document.body.removeChild(a);
+            URL.revokeObjectURL(url);
+        } catch (err: any) {
+            console.error("Download test case error:", err);
+            setError("Failed to download test case file");
+        }
+    };
+
+    const formatSize = (bytes?: number | null) => {
+        if (bytes === null || bytes === undefined) return 'unknown size';
+        if (bytes < 1024) return `${bytes} B`;
+        if (bytes < 1024 * 1024) return `${(bytes / 1024).toFixed(1)} KB`;
+        return `${(bytes / 1024 / 1024).toFixed(1)} MB`;
+    };
+
+    const handleRejudge = async () => {
+        if (!window.confirm("Rejudge all submissions? Only tests that changed since each submission's last run are executed.")) return;
+        try {
+            const res = await client.post(`/problems/${id}/rejudge`);
+            setSuccess(`Queued ${res.data.submissions} submissions for rejudging`);
+        } catch (err: any) {
+            console.error("Rejudge error:", err);
+            setError(err.response?.data?.detail || "Failed to queue rejudge");
+        }
+    };
+
     const handleDeleteTestCase = async (tcId: string) => {
         if (!window.confirm("Are you sure you want to delete this test case?")) return;
         try {
@@ -377,7 +435,35 @@ const ProblemManagement: React.FC = () => {
                                         />
                                         <span className="text-sm text-slate-300">Special Judge</span>
                                     </label>
+
+                                    <label className="flex items-center gap-2 cursor-pointer">
+                                        <input
+                                            type="checkbox"
+                                            name="is_interactive"
+                                            checked={formData.is_interactive}
+                                            onChange={handleChange}
+                                            className="w-4 h-4 rounded border-slate-700 text-cyan-500 focus:ring-offset-0 focus:ring-cyan-500 bg-slate-900"
+                                        />
+                                        <span className="text-sm text-slate-300">Interactive</span>
+                                    </label>
                                 </div>
+
+                                {formData.is_interactive && (
+                                    <div className="mt-6">
+                                        <label className="block text-sm font-medium text-slate-400 mb-2">
+                                            {problem?.interactor_code ? 'Replace interactor.cpp' : 'Upload interactor.cpp'}
+                                        </label>
+                                        <input
+                                            type="file"
+                                            accept=".cpp"
+                                            onChange={(e) => setInteractorFile(e.target.files?.[0] || null)}
+                                            className="w-full bg-slate-950 border border-slate-800 rounded-lg p-3 text-white focus:outline-none focus:border-cyan-500 transition-colors"
+                                        />
+                                        {problem?.interactor_code && !interactorFile && (
+                                            <p className="mt-2 text-xs text-emerald-500">✓ interactor.cpp is currently stored.</p>
+                                        )}
+                                    </div>
+                                )}
                             </div>
                             <div className="pt-6 border-t border-slate-800 flex justify-end">
                                 <button type="submit" className="bg-cyan-600 hover:bg-cyan-500 text-white px-6 py-3 rounded-lg font-semibold transition-colors flex items-center gap-2">
@@ -456,20 +542,42 @@ const ProblemManagement: React.FC = () => {
 
                             {/* Test Case List */}
                             <div className="space-y-4">
+                                {testCases.length > 0 && (
+                                    <div className="flex justify-end gap-3">
+                                        <button
+                                            onClick={handleRejudge}
+                                            className="bg-slate-800 hover:bg-slate-700 text-slate-200 px-4 py-2 rounded-lg text-sm font-bold border border-slate-700 transition-colors"
+                                        >
+                                            Rejudge Submissions
+                                        </button>
+                                        <button
+                                            onClick={handleExportTestCases}
+                                            className="bg-slate-800 hover:bg-slate-700 text-slate-200 px-4 py-2 rounded-lg text-sm font-bold border border-slate-700 transition-colors"
+                                        >
+                                            Export All (.zip)
+                                        </button>
+                                    </div>
+                                )}
                                 {testCases.map((tc) => (
                                     <div key={tc.id} className="bg-slate-900 border border-slate-800 rounded-xl p-6 flex justify-between items-start">
                                         <div className="grid grid-cols-2 gap-8 flex-1 mr-8">
                                             <div>
                                                 <div className="text-xs font-bold text-slate-500 uppercase mb-1">Input</div>
-                                                <pre className="bg-slate-950 p-3 rounded-lg text-slate-300 text-xs font-mono overflow-x-auto whitespace-pre-wrap max-h-32">
-                                                    {tc.input_data}
-                                                </pre>
+                                                <button
+                                                    onClick={() => handleDownloadTestCaseFile(tc.id, 'input')}
+                                                    className="w-full text-left bg-slate-950 p-3 rounded-lg text-slate-300 text-xs font-mono hover:text-cyan-400 transition-colors"
+                                                >
+                                                    {formatSize(tc.input_size)} · Download
+                                                </button>
                                             </div>
                                             <div>
                                                 <div className="text-xs font-bold text-slate-500 uppercase mb-1">Output</div>
-                                                <pre className="bg-slate-950 p-3 rounded-lg text-slate-300 text-xs font-mono overflow-x-auto whitespace-pre-wrap max-h-32">
-                                                    {tc.output_data}
-                                                </pre>
+                                                <button
+                                                    onClick={() => handleDownloadTestCaseFile(tc.id, 'output')}
+                                                    className="w-full text-left bg-slate-950 p-3 rounded-lg text-slate-300 text-xs font-mono hover:text-cyan-400 transition-colors"
+                                                >
+                                                    {formatSize(tc.output_size)} · Download
+                                                </button>
                                             </div>
                                         </div>
                                         <div className="flex flex-col items-end gap-2">
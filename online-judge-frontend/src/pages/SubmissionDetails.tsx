@@ -45,8 +45,8 @@ const SubmissionDetails: React.FC = () => {
             setSubmission(res.data);
             setLoading(false);
 
-            // Continue polling if status is Pending or Judging
-            if (res.data.status === 'Pending' || res.data.status === 'Judging') {
+            // Continue polling until the final verdict (system tests may still be queued)
+            if (['Pending', 'Judging', 'Pretests Passed'].includes(res.data.status)) {
                 setTimeout(fetchSubmission, 2000);
             }
         } catch (err) {
@@ -69,7 +69,8 @@ const SubmissionDetails: React.FC = () => {
             case 'Time Limit Exceeded': return 'text-orange-400 bg-orange-500/10 border-orange-500/20';
             case 'Runtime Error': return 'text-purple-400 bg-purple-500/10 border-purple-500/20';
             case 'Pending':
-            case 'Judging': return 'text-blue-400 bg-blue-500/10 border-blue-500/20';
+            case 'Judging':
+            case 'Pretests Passed': return 'text-blue-400 bg-blue-500/10 border-blue-500/20';
             default: return 'text-slate-400 bg-slate-500/10 border-slate-500/20';
         }
     };
@@ -79,7 +80,8 @@ const SubmissionDetails: React.FC = () => {
             case 'Accepted': return <CheckCircle className="w-5 h-5" />;
             case 'Wrong Answer': return <XCircle className="w-5 h-5" />;
             case 'Pending':
-            case 'Judging': return <RefreshCw className="w-5 h-5 animate-spin" />;
+            case 'Judging':
+            case 'Pretests Passed': return <RefreshCw className="w-5 h-5 animate-spin" />;
             default: return <AlertTriangle className="w-5 h-5" />;
         }
     };
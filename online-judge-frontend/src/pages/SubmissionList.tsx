@@ -60,7 +60,8 @@ const SubmissionList: React.FC = () => {
             case 'Time Limit Exceeded': return 'text-orange-400 bg-orange-500/10 border-orange-500/20';
             case 'Runtime Error': return 'text-purple-400 bg-purple-500/10 border-purple-500/20';
             case 'Pending':
-            case 'Judging': return 'text-blue-400 bg-blue-500/10 border-blue-500/20';
+            case 'Judging':
+            case 'Pretests Passed': return 'text-blue-400 bg-blue-500/10 border-blue-500/20';
             default: return 'text-slate-400 bg-slate-500/10 border-slate-500/20';
         }
     };
@@ -70,7 +71,8 @@ const SubmissionList: React.FC = () => {
             case 'Accepted': return <CheckCircle className="w-4 h-4" />;
             case 'Wrong Answer': return <XCircle className="w-4 h-4" />;
             case 'Pending':
-            case 'Judging': return <RefreshCw className="w-4 h-4 animate-spin" />;
+            case 'Judging':
+            case 'Pretests Passed': return <RefreshCw className="w-4 h-4 animate-spin" />;
             default: return <AlertTriangle className="w-4 h-4" />;
         }
     };